@@ -122,7 +122,7 @@ class Api(object, metaclass=ApiMetaclass):
 
 
 class Event(object):
-    def __init__(self, parameters=tuple()):
+    def __init__(self, parameters=tuple(), partition_key: str = None):
         # Ensure you update the __copy__() method if adding other instance variables below
         if isinstance(parameters, str):
             raise InvalidApiEventConfiguration(
@@ -132,3 +132,15 @@ class Event(object):
                 f"tuple of parameter names."
             )
         self.parameters = parameters
+
+        # Events with the same value for this parameter will be kept in order,
+        # where the event transport supports partitioning
+        if partition_key is not None and partition_key not in {
+            getattr(p, "name", p) for p in parameters
+        }:
+            raise InvalidApiEventConfiguration(
+                f"The partition key {repr(partition_key)} for your API's event is not "
+                f"one of the event's parameters. The partition key should be the name of "
+                f"the parameter upon which the event should be partitioned."
+            )
+        self.partition_key = partition_key
@@ -9,10 +9,10 @@ import sys
 import threading
 import time
 from asyncio import CancelledError
-from collections import defaultdict
+from collections import defaultdict, OrderedDict, deque
 from datetime import timedelta
 from itertools import chain
-from typing import List, Tuple, Coroutine, Union
+from typing import List, Tuple, Coroutine, Union, Sequence, Dict, Optional
 
 import janus
 
@@ -24,7 +24,7 @@ from lightbus.client_worker import (
     WorkerProxy,
 )
 from lightbus.config import Config
-from lightbus.config.structure import OnError
+from lightbus.config.structure import OnError, EventDeduplication
 from lightbus.exceptions import (
     InvalidEventArguments,
     UnknownApi,
@@ -41,6 +41,7 @@ from lightbus.exceptions import (
     BusAlreadyClosed,
     TransportIsClosed,
     LightbusServerMustStartInMainThread,
+    UnsupportedOptionValue,
 )
 from lightbus.internal_apis import LightbusStateApi, LightbusMetricsApi
 from lightbus.log import LBullets, L, Bold
@@ -533,6 +534,54 @@ class BusClient(object):
 
     @run_in_worker_thread()
     async def fire_event(self, api_name, name, kwargs: dict = None, options: dict = None):
+        event_message = self._make_event_message(api_name, name, kwargs)
+
+        event_transport = self.transport_registry.get_event_transport(api_name)
+        await self._execute_hook("before_event_sent", event_message=event_message)
+        logger.info(L("📤  Sending event {}.{}".format(Bold(api_name), Bold(name))))
+        await event_transport.send_event(event_message, options=options, bus_client=self)
+        await self._execute_hook("after_event_sent", event_message=event_message)
+
+    @run_in_worker_thread()
+    async def fire_events(self, events: Sequence[Tuple[str, str, dict]], options: dict = None):
+        """Fire multiple events at once
+
+        Each item in `events` should be a tuple in the form `(api_name, event_name, kwargs)`.
+
+        Validation and hooks run for each event individually, as with `fire_event()`.
+        However, events which share an event transport are passed to that transport
+        in a single call to `EventTransport.send_events()`, thereby allowing the
+        transport to publish them in bulk.
+        """
+        event_messages = [
+            self._make_event_message(api_name, name, kwargs) for api_name, name, kwargs in events
+        ]
+
+        # Group the messages by transport, maintaining the order in which they were given
+        messages_by_transport: Dict[EventTransport, List[EventMessage]] = OrderedDict()
+        for event_message in event_messages:
+            event_transport = self.transport_registry.get_event_transport(event_message.api_name)
+            messages_by_transport.setdefault(event_transport, []).append(event_message)
+
+        for event_message in event_messages:
+            await self._execute_hook("before_event_sent", event_message=event_message)
+
+        logger.info(
+            LBullets(
+                "📤  Sending {} events".format(Bold(len(event_messages))),
+                items=[Bold(m.canonical_name) for m in event_messages],
+            )
+        )
+        for event_transport, transport_messages in messages_by_transport.items():
+            await event_transport.send_events(
+                transport_messages, options=options, bus_client=self
+            )
+
+        for event_message in event_messages:
+            await self._execute_hook("after_event_sent", event_message=event_message)
+
+    def _make_event_message(self, api_name, name, kwargs: dict = None) -> EventMessage:
+        """Create & validate an outgoing event message"""
         kwargs = kwargs or {}
         try:
             api = self.api_registry.get(api_name)
@@ -574,12 +623,7 @@ class BusClient(object):
         )
 
         self._validate(event_message, "outgoing")
-
-        event_transport = self.transport_registry.get_event_transport(api_name)
-        await self._execute_hook("before_event_sent", event_message=event_message)
-        logger.info(L("📤  Sending event {}.{}".format(Bold(api_name), Bold(name))))
-        await event_transport.send_event(event_message, options=options, bus_client=self)
-        await self._execute_hook("after_event_sent", event_message=event_message)
+        return event_message
 
     async def listen_for_event(
         self, api_name, name, listener, listener_name: str, options: dict = None
@@ -650,6 +694,20 @@ class BusClient(object):
         """
         return list(self._listeners.keys())
 
+    @run_in_worker_thread()
+    async def consumer_lag(self) -> List[dict]:
+        """Get the backlog of events awaiting this process' event listeners
+
+        Returns a list of dictionaries, as provided by each event transport's
+        `consumer_lag()` method. Transports which cannot report their backlog
+        are omitted. See `RedisEventTransport.consumer_lag()` for details.
+        """
+        lag = []
+        for transport in self.transport_registry.get_all_transports():
+            if isinstance(transport, EventTransport):
+                lag.extend(await transport.consumer_lag())
+        return lag
+
     def _validate(self, message: Message, direction: str, api_name=None, procedure_name=None):
         if direction not in ("incoming", "outgoing"):
             raise AssertionError("Invalid direction specified")
@@ -925,10 +983,39 @@ class _EventListener(object):
         self.events = events
         self.listener_callable = listener_callable
         self.listener_name = listener_name
-        self.options = options or {}
         self.bus_client = bus_client
 
+        # Listener-level options are handled here, the remainder
+        # are passed through to the event transport's consume()
+        self.options = dict(options or {})
+        self._concurrency = self.options.pop("concurrency", None)
+        # Shared by the listener's event transports. See semaphore
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._deduplication = self.options.pop("deduplication", None)
+
         self.event_transports = self.get_event_transports()
+        # Event IDs mapped to the time until which they should be considered
+        # processed, in least recently processed order. See mark_processed()
+        self._processed_event_ids: Dict[str, float] = OrderedDict()
+        # Events waiting to be recorded as processed, along with the task which will
+        # record them, keyed by event transport. See record_processed()
+        self._unrecorded_events: Dict[EventTransport, Tuple[List[EventMessage], asyncio.Task]] = {}
+
+        if self.concurrency < 1:
+            raise UnsupportedOptionValue(
+                f"The concurrency for event listener {self.listener_name} must be at least 1, "
+                f"but {self.concurrency} was given."
+            )
+
+        if self._deduplication is not None:
+            try:
+                self._deduplication = EventDeduplication(self._deduplication)
+            except ValueError:
+                raise UnsupportedOptionValue(
+                    f"The deduplication for event listener {self.listener_name} must be one "
+                    f"of {', '.join(d.value for d in EventDeduplication)}, but "
+                    f"{self._deduplication} was given."
+                )
 
     def get_event_transports(self):
         """ Get events grouped by transport
@@ -963,6 +1050,94 @@ class _EventListener(object):
         else:
             return OnError.IGNORE
 
+    @property
+    def concurrency(self) -> int:
+        """How many events may this listener process at once?
+
+        Can be set using the `concurrency` option when setting up the listener.
+        Otherwise the lowest `event_listener_concurrency` value of all
+        APIs used by this listener will be used.
+        """
+        if self._concurrency is not None:
+            return self._concurrency
+
+        return min(
+            self.bus_client.config.api(_api_name).event_listener_concurrency
+            for *_, _api_names in self.event_transports
+            for _api_name in _api_names
+        )
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Limits the number of events being processed at once to `concurrency`
+
+        This spans all of the listener's event transports, and all the
+        batches of events received from them.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @property
+    def acknowledgement_interval(self) -> float:
+        """The maximum number of seconds processed events may wait to be acknowledged
+
+        Uses the lowest `event_acknowledgement_interval` value of all
+        APIs used by this listener.
+        """
+        return min(
+            self.bus_client.config.api(_api_name).event_acknowledgement_interval
+            for *_, _api_names in self.event_transports
+            for _api_name in _api_names
+        )
+
+    @property
+    def deduplication(self) -> EventDeduplication:
+        """Where should this listener record processed events, in order to skip redeliveries?
+
+        Can be set using the `deduplication` option when setting up the listener.
+        Otherwise the most durable `event_deduplication` value of all APIs used by
+        this listener will be used.
+        """
+        if self._deduplication is not None:
+            return self._deduplication
+
+        deduplication_values = [
+            self.bus_client.config.api(_api_name).event_deduplication
+            for *_, _api_names in self.event_transports
+            for _api_name in _api_names
+        ]
+        if EventDeduplication.TRANSPORT in deduplication_values:
+            return EventDeduplication.TRANSPORT
+        elif EventDeduplication.MEMORY in deduplication_values:
+            return EventDeduplication.MEMORY
+        else:
+            return EventDeduplication.NONE
+
+    @property
+    def deduplication_ttl(self) -> float:
+        """The number of seconds for which processed events should be remembered
+
+        Uses the highest `event_deduplication_ttl` value of all APIs used by this listener.
+        """
+        return max(
+            self.bus_client.config.api(_api_name).event_deduplication_ttl
+            for *_, _api_names in self.event_transports
+            for _api_name in _api_names
+        )
+
+    @property
+    def deduplication_max_size(self) -> int:
+        """The maximum number of processed events to remember when using memory deduplication
+
+        Uses the highest `event_deduplication_max_size` value of all APIs used by this listener.
+        """
+        return max(
+            self.bus_client.config.api(_api_name).event_deduplication_max_size
+            for *_, _api_names in self.event_transports
+            for _api_name in _api_names
+        )
+
     @property
     def die_on_error(self) -> bool:
         """Should the entire process die if an error occurs in a listener?"""
@@ -1010,7 +1185,34 @@ class _EventListener(object):
         This is the core glue which combines the event transports' consume()
         method and the listener callable. The bulk of this is logging,
         validation, plugin hooks, and error handling.
+
+        Events are received by consume(), and processed within an _EventProcessingWindow.
+        We return once either of these stops.
         """
+        window = _EventProcessingWindow(self, event_transport)
+        consume_task = asyncio.ensure_future(self.consume(event_transport, events, window))
+        try:
+            with self.bus_client._register_listener(events):
+                await asyncio.wait(
+                    [consume_task, window.task], return_when=asyncio.FIRST_COMPLETED
+                )
+                if consume_task.done():
+                    # Surface any errors from the event transport
+                    consume_task.result()
+                # Raises any error from the listener callable
+                await window.join()
+        finally:
+            if not consume_task.done():
+                await cancel(consume_task)
+            await window.close()
+
+    async def consume(
+        self,
+        event_transport: EventTransport,
+        events: List[Tuple[str, str]],
+        window: "_EventProcessingWindow",
+    ):
+        """Receive events from the event transport, and add them to the processing window"""
         # event_transport.consume() returns an asynchronous generator
         # which will provide us with messages
         consumer = event_transport.consume(
@@ -1018,80 +1220,351 @@ class _EventListener(object):
         )
 
         try:
-            with self.bus_client._register_listener(events):
-                async for event_messages in consumer:
-                    for event_message in event_messages:
-                        # TODO: Check events match those requested
-                        # TODO: Support event name of '*', but transports should raise
-                        # TODO: an exception if it is not supported.
-                        logger.info(
-                            L(
-                                "📩  Received event {}.{} with ID {}".format(
-                                    Bold(event_message.api_name),
-                                    Bold(event_message.event_name),
-                                    event_message.id,
-                                )
-                            )
-                        )
-
-                        self.bus_client._validate(event_message, "incoming")
-
-                        await self.bus_client._execute_hook(
-                            "before_event_execution", event_message=event_message
-                        )
-
-                        if self.bus_client.config.api(event_message.api_name).cast_values:
-                            parameters = cast_to_signature(
-                                parameters=event_message.kwargs, callable=self.listener_callable
-                            )
-                        else:
-                            parameters = event_message.kwargs
-
-                        try:
-                            # Call the listener.
-                            # Pass the event message as a positional argument,
-                            # thereby allowing listeners to have flexibility in the argument names.
-                            # (And therefore allowing listeners to use the `event` parameter themselves)
-                            await run_user_provided_callable(
-                                self.listener_callable,
-                                args=[event_message],
-                                kwargs=parameters,
-                                bus_client=self.bus_client,
-                                die_on_exception=False,
-                            )
-                        except LightbusShutdownInProgress as e:
-                            logger.info("Shutdown in progress: {}".format(e))
-                            return
-                        except Exception as e:
-                            if self.on_error == OnError.IGNORE:
-                                # We're ignore errors, so log it and move on
-                                logger.error(
-                                    f"An event listener raised an exception while processing an event. Lightbus will "
-                                    f"continue as normal because the on 'on_error' option is set "
-                                    f"to '{OnError.IGNORE.value}'."
-                                )
-                            elif self.on_error == OnError.STOP_LISTENER:
-                                logger.error(
-                                    f"An event listener raised an exception while processing an event. Lightbus will "
-                                    f"stop the listener but keep on running. This is because the 'on_error' option "
-                                    f"is set to '{OnError.STOP_LISTENER.value}'."
-                                )
-                                # Stop the listener by returning
-                                return
-                            else:
-                                # We're not ignoring errors, so raise it and
-                                # let the error handler callback deal with it
-                                raise
-
-                        # Acknowledge the successfully processed message
-                        await event_transport.acknowledge(event_message, bus_client=self.bus_client)
-
-                        await self.bus_client._execute_hook(
-                            "after_event_execution", event_message=event_message
-                        )
+            async for event_messages in consumer:
+                if self.deduplication != EventDeduplication.NONE:
+                    event_messages = await self.skip_processed(event_transport, event_messages)
+                    if not event_messages:
+                        continue
+                should_continue = await self.process_batch(event_transport, event_messages, window)
+                if not should_continue:
+                    return
         except CancelledError:
             # Close the consumer to allow it to do any cleanup
             try:
                 await consumer.aclose()
             except StopAsyncIteration:
                 pass
+
+    async def process_batch(
+        self,
+        event_transport: EventTransport,
+        event_messages: List[EventMessage],
+        window: "_EventProcessingWindow" = None,
+    ) -> bool:
+        """ Process a batch of events, running up to `concurrency` listeners at once
+
+        The events are added to the given processing window as soon as the listener
+        has capacity, and we return once they have all been started. Processing of the
+        next batch can therefore begin while the slowest events of this batch are
+        still in flight. If no window is given then one is created, and we return
+        once the batch has been processed and acknowledged.
+
+        Returns False if the listener should stop.
+        """
+        if window:
+            return await window.add(event_messages)
+
+        window = _EventProcessingWindow(self, event_transport)
+        try:
+            await window.add(event_messages)
+            return await window.join()
+        finally:
+            await window.close()
+
+    async def acknowledge(self, event_transport: EventTransport, event_messages: List[EventMessage]):
+        """Acknowledge the successfully processed messages in a single call to the transport"""
+        if not event_messages:
+            return
+
+        await event_transport.acknowledge(*event_messages, bus_client=self.bus_client)
+
+    async def skip_processed(
+        self, event_transport: EventTransport, event_messages: List[EventMessage]
+    ) -> List[EventMessage]:
+        """Acknowledge & remove any events which this listener has already processed
+
+        Events can be redelivered if they are reclaimed from a consumer which
+        was slow to process them, or if a consumer dies after processing events but
+        before acknowledging them. See `deduplication`.
+        """
+        if self.deduplication == EventDeduplication.TRANSPORT:
+            processed_ids = await event_transport.get_processed_event_ids(
+                event_messages, listener_name=self.listener_name
+            )
+        else:
+            now = time.time()
+            processed_ids = {
+                m.id for m in event_messages if self._processed_event_ids.get(m.id, 0) > now
+            }
+
+        if not processed_ids:
+            return event_messages
+
+        processed = [m for m in event_messages if m.id in processed_ids]
+        logger.info(
+            LBullets(
+                L("⏭  Skipping {} events which have already been processed", Bold(len(processed))),
+                items=[f"{m.canonical_name} with ID {m.id}" for m in processed],
+            )
+        )
+        # Acknowledge directly, as the after_event_execution hook should not be called
+        await event_transport.acknowledge(*processed, bus_client=self.bus_client)
+        return [m for m in event_messages if m.id not in processed_ids]
+
+    async def record_processed(self, event_transport: EventTransport, event_message: EventMessage):
+        """Record that this listener has processed the given event, once it has been processed
+
+        Events processed concurrently are recorded together with a single call
+        to mark_processed(), saving a round trip to the transport per event.
+        """
+        if event_transport not in self._unrecorded_events:
+            self._unrecorded_events[event_transport] = (
+                [],
+                asyncio.ensure_future(self._record_unrecorded_events(event_transport)),
+            )
+        event_messages, task = self._unrecorded_events[event_transport]
+        event_messages.append(event_message)
+        # Shielded, as the task may be recording the events of other listener tasks
+        await asyncio.shield(task)
+
+    async def _record_unrecorded_events(self, event_transport: EventTransport):
+        # Give any events being processed concurrently a chance to join this call
+        await asyncio.sleep(0)
+        event_messages, _ = self._unrecorded_events.pop(event_transport)
+        await self.mark_processed(event_transport, event_messages)
+
+    async def mark_processed(
+        self, event_transport: EventTransport, event_messages: List[EventMessage]
+    ):
+        """Record that this listener has processed the given events. See skip_processed()"""
+        if self.deduplication == EventDeduplication.TRANSPORT:
+            await event_transport.mark_processed(
+                event_messages, listener_name=self.listener_name, ttl=self.deduplication_ttl
+            )
+        else:
+            expires_at = time.time() + self.deduplication_ttl
+            for event_message in event_messages:
+                self._processed_event_ids.pop(event_message.id, None)
+                self._processed_event_ids[event_message.id] = expires_at
+            while len(self._processed_event_ids) > self.deduplication_max_size:
+                self._processed_event_ids.popitem(last=False)
+
+    async def handle_event(self, event_message: EventMessage) -> bool:
+        """ Invoke the listener callable for a single event
+
+        Returns True if the message should be acknowledged,
+        or False if the listener should stop.
+        """
+        # TODO: Check events match those requested
+        # TODO: Support event name of '*', but transports should raise
+        # TODO: an exception if it is not supported.
+        logger.info(
+            L(
+                "📩  Received event {}.{} with ID {}".format(
+                    Bold(event_message.api_name), Bold(event_message.event_name), event_message.id
+                )
+            )
+        )
+
+        self.bus_client._validate(event_message, "incoming")
+
+        await self.bus_client._execute_hook("before_event_execution", event_message=event_message)
+
+        if self.bus_client.config.api(event_message.api_name).cast_values:
+            parameters = cast_to_signature(
+                parameters=event_message.kwargs, callable=self.listener_callable
+            )
+        else:
+            parameters = event_message.kwargs
+
+        try:
+            # Call the listener.
+            # Pass the event message as a positional argument,
+            # thereby allowing listeners to have flexibility in the argument names.
+            # (And therefore allowing listeners to use the `event` parameter themselves)
+            await run_user_provided_callable(
+                self.listener_callable,
+                args=[event_message],
+                kwargs=parameters,
+                bus_client=self.bus_client,
+                die_on_exception=False,
+            )
+        except LightbusShutdownInProgress as e:
+            logger.info("Shutdown in progress: {}".format(e))
+            return False
+        except CancelledError:
+            raise
+        except Exception as e:
+            if self.on_error == OnError.IGNORE:
+                # We're ignore errors, so log it and move on
+                logger.error(
+                    f"An event listener raised an exception while processing an event. Lightbus will "
+                    f"continue as normal because the on 'on_error' option is set "
+                    f"to '{OnError.IGNORE.value}'."
+                )
+            elif self.on_error == OnError.STOP_LISTENER:
+                logger.error(
+                    f"An event listener raised an exception while processing an event. Lightbus will "
+                    f"stop the listener but keep on running. This is because the 'on_error' option "
+                    f"is set to '{OnError.STOP_LISTENER.value}'."
+                )
+                # Stop the listener
+                return False
+            else:
+                # We're not ignoring errors, so raise it and
+                # let the error handler callback deal with it
+                raise
+
+        return True
+
+
+class _EventProcessingWindow(object):
+    """ The events an event listener is currently processing from a single event transport
+
+    Events are started as soon as the listener's semaphore allows, regardless
+    of which batch they were received in. Therefore up to `concurrency` events
+    will be processed at once, irrespective of the event transport's batch size,
+    and a single slow event will not hold up the events received after it.
+
+    Events are acknowledged in the order they were received. Therefore a crash will
+    never result in an unprocessed event being acknowledged. Acknowledgements are
+    sent in bulk, once all the events received have been processed or once
+    `acknowledgement_interval` has elapsed. A crash may therefore result
+    in processed events being redelivered.
+
+    Like _EventListener, this class is tightly coupled to its listener
+    and should not be relied upon externally.
+    """
+
+    def __init__(self, event_listener: _EventListener, event_transport: EventTransport):
+        self.event_listener = event_listener
+        self.event_transport = event_transport
+        # Tuples of (event message, task), in the order the events were received
+        self.in_flight = deque()
+        # Once a listener fails or asks to stop we must not start processing any further events
+        self.stopping = False
+        self._adding = False
+        self._joining = False
+        self._changed = asyncio.Event()
+        # Acknowledges the events as they are processed. See _acknowledge_loop()
+        self.task = asyncio.ensure_future(self._acknowledge_loop())
+
+    async def add(self, event_messages: List[EventMessage]) -> bool:
+        """ Start processing the given events, waiting for capacity as needed
+
+        Returns False if the listener should stop.
+        """
+        semaphore = self.event_listener.semaphore
+        self._adding = True
+        try:
+            for event_message in event_messages:
+                await semaphore.acquire()
+                if self.stopping or self.task.done():
+                    semaphore.release()
+                    return False
+                task = asyncio.ensure_future(self._handle_event(event_message))
+                # Release upon completion or cancellation (even if the task never started)
+                task.add_done_callback(lambda _: semaphore.release())
+                self.in_flight.append((event_message, task))
+                self._changed.set()
+        finally:
+            self._adding = False
+            self._changed.set()
+        return True
+
+    async def join(self) -> bool:
+        """ Wait for all the events to be processed & acknowledged
+
+        Returns False if the listener should stop, and raises any error
+        raised by the listener callable.
+        """
+        self._joining = True
+        self._changed.set()
+        return await self.task
+
+    async def close(self):
+        if not self.task.done():
+            await cancel(self.task)
+
+    async def _handle_event(self, event_message: EventMessage) -> bool:
+        if self.stopping:
+            return False
+        try:
+            should_continue = await self.event_listener.handle_event(event_message)
+        except Exception:
+            self.stopping = True
+            raise
+        if not should_continue:
+            self.stopping = True
+        else:
+            if self.event_listener.deduplication != EventDeduplication.NONE:
+                # Record this now, rather than upon acknowledgement, so that we can
+                # also skip events redelivered because we died before acknowledging
+                await self.event_listener.record_processed(self.event_transport, event_message)
+            # Only the acknowledgement is deferred, so hooks (i.e. metrics) see the
+            # time at which each event was actually processed
+            await self.event_listener.bus_client._execute_hook(
+                "after_event_execution", event_message=event_message
+            )
+        return should_continue
+
+    async def _acknowledge_loop(self) -> bool:
+        acknowledge = functools.partial(self.event_listener.acknowledge, self.event_transport)
+        unacknowledged = []
+        acknowledge_at = None
+        try:
+            while True:
+                # Cleared before we inspect our state, so that any changes made while we
+                # are acknowledging (below) will wake us, rather than being missed
+                self._changed.clear()
+                if not self.in_flight:
+                    if not self._adding:
+                        # Everything we have received has been processed
+                        await acknowledge(unacknowledged)
+                        unacknowledged = []
+                        if self._joining:
+                            return True
+
+                    if not unacknowledged:
+                        await self._changed.wait()
+                        continue
+                    # Events are still being added, but don't hold on to processed
+                    # events for longer than acknowledgement_interval
+                    try:
+                        await asyncio.wait_for(
+                            self._changed.wait(), timeout=max(0, acknowledge_at - time.time())
+                        )
+                    except asyncio.TimeoutError:
+                        await acknowledge(unacknowledged)
+                        unacknowledged = []
+                    continue
+
+                # Await the events in the order they were received, thereby
+                # only acknowledging a contiguous run of processed events
+                event_message, task = self.in_flight[0]
+                if unacknowledged and not task.done():
+                    # Don't hold on to processed events for longer than acknowledgement_interval
+                    await asyncio.wait([task], timeout=max(0, acknowledge_at - time.time()))
+                    if not task.done():
+                        await acknowledge(unacknowledged)
+                        unacknowledged = []
+                        continue
+
+                try:
+                    should_continue = await task
+                except CancelledError:
+                    raise
+                except Exception:
+                    # Still acknowledge the events we did manage to process
+                    await acknowledge(unacknowledged)
+                    raise
+                self.in_flight.popleft()
+
+                if not should_continue:
+                    await acknowledge(unacknowledged)
+                    return False
+
+                if not unacknowledged:
+                    acknowledge_at = time.time() + self.event_listener.acknowledgement_interval
+                unacknowledged.append(event_message)
+                if time.time() >= acknowledge_at:
+                    await acknowledge(unacknowledged)
+                    unacknowledged = []
+        finally:
+            # Make sure we don't leave any listeners running if we are
+            # stopping, either due to an error or due to cancellation
+            self.stopping = True
+            unfinished = [task for _, task in self.in_flight if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
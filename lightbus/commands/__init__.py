@@ -14,6 +14,8 @@ import lightbus.commands.shell
 import lightbus.commands.dump_schema
 import lightbus.commands.dump_config_schema
 import lightbus.commands.inspect
+import lightbus.commands.dump_events
+import lightbus.commands.dead_letters
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +81,8 @@ def parse_args(args=None):
     lightbus.commands.dump_schema.Command().setup(parser, subparsers)
     lightbus.commands.dump_config_schema.Command().setup(parser, subparsers)
     lightbus.commands.inspect.Command().setup(parser, subparsers)
+    lightbus.commands.dump_events.Command().setup(parser, subparsers)
+    lightbus.commands.dead_letters.Command().setup(parser, subparsers)
 
     # Create a temporary plugin registry in order to run the before_parse_args hook
     plugin_registry = PluginRegistry()
@@ -0,0 +1,80 @@
+import argparse
+import json
+import logging
+import sys
+
+from lightbus import EventTransport
+from lightbus.commands.utilities import BusImportMixin, LogLevelMixin
+from lightbus.plugins import PluginRegistry
+from lightbus.utilities.async_tools import block
+
+logger = logging.getLogger(__name__)
+
+
+class Command(LogLevelMixin, BusImportMixin, object):
+    def setup(self, parser, subparsers):
+        parser_shell = subparsers.add_parser(
+            "deadletters",
+            help=(
+                "List events which repeatedly failed to be processed, one JSON-encoded "
+                "dead letter per line. Optionally requeue them for processing"
+            ),
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        )
+        parser_shell.add_argument(
+            "--api",
+            "-a",
+            help="List dead letters for this API name",
+            metavar="API_NAME",
+            required=True,
+        )
+        parser_shell.add_argument(
+            "--event",
+            "-e",
+            help="List dead letters for this event name",
+            metavar="EVENT_NAME",
+            required=True,
+        )
+        parser_shell.add_argument(
+            "--requeue",
+            help="Requeue the dead letters, so they will be processed again",
+            action="store_true",
+        )
+        parser_shell.add_argument(
+            "--id",
+            "-i",
+            help="Only list/requeue the dead letter with this ID. May be specified multiple times",
+            metavar="DEAD_LETTER_ID",
+            dest="ids",
+            action="append",
+        )
+        self.setup_import_parameter(parser_shell)
+        parser_shell.set_defaults(func=self.handle)
+
+    def handle(self, args, config, plugin_registry: PluginRegistry):
+        self.setup_logging(args.log_level or "warning", config)
+        bus_module, bus = self.import_bus(args)
+
+        transport = bus.client.transport_registry.get_event_transport(args.api)
+        if not hasattr(transport, "dead_letters"):
+            sys.stderr.write(
+                f"Event transport {transport.__class__.__name__} does not support dead letters\n"
+            )
+            exit(1)
+
+        if args.requeue:
+            total = block(transport.requeue_dead_letters(args.api, args.event, args.ids))
+            sys.stderr.write(f"{total} dead letters requeued\n")
+        else:
+            block(self.list_dead_letters(args, transport))
+
+    async def list_dead_letters(self, args, transport: EventTransport):
+        # Compressed messages cannot be represented in JSON
+        serializer = transport.serializer.without_compression()
+        for dead_letter in await transport.dead_letters(args.api, args.event):
+            if args.ids and dead_letter["dead_letter_id"] not in args.ids:
+                continue
+            dead_letter["event_message"] = serializer(dead_letter["event_message"])
+            sys.stdout.write(json.dumps(dead_letter))
+            sys.stdout.write("\n")
+        sys.stdout.flush()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import logging
+import sys
+
+import dateutil.parser
+
+from lightbus import EventTransport
+from lightbus.commands.utilities import BusImportMixin, LogLevelMixin
+from lightbus.plugins import PluginRegistry
+from lightbus.utilities.async_tools import block
+
+logger = logging.getLogger(__name__)
+
+
+class Command(LogLevelMixin, BusImportMixin, object):
+    def setup(self, parser, subparsers):
+        parser_shell = subparsers.add_parser(
+            "dumpevents",
+            help="Dumps historical events from the bus, one JSON-encoded event per line",
+            formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+        )
+        parser_shell.add_argument(
+            "--api", "-a", help="Dump events for this API name", metavar="API_NAME", required=True
+        )
+        parser_shell.add_argument(
+            "--event",
+            "-e",
+            help="Dump events with this name. '*' will dump all events for the API",
+            metavar="EVENT_NAME",
+            default="*",
+        )
+        parser_shell.add_argument(
+            "--start",
+            help="Dump events fired at or after this ISO 8601 date/time",
+            metavar="DATETIME",
+            type=dateutil.parser.parse,
+        )
+        parser_shell.add_argument(
+            "--stop",
+            help="Dump events fired at or before this ISO 8601 date/time",
+            metavar="DATETIME",
+            type=dateutil.parser.parse,
+        )
+        parser_shell.add_argument(
+            "--slices",
+            help=(
+                "Split the time range into this many slices and fetch them concurrently. "
+                "Only supported by some transports (i.e. redis)"
+            ),
+            metavar="SLICES",
+            type=int,
+            default=1,
+        )
+        parser_shell.add_argument(
+            "--unordered",
+            help="Output events as soon as they are fetched, rather than in order. Requires --slices",
+            action="store_true",
+        )
+        parser_shell.add_argument(
+            "--output",
+            "-o",
+            help="File to write events to. If omitted events will be written to standard out",
+            metavar="FILE",
+        )
+        self.setup_import_parameter(parser_shell)
+        parser_shell.set_defaults(func=self.handle)
+
+    def handle(self, args, config, plugin_registry: PluginRegistry):
+        self.setup_logging(args.log_level or "warning", config)
+        bus_module, bus = self.import_bus(args)
+
+        transport = bus.client.transport_registry.get_event_transport(args.api)
+        f = open(args.output, "w") if args.output else sys.stdout
+        try:
+            total = block(self.dump_events(args, transport, f))
+        except KeyboardInterrupt:
+            logger.info("Stopped by user")
+            return
+        finally:
+            if args.output:
+                f.close()
+
+        if args.output:
+            sys.stderr.write(f"{total} events saved to {args.output}\n")
+
+    async def dump_events(self, args, transport: EventTransport, f) -> int:
+        options = {}
+        if args.slices > 1:
+            # Only pass these options when needed, as not all transports support them
+            options = dict(slices=args.slices, ordered=not args.unordered)
+
+        # Compressed messages cannot be represented in JSON
+        serializer = transport.serializer.without_compression()
+        total = 0
+        async for event_message in transport.history(
+            api_name=args.api, event_name=args.event, start=args.start, stop=args.stop, **options
+        ):
+            f.write(json.dumps(serializer(event_message)))
+            f.write("\n")
+            total += 1
+        return total
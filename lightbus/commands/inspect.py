@@ -1,6 +1,7 @@
 import argparse
 import json
 import logging
+import os
 import re
 from asyncio import sleep
 from hashlib import sha1
@@ -77,6 +78,16 @@ class Command(LogLevelMixin, BusImportMixin, object):
         parser_shell.add_argument(
             "--cache-only", "-c", help=("Search the local cache only"), action="store_true"
         )
+        parser_shell.add_argument(
+            "--last",
+            "-l",
+            help=(
+                "Search only the most recent LAST events. These are read newest-first "
+                "from the event transport, bypassing the local cache"
+            ),
+            metavar="LAST",
+            type=int,
+        )
         parser_shell.add_argument(
             "--follow",
             "-f",
@@ -133,6 +144,8 @@ class Command(LogLevelMixin, BusImportMixin, object):
          - Any on-disk cache
          - Reading history from the event transport
 
+        If --last is specified then only the most recent messages are read from the
+        event transport, and the cache is neither read nor written.
         """
         CACHE_PATH.mkdir(parents=True, exist_ok=True)
         event_name = event_name or "*"
@@ -148,15 +161,38 @@ class Command(LogLevelMixin, BusImportMixin, object):
         logger.debug(f"Loading from cache file {cache_file}. Exists: {cache_file.exists()}")
 
         # Sanity check
+        if args.last and args.cache_only:
+            sys.stderr.write("--last cannot be used with --cache-only\n")
+            exit(1)
+
         if not cache_file.exists() and args.cache_only:
             sys.stderr.write(
                 f"No cache file exists for {api.meta.name}.{event_name}, but --cache-only was specified\n"
             )
             exit(1)
 
-        # Start by reading from cache
         start = None
-        if cache_file.exists():
+        if args.last:
+            # Read the most recent messages, newest first, then output them in order
+            event_messages = [
+                event_message
+                async for event_message in transport.history(
+                    api_name=api.meta.name, event_name=event_name, reverse=True, limit=args.last
+                )
+            ]
+            for event_message in reversed(event_messages):
+                yield event_message
+                start = getattr(event_message, "datetime", None)
+
+            if not args.follow:
+                return
+
+            # We only have the most recent messages, so the cache would be left
+            # with a gap. Therefore don't write to it when following.
+            cache_file = Path(os.devnull)
+
+        # Start by reading from cache
+        elif cache_file.exists():
             with cache_file.open() as f:
                 for line in f:
                     event_message = transport.deserializer(json.loads(line))
@@ -178,7 +214,7 @@ class Command(LogLevelMixin, BusImportMixin, object):
 
         def _write_to_cache(f, event_message):
             logger.debug(f"Writing message {event_message.id} to cache")
-            f.write(json.dumps(transport.serializer(event_message)))
+            f.write(json.dumps(transport.serializer.without_compression()(event_message)))
             f.write("\n")
             f.flush()
 
@@ -274,7 +310,7 @@ class Command(LogLevelMixin, BusImportMixin, object):
     def output(self, args, transport: EventTransport, message: EventMessage):
         """Print out the given message"""
 
-        serialized = transport.serializer(message)
+        serialized = transport.serializer.without_compression()(message)
         if args.format == "json":
             sys.stdout.write(json.dumps(serialized))
             sys.stdout.write("\n")
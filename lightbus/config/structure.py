@@ -84,6 +84,12 @@ class OnError(Enum):
     SHUTDOWN = "shutdown"
 
 
+class EventDeduplication(Enum):
+    NONE = "none"
+    MEMORY = "memory"
+    TRANSPORT = "transport"
+
+
 class ApiValidationConfig(NamedTuple):
     outgoing: bool = True
     incoming: bool = True
@@ -101,6 +107,16 @@ class ApiConfig(object):
     #: Cast values before calling event listeners and RPCs
     cast_values: bool = True
     on_error: OnError = OnError.SHUTDOWN
+    #: How many events each event listener may process at once
+    event_listener_concurrency: int = 1
+    #: Max seconds a processed event may wait to be acknowledged along with the rest of its batch
+    event_acknowledgement_interval: float = 1
+    #: Where event listeners should record processed events, in order to skip redeliveries
+    event_deduplication: EventDeduplication = EventDeduplication.NONE
+    #: Seconds for which processed events are remembered
+    event_deduplication_ttl: float = 3600
+    #: Max number of processed events each listener remembers when using memory deduplication
+    event_deduplication_max_size: int = 10000
 
     def __init__(self, **kw):
         for k, v in kw.items():
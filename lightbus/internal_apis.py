@@ -20,6 +20,7 @@ class LightbusStateApi(Api):
             "listening_for",
             "timestamp",
             "ping_interval",
+            "consumer_lag",
         ]
     )
     server_stopped = Event(parameters=["process_name", "timestamp"])
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence
 
 from lightbus import BusClient
 from lightbus.exceptions import (
@@ -123,6 +123,28 @@ class BusPath(object):
             timeout=self.client.config.api(self.api_name).event_fire_timeout,
         )
 
+    async def fire_many_async(self, kwargs_list: Sequence[dict], *, bus_options: dict = None):
+        """Fire this event once for each set of kwargs in `kwargs_list`
+
+        The events will be sent in bulk where the event transport supports it.
+        For example:
+
+            await bus.auth.user_created.fire_many_async([
+                {'username': 'adam', 'email': 'adam@example.com'},
+                {'username': 'sam', 'email': 'sam@example.com'},
+            ])
+        """
+        return await self.client.fire_events(
+            events=[(self.api_name, self.name, kwargs) for kwargs in kwargs_list],
+            options=bus_options,
+        )
+
+    def fire_many(self, kwargs_list: Sequence[dict], *, bus_options: dict = None):
+        return block(
+            self.fire_many_async(kwargs_list, bus_options=bus_options),
+            timeout=self.client.config.api(self.api_name).event_fire_timeout,
+        )
+
     # Utilities
 
     def ancestors(self, include_self=False):
@@ -30,7 +30,9 @@ class StatePlugin(LightbusPlugin):
     This plugin provides coarse monitoring in the following form:
 
       - Server started events
-      - Server ping events - indicate the server is alive. Sent every 60 seconds by default
+      - Server ping events - indicate the server is alive. Sent every 60 seconds by default.
+        Also include the backlog of each event listener (see `BusClient.consumer_lag()`),
+        or None if the backlog could not be determined
       - Server shutdown events
       - Metrics enabled/disabled
       - Api registered/deregistered
@@ -130,11 +132,19 @@ class StatePlugin(LightbusPlugin):
         event_transport = client.transport_registry.get_event_transport("internal.metrics")
         while True:
             await asyncio.sleep(self.ping_interval)
+            try:
+                consumer_lag = await client.consumer_lag()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Still send the ping, as this server is alive even if we cannot get its backlog
+                logger.exception(f"Failed to get consumer lag for server ping: {e}")
+                consumer_lag = None
             await event_transport.send_event(
                 EventMessage(
                     api_name="internal.state",
                     event_name="server_ping",
-                    kwargs=self.get_state_kwargs(client),
+                    kwargs=dict(self.get_state_kwargs(client), consumer_lag=consumer_lag),
                 ),
                 options={},
                 bus_client=client,
@@ -1,6 +1,10 @@
+import bz2
+import copy
 import inspect
 import json
-from typing import Union, TypeVar, Type
+import lzma
+import zlib
+from typing import Union, TypeVar, Type, Optional
 
 from lightbus.exceptions import InvalidMessage, InvalidSerializerConfiguration
 from lightbus.schema.encoder import json_encode
@@ -31,16 +35,64 @@ def sanity_check_metadata(message_class, metadata):
             )
 
 
+# Compression algorithms which may be used by the serializers.
+# Keys are algorithm names, values are (compress, decompress) functions
+COMPRESSION_ALGORITHMS = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "bz2": (bz2.compress, bz2.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def compress(algorithm: str, data: bytes) -> bytes:
+    return COMPRESSION_ALGORITHMS[algorithm][0](data)
+
+
+def decompress(algorithm: str, data: bytes) -> bytes:
+    try:
+        return COMPRESSION_ALGORITHMS[algorithm][1](data)
+    except KeyError:
+        raise InvalidMessage(
+            "Message was compressed using unsupported compression algorithm '{}'. "
+            "Supported algorithms are: {}".format(algorithm, ", ".join(COMPRESSION_ALGORITHMS))
+        )
+
+
 SerialisedData = TypeVar("SerialisedData")
 
 
 class MessageSerializer(object):
-    def __init__(self, encoder=json_encode):
+    def __init__(
+        self, encoder=json_encode, compression: Optional[str] = None, compression_threshold=1024
+    ):
+        """Serialize messages
+
+        If `compression` is specified then message data (i.e. kwargs) which
+        serializes to at least `compression_threshold` characters will be
+        compressed using the given algorithm. See COMPRESSION_ALGORITHMS.
+        """
+        if compression and compression not in COMPRESSION_ALGORITHMS:
+            raise InvalidSerializerConfiguration(
+                "Unsupported compression algorithm '{}'. Supported algorithms are: {}".format(
+                    compression, ", ".join(COMPRESSION_ALGORITHMS)
+                )
+            )
         self.encoder = encoder
+        self.compression = compression
+        self.compression_threshold = compression_threshold
 
     def __call__(self, message: "lightbus.Message") -> SerialisedData:
         raise NotImplementedError()
 
+    def without_compression(self) -> "MessageSerializer":
+        """Get a copy of this serializer which never compresses
+
+        Useful for producing human-readable output
+        """
+        serializer = copy.copy(self)
+        serializer.compression = None
+        return serializer
+
 
 class MessageDeserializer(object):
     def __init__(self, message_class: Type["lightbus.Message"], decoder=json.loads):
@@ -2,6 +2,11 @@
 
 These serializers handle moving data to/from a string-based format.
 
+If compression is enabled and the serialized message is sufficiently large,
+it is compressed and prefixed by a marker specifying the compression algorithm.
+For example: b'\x00zlib\x00x\x9c\xabVJ...'. JSON-encoded messages never start
+with a null byte, so uncompressed messages are unaffected.
+
 """
 from typing import Union
 
@@ -11,15 +16,29 @@ from lightbus.serializers.base import (
     sanity_check_metadata,
     MessageSerializer,
     MessageDeserializer,
+    compress,
+    decompress,
 )
 
+COMPRESSION_MARKER = b"\x00"
+
 
 class BlobMessageSerializer(MessageSerializer):
 
-    def __call__(self, message: "lightbus.Message") -> str:
+    def __call__(self, message: "lightbus.Message") -> Union[str, bytes]:
         # self.encoder will typically be a json encoder, or something similar.
         # Therefore here we just return a json encoded stricture including metadata & kwargs.
-        return self.encoder({"metadata": message.get_metadata(), "kwargs": message.get_kwargs()})
+        serialized = self.encoder(
+            {"metadata": message.get_metadata(), "kwargs": message.get_kwargs()}
+        )
+        if self.compression and len(serialized) >= self.compression_threshold:
+            return (
+                COMPRESSION_MARKER
+                + self.compression.encode("utf8")
+                + COMPRESSION_MARKER
+                + compress(self.compression, serialized.encode("utf8"))
+            )
+        return serialized
 
 
 class BlobMessageDeserializer(MessageDeserializer):
@@ -31,6 +50,10 @@ class BlobMessageDeserializer(MessageDeserializer):
         # json which has already been decoded.
         if isinstance(serialized, dict):
             decoded = serialized
+        elif isinstance(serialized, bytes) and serialized.startswith(COMPRESSION_MARKER):
+            compression, compressed = serialized[1:].split(COMPRESSION_MARKER, 1)
+            serialized = decompress(decode_bytes(compression), compressed)
+            decoded = self.decoder(decode_bytes(serialized))
         else:
             serialized = decode_bytes(serialized)
             decoded = self.decoder(serialized)
@@ -13,6 +13,13 @@ format. The format looks like this::
     kw:username: '"admin"'
     kw:password: '"secret"'
 
+If compression is enabled and the encoded kwargs are sufficiently large, the kwargs
+fields are replaced by a single field containing all the kwargs, encoded and then
+compressed. A marker field specifies the compression algorithm::
+
+    compression: 'zlib'
+    kwargs: b'x\x9c\xabVJ...'
+
 """
 
 import lightbus  # pylint: disable=unused-import
@@ -21,6 +28,8 @@ from lightbus.serializers import (
     sanity_check_metadata,
     MessageSerializer,
     MessageDeserializer,
+    compress,
+    decompress,
 )
 
 
@@ -31,7 +40,16 @@ class ByFieldMessageSerializer(MessageSerializer):
         See the module-level docs (above) for further details
         """
         serialized = message.get_metadata()
-        for k, v in message.get_kwargs().items():
+        kwargs = message.get_kwargs()
+
+        if self.compression:
+            encoded = self.encoder(kwargs)
+            if len(encoded) >= self.compression_threshold:
+                serialized["compression"] = self.compression
+                serialized["kwargs"] = compress(self.compression, encoded.encode("utf8"))
+                return serialized
+
+        for k, v in kwargs.items():
             serialized[":{}".format(k)] = self.encoder(v)
         return serialized
 
@@ -45,8 +63,14 @@ class ByFieldMessageDeserializer(MessageDeserializer):
         metadata = {}
         kwargs = {}
 
+        serialized = {decode_bytes(k): v for k, v in serialized.items()}
+        if "compression" in serialized:
+            # All kwargs have been encoded & compressed into a single field
+            compression = decode_bytes(serialized.pop("compression"))
+            encoded = decompress(compression, serialized.pop("kwargs", b""))
+            kwargs = self.decoder(encoded.decode("utf8"))
+
         for k, v in serialized.items():
-            k = decode_bytes(k)
             v = decode_bytes(v)
 
             if not k:
@@ -120,6 +120,17 @@ class EventTransport(Transport):
         """Publish an event"""
         raise NotImplementedError()
 
+    async def send_events(
+        self, event_messages: Sequence[EventMessage], options: dict, bus_client: "BusClient"
+    ):
+        """Publish multiple events
+
+        Transports may override this in order to publish the events in bulk.
+        The default implementation simply calls send_event() for each message.
+        """
+        for event_message in event_messages:
+            await self.send_event(event_message, options=options, bus_client=bus_client)
+
     async def consume(
         self,
         listen_for: List[Tuple[str, str]],
@@ -156,12 +167,46 @@ class EventTransport(Transport):
         start: datetime = None,
         stop: datetime = None,
         start_inclusive: bool = True,
+        reverse: bool = False,
+        limit: int = None,
     ) -> AsyncGenerator[EventMessage, None]:
-        """Return EventMessages for the given api/event names during the (optionally) given date range"""
+        """Return EventMessages for the given api/event names during the (optionally) given date range
+
+        Messages should be returned newest-first if `reverse` is true, and no more than
+        `limit` messages should be returned if a limit is specified.
+        """
         raise NotImplementedError(
             f"Event transport {self.__class__.__name__} does not support event history."
         )
 
+    async def consumer_lag(self) -> List[dict]:
+        """Get the backlog of events awaiting the listeners consuming from this transport
+
+        Transports which cannot report this should return an empty list. See
+        `RedisEventTransport.consumer_lag()` for the format of the returned dictionaries.
+        """
+        return []
+
+    async def get_processed_event_ids(
+        self, event_messages: Sequence[EventMessage], listener_name: str
+    ) -> Set[str]:
+        """Get the IDs of any of the given events which the listener has already processed
+
+        Used to skip redelivered events when the `event_deduplication` API config
+        is set to `transport`. See mark_processed(). Transports which cannot
+        track processed events should return an empty set.
+        """
+        return set()
+
+    async def mark_processed(
+        self, event_messages: Sequence[EventMessage], listener_name: str, ttl: float
+    ):
+        """Record that the listener has processed the given events
+
+        These should be remembered for at least `ttl` seconds. See get_processed_event_ids()
+        """
+        pass
+
     def _sanity_check_listen_for(self, listen_for):
         """Utility method to sanity check the `listen_for` parameter.
 
@@ -95,8 +95,11 @@ class DebugEventTransport(EventTransport):
         start: datetime = None,
         stop: datetime = None,
         start_inclusive: bool = True,
+        reverse: bool = False,
+        limit: int = None,
     ) -> AsyncGenerator[EventMessage, None]:
-        yield self._get_fake_message()
+        if limit is None or limit > 0:
+            yield self._get_fake_message()
 
     def _get_fake_message(self):
         message = EventMessage(
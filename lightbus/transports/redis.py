@@ -1,16 +1,35 @@
 import asyncio
+import binascii
 import calendar
+import heapq
+import itertools
 import json
 import logging
+import math
 import time
-from collections import OrderedDict
-from datetime import datetime, timezone
-from typing import Sequence, Optional, Union, Dict, Mapping, List, Container, AsyncGenerator, Tuple
+import zlib
+from collections import OrderedDict, Counter
+from datetime import datetime, timezone, timedelta
+from typing import (
+    Sequence,
+    Optional,
+    Union,
+    Dict,
+    Mapping,
+    List,
+    Container,
+    AsyncGenerator,
+    Tuple,
+    Any,
+    Set,
+)
 from enum import Enum
+from hashlib import sha1
 
 import aioredis
 from aioredis import Redis, ReplyError, ConnectionClosedError, PipelineError
 from aioredis.pool import ConnectionsPool
+from aioredis.commands.streams import fields_to_dict
 from aioredis.util import decode
 
 from lightbus.api import Api
@@ -36,9 +55,161 @@ logger = logging.getLogger(__name__)
 Since = Union[str, datetime, None]
 
 
+# Reads new messages for a consumer group, acknowledging (and so skipping over) any
+# messages for events which are not wanted. This saves transferring and deserializing
+# unwanted messages when many events share a stream. Up to `count` wanted messages
+# are read, but never more than `count * 10` messages in total, so the script
+# cannot run for too long. If no event names are given then all messages are wanted.
+#
+#   KEYS: The streams to read from
+#   ARGV: consumer group, consumer name, count, wanted event names...
+#
+# Returns {messages, drained, last_ids}. Messages are {stream, message ID, fields}.
+# If the streams have been drained of new messages, then last_ids contains the
+# ID of the last message in each stream.
+FILTERED_READ_SCRIPT = """
+local group, consumer, count = ARGV[1], ARGV[2], tonumber(ARGV[3])
+local filtered = #ARGV >= 4
+local wanted = {}
+for i = 4, #ARGV do
+    wanted[ARGV[i]] = true
+end
+
+local messages = {}
+local drained = false
+local total_read = 0
+while #messages < count and not drained and total_read < count * 10 do
+    local read_args = {'XREADGROUP', 'GROUP', group, consumer, 'COUNT', count, 'STREAMS'}
+    for _, stream in ipairs(KEYS) do
+        table.insert(read_args, stream)
+    end
+    for _ = 1, #KEYS do
+        table.insert(read_args, '>')
+    end
+
+    drained = true
+    for _, stream_result in ipairs(redis.call(unpack(read_args)) or {}) do
+        local stream, entries = stream_result[1], stream_result[2]
+        if #entries >= count then
+            drained = false
+        end
+        local unwanted_ids = {}
+        for _, entry in ipairs(entries) do
+            total_read = total_read + 1
+            local message_id, fields = entry[1], entry[2]
+            local event_name = nil
+            if fields then
+                for i = 1, #fields, 2 do
+                    if fields[i] == 'event_name' then
+                        event_name = fields[i + 1]
+                    end
+                end
+            end
+            if not filtered or event_name == nil or wanted[event_name] then
+                -- Messages without an event name are passed on, and will be dealt with as usual
+                table.insert(messages, {stream, message_id, fields or {}})
+            else
+                table.insert(unwanted_ids, message_id)
+            end
+        end
+        if #unwanted_ids > 0 then
+            redis.call('XACK', stream, group, unpack(unwanted_ids))
+        end
+    end
+end
+
+local last_ids = {}
+if drained then
+    for _, stream in ipairs(KEYS) do
+        local last = redis.call('XREVRANGE', stream, '+', '-', 'COUNT', 1)
+        table.insert(last_ids, last[1] and last[1][1] or '0-0')
+    end
+end
+
+return {messages, drained and 1 or 0, last_ids}
+"""
+FILTERED_READ_SCRIPT_SHA = sha1(FILTERED_READ_SCRIPT.encode("utf8")).hexdigest()
+
+
+# Moves scheduled events which are now due from the scheduled sorted set onto the
+# stream. Each event's fields are stored in the bodies hash, keyed by the event's ID
+# (see encode_scheduled_fields()). Events are added to the stream and removed from
+# the schedule atomically, so many consumers can run this concurrently without
+# delivering events twice.
+#
+#   KEYS: The scheduled sorted set, the stream, the scheduled bodies hash
+#   ARGV: current timestamp, count, max stream length (0 for unlimited)
+#
+# Returns {number of events moved, timestamp at which the next event is due (or nil)}
+MOVE_SCHEDULED_SCRIPT = """
+local scheduled, stream, bodies = KEYS[1], KEYS[2], KEYS[3]
+local max_len = tonumber(ARGV[3])
+local due = redis.call('ZRANGEBYSCORE', scheduled, '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, event_id in ipairs(due) do
+    local encoded = redis.call('HGET', bodies, event_id)
+    if encoded then
+        -- Decode the length-prefixed fields
+        local fields, pos = {}, 1
+        while pos <= #encoded do
+            local separator = string.find(encoded, ':', pos, true)
+            local length = tonumber(string.sub(encoded, pos, separator - 1))
+            table.insert(fields, string.sub(encoded, separator + 1, separator + length))
+            pos = separator + length + 1
+        end
+        if max_len > 0 then
+            redis.call('XADD', stream, 'MAXLEN', '~', max_len, '*', unpack(fields))
+        else
+            redis.call('XADD', stream, '*', unpack(fields))
+        end
+        redis.call('HDEL', bodies, event_id)
+    end
+    redis.call('ZREM', scheduled, event_id)
+end
+
+local next_due = redis.call('ZRANGE', scheduled, 0, 0, 'WITHSCORES')[2]
+return {#due, next_due or false}
+"""
+MOVE_SCHEDULED_SCRIPT_SHA = sha1(MOVE_SCHEDULED_SCRIPT.encode("utf8")).hexdigest()
+
+
+# Adds an event to a stream, unless an event with the same idempotency key has
+# been added within the idempotency window. The check and the add happen
+# atomically, so concurrent retries cannot both succeed.
+#
+#   KEYS: The idempotency key, the stream
+#   ARGV: window in milliseconds, max stream length (0 for unlimited), fields...
+#
+# Returns the ID of the added message, or nil if the event was a duplicate
+IDEMPOTENT_XADD_SCRIPT = """
+local idempotency_key, stream = KEYS[1], KEYS[2]
+local max_len = tonumber(ARGV[2])
+if not redis.call('SET', idempotency_key, 1, 'NX', 'PX', ARGV[1]) then
+    return false
+end
+if max_len > 0 then
+    return redis.call('XADD', stream, 'MAXLEN', '~', max_len, '*', unpack(ARGV, 3))
+else
+    return redis.call('XADD', stream, '*', unpack(ARGV, 3))
+end
+"""
+IDEMPOTENT_XADD_SCRIPT_SHA = sha1(IDEMPOTENT_XADD_SCRIPT.encode("utf8")).hexdigest()
+
+
+# Added to dead letters which have been requeued, naming the only consumer group which
+# should process them. See RedisEventTransport.requeue_dead_letters()
+REQUEUED_FOR_FIELD = b"dead_letter:requeued_for"
+
+
+# Prefixes the key of an RPC message's claim check, in place of the serialized message.
+# See RedisRpcTransport._call_rpc()
+RPC_CLAIM_CHECK_MARKER = b"\x00claim_check\x00"
+
+
 class StreamUse(Enum):
     PER_API = "per_api"
     PER_EVENT = "per_event"
+    # Each API's events are spread across `partition_count` streams
+    PER_PARTITION = "per_partition"
 
     def __eq__(self, other):
         if isinstance(other, str):
@@ -69,6 +240,11 @@ class RedisEventMessage(EventMessage):
 class RedisTransportMixin(object):
     connection_parameters: dict = {"address": "redis://localhost:6379", "maxsize": 100}
     _redis_pool = None
+    # Lay out keys for use with Redis Cluster. See hash_tag()
+    cluster_mode = False
+    # The maximum number of connections for blocking commands (None for unlimited).
+    # See blocking_connection_manager()
+    max_blocking_connections: Optional[int] = 100
 
     def set_redis_pool(
         self,
@@ -78,6 +254,14 @@ class RedisTransportMixin(object):
     ):
         self._redis_pool = None
         self._closed = False
+        # Connections dedicated to blocking commands. See blocking_connection_manager()
+        self._idle_blocking_connections: List[Redis] = []
+        self._active_blocking_connections: List[Redis] = []
+        self._blocking_connections_semaphore: Optional[asyncio.Semaphore] = None
+        # The Redis client ID of each blocking connection, used to unblock them
+        self._blocking_connection_ids: Dict[Redis, int] = {}
+        # Tasks unblocking connections upon which a command was cancelled
+        self._blocking_reset_tasks: Set[asyncio.Future] = set()
 
         if not redis_pool:
             # Connect lazily using the provided parameters
@@ -123,6 +307,12 @@ class RedisTransportMixin(object):
             self._redis_pool = redis_pool
 
     async def connection_manager(self) -> Redis:
+        """Get a connection from the pool, for use as a context manager
+
+        Commands issued concurrently upon a single connection (i.e. using
+        ``asyncio.gather()``) are pipelined by aioredis, and so will be sent to Redis
+        in a single round trip.
+        """
         if self._closed:
             # This was first caught when the state plugin tried to send a
             # message to the bus on upon the after_server_stopped stopped event.
@@ -139,10 +329,12 @@ class RedisTransportMixin(object):
                 if internal_pool.size == internal_pool.maxsize:
                     logging.critical(
                         "Redis pool has reached maximum size. It is possible that this will recover normally, "
-                        "but may be you have more event listeners than connections available to the Redis pool. "
+                        "but may be you are running more concurrent commands than there are connections "
+                        "available to the Redis pool. "
                         "You can increase the redis pool size by specifying the `maxsize` "
-                        "parameter in each of the Redis transport configuration sections. Current maxsize is: {}"
-                        "".format(self.connection_parameters.get("maxsize"))
+                        "parameter in each of the Redis transport configuration sections. Current maxsize is: {}. "
+                        "Current usage is: {}"
+                        "".format(self.connection_parameters.get("maxsize"), self.connection_usage())
                     )
 
             return await self._redis_pool
@@ -151,10 +343,165 @@ class RedisTransportMixin(object):
                 "Redis connection pool has been closed. Assuming shutdown in progress."
             )
 
+    async def blocking_connection_manager(self) -> "BlockingConnection":
+        """Get a dedicated connection for performing a blocking command
+
+        Blocking commands (such as BLPOP, or XREADGROUP with BLOCK) can tie up a
+        connection for an extended period. These commands therefore use their own
+        connections rather than those in the pool, so they cannot starve other
+        commands of connections. Dedicated connections are created as needed,
+        and are reused once released. No more than `max_blocking_connections`
+        will be in use at once, further callers will wait for a connection
+        to be released.
+
+        Use as follows:
+
+            with await self.blocking_connection_manager() as redis:
+                await redis.blpop(...)
+        """
+        if self._closed:
+            raise TransportIsClosed(
+                "Transport has been closed. Connection to Redis is no longer available."
+            )
+
+        if self.max_blocking_connections:
+            if not self._blocking_connections_semaphore:
+                self._blocking_connections_semaphore = asyncio.Semaphore(
+                    self.max_blocking_connections
+                )
+            if self._blocking_connections_semaphore.locked():
+                logger.warning(
+                    L(
+                        "All {} connections for blocking commands are in use. Waiting for one "
+                        "to be released. You can increase this limit using the "
+                        "`max_blocking_connections` option. Current usage is: {}",
+                        Bold(self.max_blocking_connections),
+                        self.connection_usage(),
+                    )
+                )
+            await self._blocking_connections_semaphore.acquire()
+
+        redis = None
+        try:
+            if self._closed:
+                raise TransportIsClosed(
+                    "Transport has been closed. Connection to Redis is no longer available."
+                )
+
+            while self._idle_blocking_connections and not redis:
+                redis = self._idle_blocking_connections.pop()
+                if redis.closed:
+                    self._blocking_connection_ids.pop(redis, None)
+                    redis = None
+
+            if not redis:
+                # The pool parameters are not applicable to individual connections
+                parameters = {
+                    k: v
+                    for k, v in self.connection_parameters.items()
+                    if k not in ("minsize", "maxsize")
+                }
+                redis = await aioredis.create_redis(**parameters)
+                self._blocking_connection_ids[redis] = await redis.execute(b"CLIENT", b"ID")
+                logger.debug(
+                    L(
+                        "Created new connection for blocking commands. Current usage is: {}",
+                        self.connection_usage(),
+                    )
+                )
+        except BaseException:
+            if redis:
+                self._blocking_connection_ids.pop(redis, None)
+                redis.close()
+            if self._blocking_connections_semaphore:
+                self._blocking_connections_semaphore.release()
+            raise
+
+        self._active_blocking_connections.append(redis)
+        return BlockingConnection(self, redis)
+
+    def release_blocking_connection(self, redis: Redis, reusable=True, cancelled=False):
+        """Release a connection obtained from blocking_connection_manager()
+
+        A connection upon which a command was `cancelled` may still be blocked within
+        Redis. It is therefore unblocked before being reused. See _reset_blocking_connection()
+        """
+        if redis not in self._active_blocking_connections:
+            # The connection was closed along with the transport
+            redis.close()
+            return
+
+        if cancelled and not self._closed and not redis.closed:
+            task = asyncio.ensure_future(self._reset_blocking_connection(redis))
+            self._blocking_reset_tasks.add(task)
+            task.add_done_callback(self._blocking_reset_tasks.discard)
+            return
+
+        self._active_blocking_connections.remove(redis)
+        if self._blocking_connections_semaphore:
+            self._blocking_connections_semaphore.release()
+        if reusable and not self._closed and not redis.closed:
+            self._idle_blocking_connections.append(redis)
+        else:
+            self._blocking_connection_ids.pop(redis, None)
+            redis.close()
+
+    async def _reset_blocking_connection(self, redis: Redis):
+        """Unblock a connection upon which a blocking command was cancelled, then release it
+
+        The connection remains in use until any reply to the cancelled command has
+        been received. Should this fail, the connection is closed instead.
+        """
+        reusable = False
+        try:
+            with await self.connection_manager() as pool_redis:
+                await pool_redis.execute(
+                    b"CLIENT", b"UNBLOCK", self._blocking_connection_ids[redis]
+                )
+            # Replies are received in order, so once we have the reply to
+            # the PING we know the cancelled command has also completed
+            await asyncio.wait_for(redis.ping(), timeout=5)
+            reusable = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Failed to reset cancelled blocking connection, closing it: {e}")
+        finally:
+            self.release_blocking_connection(redis, reusable=reusable)
+
+    def connection_usage(self) -> Dict[str, Dict[str, int]]:
+        """Get the number of connections in use, for both regular and blocking commands"""
+        usage = {}
+        internal_pool = self._redis_pool._pool_or_conn if self._redis_pool else None
+        if isinstance(internal_pool, ConnectionsPool):
+            usage["pool"] = dict(
+                in_use=internal_pool.size - internal_pool.freesize,
+                size=internal_pool.size,
+                maxsize=internal_pool.maxsize,
+            )
+        usage["blocking"] = dict(
+            in_use=len(self._active_blocking_connections),
+            size=len(self._active_blocking_connections) + len(self._idle_blocking_connections),
+            maxsize=self.max_blocking_connections,
+        )
+        return usage
+
     async def close(self):
         self._closed = True
         if self._redis_pool:
             await self._close_redis_pool()
+        await self._close_blocking_connections()
+
+    async def _close_blocking_connections(self):
+        await cancel(*self._blocking_reset_tasks)
+        connections = self._idle_blocking_connections + self._active_blocking_connections
+        self._idle_blocking_connections = []
+        self._active_blocking_connections = []
+        self._blocking_connection_ids = {}
+        for redis in connections:
+            redis.close()
+        for redis in connections:
+            await redis.wait_closed()
 
     async def _close_redis_pool(self):
         self._redis_pool.close()
@@ -165,6 +512,31 @@ class RedisTransportMixin(object):
         # a call to `await asyncio.sleep(0.001)` does the trick
         del self._redis_pool
 
+    def hash_tag(self, value: str) -> str:
+        """Wrap the given part of a key in a hash tag when in cluster mode
+
+        Redis Cluster only hashes the part of a key within the tag (i.e. `{my.api}`),
+        so keys which are used together by multi-key commands and pipelines
+        will be stored upon the same node.
+        """
+        return f"{{{value}}}" if self.cluster_mode else value
+
+    def group_by_slot(self, items: Sequence, key=None) -> List[list]:
+        """Group the given keys (or items, with `key` returning their Redis key) by cluster slot
+
+        Commands within each group can be sent within a single pipeline or multi-key
+        command. Outside of cluster mode all items are returned as a single group.
+        """
+        items = list(items)
+        if not self.cluster_mode or not items:
+            return [items] if items else []
+
+        groups = OrderedDict()
+        for item in items:
+            slot = redis_key_slot(key(item) if key else item)
+            groups.setdefault(slot, []).append(item)
+        return list(groups.values())
+
     def __str__(self):
         if self._redis_pool:
             conn = self._redis_pool.connection
@@ -173,6 +545,29 @@ class RedisTransportMixin(object):
             return self.connection_parameters.get("address", "Unknown URL")
 
 
+class BlockingConnection(object):
+    """Context manager for a connection provided by blocking_connection_manager()
+
+    The connection is returned for reuse upon exit. However, if an exception was
+    raised the state of the connection is unknown, and it will be closed instead.
+    Connections upon which a command was cancelled are unblocked and then reused.
+    """
+
+    def __init__(self, transport: RedisTransportMixin, redis: Redis):
+        self.transport = transport
+        self.redis = redis
+
+    def __enter__(self) -> Redis:
+        return self.redis
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.transport.release_blocking_connection(
+            self.redis,
+            reusable=exc_type is None,
+            cancelled=exc_type is not None and issubclass(exc_type, asyncio.CancelledError),
+        )
+
+
 class RedisRpcTransport(RedisTransportMixin, RpcTransport):
     """ Redis RPC transport providing at-most-once delivery
 
@@ -183,6 +578,9 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
     key expires it should be assumed that the RPC call has timed
     out and that therefore is should be discarded rather than
     be processed.
+
+    Messages larger than `claim_check_threshold` are stored under their
+    own key, and only a reference to that key is pushed onto the list.
     """
 
     def __init__(
@@ -197,6 +595,9 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
         rpc_timeout=5,
         rpc_retry_delay=1,
         consumption_restart_delay=5,
+        claim_check_threshold: Optional[int] = None,
+        cluster_mode: bool = False,
+        max_blocking_connections: Optional[int] = 100,
     ):
         self.set_redis_pool(redis_pool, url, connection_parameters)
         self._latest_ids = {}
@@ -206,6 +607,9 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
         self.rpc_timeout = rpc_timeout
         self.rpc_retry_delay = rpc_retry_delay
         self.consumption_restart_delay = consumption_restart_delay
+        self.claim_check_threshold = claim_check_threshold
+        self.cluster_mode = cluster_mode
+        self.max_blocking_connections = max_blocking_connections
 
     @classmethod
     def from_config(
@@ -219,8 +623,13 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
         rpc_timeout: int = 5,
         rpc_retry_delay: int = 1,
         consumption_restart_delay: int = 5,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        claim_check_threshold: Optional[int] = None,
+        cluster_mode: bool = False,
+        max_blocking_connections: Optional[int] = 100,
     ):
-        serializer = import_from_string(serializer)()
+        serializer = make_serializer(serializer, compression, compression_threshold)
         deserializer = import_from_string(deserializer)(RpcMessage)
 
         return cls(
@@ -231,11 +640,14 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
             batch_size=batch_size,
             rpc_timeout=rpc_timeout,
             consumption_restart_delay=consumption_restart_delay,
+            claim_check_threshold=claim_check_threshold or None,
+            cluster_mode=cluster_mode,
+            max_blocking_connections=max_blocking_connections or None,
         )
 
     async def call_rpc(self, rpc_message: RpcMessage, options: dict, bus_client: "BusClient"):
-        queue_key = f"{rpc_message.api_name}:rpc_queue"
-        expiry_key = f"rpc_expiry_key:{rpc_message.id}"
+        queue_key = self._get_queue_key(rpc_message.api_name)
+        expiry_key = self._get_expiry_key(rpc_message)
         logger.debug(
             LBullets(
                 L("Enqueuing message {} in Redis list {}", Bold(rpc_message), Bold(queue_key)),
@@ -265,9 +677,17 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
         )
 
     async def _call_rpc(self, rpc_message: RpcMessage, queue_key, expiry_key):
+        serialized = self.serializer(rpc_message)
         with await self.connection_manager() as redis:
             p = redis.pipeline()
-            p.rpush(key=queue_key, value=self.serializer(rpc_message))
+            if self.claim_check_threshold and len(serialized) >= self.claim_check_threshold:
+                # Store the message under its own key, and only enqueue a reference to it.
+                # The key expires along with the call
+                claim_check_key = f"{queue_key}:claim_check:{rpc_message.id}"
+                p.set(claim_check_key, serialized)
+                p.expire(claim_check_key, timeout=self.rpc_timeout)
+                serialized = RPC_CLAIM_CHECK_MARKER + claim_check_key.encode("utf8")
+            p.rpush(key=queue_key, value=serialized)
             p.set(expiry_key, 1)
             # TODO: Ditch this somehow. We kind of need the ApiConfig here, but a transports can be
             #       used for multiple APIs. So we could pass it in for each use of the transports,
@@ -297,7 +717,7 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
 
     async def _consume_rpcs(self, apis: Sequence[Api]) -> Sequence[RpcMessage]:
         # Get the name of each list queue
-        queue_keys = ["{}:rpc_queue".format(api.meta.name) for api in apis]
+        queue_keys = [self._get_queue_key(api.meta.name) for api in apis]
 
         logger.debug(
             LBullets(
@@ -306,9 +726,9 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
             )
         )
 
-        with await self.connection_manager() as redis:
+        with await self.blocking_connection_manager() as redis:
             try:
-                stream, data = await redis.blpop(*queue_keys)
+                stream, data = await self._blpop(redis, queue_keys)
             except RuntimeError:
                 # For some reason aio-redis likes to eat the CancelledError and
                 # turn it into a Runtime error:
@@ -318,8 +738,24 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
                 )
 
             stream = decode(stream, "utf8")
+            # The data will already be decoded if the pool has an encoding set. We
+            # don't decode bytes here, as compressed messages are not valid utf8
+            marker = RPC_CLAIM_CHECK_MARKER
+            if isinstance(data, str):
+                marker = decode(marker, "utf8")
+            if data.startswith(marker):
+                claim_check_key = data[len(marker) :]
+                p = redis.pipeline()
+                p.get(claim_check_key)
+                p.delete(claim_check_key)
+                data, _ = await p.execute()
+                if data is None:
+                    # The call has timed out
+                    logger.debug(f"RPC claim check {decode(claim_check_key, 'utf8')} has expired")
+                    return []
+
             rpc_message = self.deserializer(data)
-            expiry_key = f"rpc_expiry_key:{rpc_message.id}"
+            expiry_key = self._get_expiry_key(rpc_message)
             key_deleted = await redis.delete(expiry_key)
 
             if not key_deleted:
@@ -334,6 +770,31 @@ class RedisRpcTransport(RedisTransportMixin, RpcTransport):
 
             return [rpc_message]
 
+    async def _blpop(self, redis, queue_keys: List[str]) -> Tuple[bytes, bytes]:
+        """Pop a message from the first of the given queues to have one available
+
+        A single BLPOP can only wait upon keys within the same cluster slot. If the
+        queues span several slots we wait upon each slot's queues in turn.
+        """
+        slot_groups = self.group_by_slot(queue_keys)
+        if len(slot_groups) == 1:
+            return await redis.blpop(*queue_keys)
+
+        while True:
+            for keys in slot_groups:
+                result = await redis.blpop(*keys, timeout=1)
+                if result:
+                    return result
+
+    def _get_queue_key(self, api_name: str) -> str:
+        return f"{self.hash_tag(api_name)}:rpc_queue"
+
+    def _get_expiry_key(self, rpc_message: RpcMessage) -> str:
+        if self.cluster_mode:
+            # Keep the expiry key in the same slot as the queue, so they can be pipelined
+            return f"rpc_expiry_key:{self.hash_tag(rpc_message.api_name)}:{rpc_message.id}"
+        return f"rpc_expiry_key:{rpc_message.id}"
+
 
 class RedisResultTransport(RedisTransportMixin, ResultTransport):
     def __init__(
@@ -346,6 +807,7 @@ class RedisResultTransport(RedisTransportMixin, ResultTransport):
         connection_parameters: Mapping = frozendict(maxsize=100),
         result_ttl=60,
         rpc_timeout=5,
+        max_blocking_connections: Optional[int] = 100,
     ):
         # NOTE: We use the blob message_serializer here, as the results come back as values in a list
         self.set_redis_pool(redis_pool, url, connection_parameters)
@@ -353,6 +815,7 @@ class RedisResultTransport(RedisTransportMixin, ResultTransport):
         self.deserializer = deserializer
         self.result_ttl = result_ttl
         self.rpc_timeout = rpc_timeout
+        self.max_blocking_connections = max_blocking_connections
 
     @classmethod
     def from_config(
@@ -364,8 +827,11 @@ class RedisResultTransport(RedisTransportMixin, ResultTransport):
         connection_parameters: Mapping = frozendict(maxsize=100),
         result_ttl=60,
         rpc_timeout=5,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        max_blocking_connections: Optional[int] = 100,
     ):
-        serializer = import_from_string(serializer)()
+        serializer = make_serializer(serializer, compression, compression_threshold)
         deserializer = import_from_string(deserializer)(ResultMessage)
 
         return cls(
@@ -375,6 +841,7 @@ class RedisResultTransport(RedisTransportMixin, ResultTransport):
             connection_parameters=connection_parameters,
             result_ttl=result_ttl,
             rpc_timeout=rpc_timeout,
+            max_blocking_connections=max_blocking_connections or None,
         )
 
     def get_return_path(self, rpc_message: RpcMessage) -> str:
@@ -420,7 +887,7 @@ class RedisResultTransport(RedisTransportMixin, ResultTransport):
         logger.debug(L("Awaiting Redis result for RPC message: {}", Bold(rpc_message)))
         redis_key = self._parse_return_path(return_path)
 
-        with await self.connection_manager() as redis:
+        with await self.blocking_connection_manager() as redis:
             start_time = time.time()
             result = None
             while not result:
@@ -468,6 +935,26 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         max_stream_length: Optional[int] = 100_000,
         stream_use: StreamUse = StreamUse.PER_API,
         consumption_restart_delay: int = 5,
+        publish_linger_ms: float = 0,
+        publish_max_batch: int = 100,
+        prefetch_batches: int = 0,
+        reclaim_interval: float = None,
+        partition_count: int = 16,
+        partition_heartbeat_interval: float = 5,
+        max_stream_age: Optional[float] = None,
+        stream_trim_interval: Optional[float] = None,
+        history_batch_size: int = 1000,
+        cleanup_interval: Optional[float] = 3600,
+        consumer_ttl: Optional[float] = 86400,
+        consumer_group_ttl: Optional[float] = None,
+        server_side_filtering: bool = False,
+        claim_check_threshold: Optional[int] = None,
+        claim_check_ttl: float = 604800,
+        cluster_mode: bool = False,
+        max_deliveries: Optional[int] = None,
+        scheduled_poll_interval: float = 1,
+        idempotency_window: Optional[float] = None,
+        max_blocking_connections: Optional[int] = 100,
     ):
         self.set_redis_pool(redis_pool, url, connection_parameters)
         self.batch_size = batch_size
@@ -478,6 +965,66 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         self.max_stream_length = max_stream_length
         self.stream_use = stream_use
         self.consumption_restart_delay = consumption_restart_delay
+        self.publish_linger_ms = publish_linger_ms
+        self.publish_max_batch = publish_max_batch
+        self.prefetch_batches = prefetch_batches
+        self.reclaim_interval = reclaim_interval if reclaim_interval else acknowledgement_timeout
+        self.partition_count = partition_count
+        self.partition_heartbeat_interval = partition_heartbeat_interval
+        self.max_stream_age = max_stream_age
+        if max_stream_age and not stream_trim_interval:
+            # Age-based retention can only be enforced by the background trimmer
+            stream_trim_interval = 60
+        self.stream_trim_interval = stream_trim_interval
+        self.history_batch_size = history_batch_size
+        self.cleanup_interval = cleanup_interval
+        self.consumer_ttl = consumer_ttl
+        self.consumer_group_ttl = consumer_group_ttl
+        self.server_side_filtering = server_side_filtering
+        self.claim_check_threshold = claim_check_threshold
+        self.claim_check_ttl = claim_check_ttl
+        self.cluster_mode = cluster_mode
+        self.max_deliveries = max_deliveries
+        self.scheduled_poll_interval = scheduled_poll_interval
+        self.idempotency_window = idempotency_window
+        self.max_blocking_connections = max_blocking_connections
+        # The number of messages reclaimed from other consumers, keyed by stream name
+        self.reclaimed_counts: Dict[str, int] = Counter()
+        # Does this Redis version support XPENDING's IDLE option? Assume
+        # so until told otherwise
+        self._xpending_idle_supported = True
+        # Events waiting to be published when publish_linger_ms is enabled.
+        # Each item is a tuple of (event message, stream, future)
+        self._publish_buffer: List[Tuple[EventMessage, str, asyncio.Future]] = []
+        self._publish_linger_task: Optional[asyncio.Task] = None
+        # Tasks sending flushed batches of buffered events. See _flush_publish_buffer()
+        self._publish_flush_tasks: Set[asyncio.Future] = set()
+        # Readers performing the blocking reads for all of our listeners. Keyed by
+        # cluster slot in cluster mode, otherwise there is a single reader keyed by None
+        self._stream_readers: Dict[Optional[int], _StreamReader] = {}
+        # Streams we have published to or consumed from, which will be
+        # trimmed by the background trimmer. See _trim_loop()
+        self._streams_to_trim = set()
+        self._trim_task: Optional[asyncio.Task] = None
+        # Does this Redis version support XTRIM's MINID strategy? Assume
+        # so until told otherwise
+        self._xtrim_minid_supported = True
+        # Streams we have consumed from, and the number of listeners currently
+        # consuming in each consumer group. See cleanup()
+        self._streams_to_cleanup = set()
+        self._active_consumer_groups: Dict[str, int] = Counter()
+        # The streams read by each consumer group being consumed. See consumer_lag()
+        self._consumer_group_streams: Dict[str, List[str]] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # Streams we have consumed from, onto which scheduled events will be
+        # moved once due. See _scheduler_loop()
+        self._streams_to_schedule = set()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        # Set to wake the scheduler when we schedule an event ourselves
+        self._scheduler_wake: Optional[asyncio.Event] = None
+        # Tuples of (stream, consumer group) which we know to exist.
+        # See _create_consumer_groups()
+        self._created_consumer_groups = set()
         super().__init__(serializer=serializer, deserializer=deserializer)
 
     @classmethod
@@ -496,8 +1043,30 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         max_stream_length: Optional[int] = 100_000,
         stream_use: StreamUse = StreamUse.PER_API,
         consumption_restart_delay: int = 5,
+        publish_linger_ms: float = 0,
+        publish_max_batch: int = 100,
+        prefetch_batches: int = 0,
+        reclaim_interval: float = None,
+        partition_count: int = 16,
+        partition_heartbeat_interval: float = 5,
+        max_stream_age: Optional[float] = None,
+        stream_trim_interval: Optional[float] = None,
+        history_batch_size: int = 1000,
+        cleanup_interval: Optional[float] = 3600,
+        consumer_ttl: Optional[float] = 86400,
+        consumer_group_ttl: Optional[float] = None,
+        server_side_filtering: bool = False,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        claim_check_threshold: Optional[int] = None,
+        claim_check_ttl: float = 604800,
+        cluster_mode: bool = False,
+        max_deliveries: Optional[int] = None,
+        scheduled_poll_interval: float = 1,
+        idempotency_window: Optional[float] = None,
+        max_blocking_connections: Optional[int] = 100,
     ):
-        serializer = import_from_string(serializer)()
+        serializer = make_serializer(serializer, compression, compression_threshold)
         deserializer = import_from_string(deserializer)(RedisEventMessage)
         service_name = service_name or config.service_name
         consumer_name = consumer_name or config.process_name
@@ -518,13 +1087,60 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
             max_stream_length=max_stream_length or None,
             stream_use=stream_use,
             consumption_restart_delay=consumption_restart_delay,
+            publish_linger_ms=publish_linger_ms,
+            publish_max_batch=publish_max_batch,
+            prefetch_batches=prefetch_batches,
+            reclaim_interval=reclaim_interval,
+            partition_count=partition_count,
+            partition_heartbeat_interval=partition_heartbeat_interval,
+            max_stream_age=max_stream_age or None,
+            stream_trim_interval=stream_trim_interval or None,
+            history_batch_size=history_batch_size,
+            cleanup_interval=cleanup_interval or None,
+            consumer_ttl=consumer_ttl or None,
+            consumer_group_ttl=consumer_group_ttl or None,
+            server_side_filtering=server_side_filtering,
+            claim_check_threshold=claim_check_threshold or None,
+            claim_check_ttl=claim_check_ttl,
+            cluster_mode=cluster_mode,
+            max_deliveries=max_deliveries or None,
+            scheduled_poll_interval=scheduled_poll_interval,
+            idempotency_window=idempotency_window or None,
+            max_blocking_connections=max_blocking_connections or None,
         )
 
+    async def close(self):
+        # Make sure any buffered events are sent before the connection is closed
+        if self._publish_buffer:
+            self._flush_publish_buffer()
+        if self._publish_flush_tasks:
+            await asyncio.gather(*self._publish_flush_tasks, return_exceptions=True)
+        await cancel(self._trim_task, self._cleanup_task, self._scheduler_task)
+        self._trim_task = None
+        self._cleanup_task = None
+        self._scheduler_task = None
+        for reader in self._stream_readers.values():
+            await reader.close()
+        self._stream_readers = {}
+        await super().close()
+
     async def send_event(self, event_message: EventMessage, options: dict, bus_client: "BusClient"):
-        """Publish an event"""
-        stream = self._get_stream_names(
-            listen_for=[(event_message.api_name, event_message.event_name)]
-        )[0]
+        """Publish an event
+
+        The event can be delivered at a later time by passing either a `deliver_at`
+        datetime or a `delay` (in seconds) within `options`. See _pipeline_schedule().
+
+        If `idempotency_window` is set then the event will not be sent if another event
+        with the same `idempotency_key` option (or, if not given, the same event ID) was
+        sent within the window. See _send_events_idempotent().
+        """
+        stream = self._get_stream_for_message(event_message, bus_client)
+        deliver_at = self._get_deliver_at(options)
+        if deliver_at:
+            await self._schedule_events([(event_message, stream)], deliver_at)
+            return
+
+        self._start_trimming([stream], bus_client)
 
         logger.debug(
             LBullets(
@@ -537,16 +1153,20 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
             )
         )
 
-        # Performance: I suspect getting a connection from the connection manager each time is causing
-        # performance issues. Need to confirm.
-        with await self.connection_manager() as redis:
-            start_time = time.time()
-            await redis.xadd(
-                stream=stream,
-                fields=self.serializer(event_message),
-                max_len=self.max_stream_length or None,
-                exact_len=False,
+        start_time = time.time()
+        if self.idempotency_window:
+            await self._send_events_idempotent(
+                [(event_message, stream, self._get_idempotency_key(event_message, options))]
             )
+        elif self.publish_linger_ms:
+            # Coalesce this event with any others sent in the
+            # next few milliseconds. See _send_event_buffered()
+            await self._send_event_buffered(event_message, stream)
+        else:
+            with await self.connection_manager() as redis:
+                p = redis.pipeline()
+                self._pipeline_xadd(p, event_message, stream)
+                await p.execute()
 
         logger.debug(
             L(
@@ -557,6 +1177,672 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
             )
         )
 
+    async def send_events(
+        self, event_messages: Sequence[EventMessage], options: dict, bus_client: "BusClient"
+    ):
+        """Publish multiple events using a single pipelined round trip to Redis"""
+        if not event_messages:
+            return
+
+        streams = [self._get_stream_for_message(m, bus_client) for m in event_messages]
+        deliver_at = self._get_deliver_at(options)
+        if deliver_at:
+            await self._schedule_events(list(zip(event_messages, streams)), deliver_at)
+            return
+
+        self._start_trimming(streams, bus_client)
+
+        logger.debug(
+            LBullets(
+                L("Enqueuing {} event messages in Redis", Bold(len(event_messages))),
+                items=[f"{m} -> {stream}" for m, stream in zip(event_messages, streams)],
+            )
+        )
+
+        start_time = time.time()
+        if self.idempotency_window:
+            await self._send_events_idempotent(
+                [
+                    (m, stream, self._get_idempotency_key(m, options, index=i))
+                    for i, (m, stream) in enumerate(zip(event_messages, streams))
+                ]
+            )
+        else:
+            with await self.connection_manager() as redis:
+                pipelines = []
+                for group in self.group_by_slot(zip(event_messages, streams), key=lambda m: m[1]):
+                    p = redis.pipeline()
+                    for event_message, stream in group:
+                        self._pipeline_xadd(p, event_message, stream)
+                    pipelines.append(p.execute())
+                await asyncio.gather(*pipelines)
+
+        logger.debug(
+            L(
+                "Enqueued {} event messages in Redis in {}",
+                Bold(len(event_messages)),
+                human_time(time.time() - start_time),
+            )
+        )
+
+    def _get_deliver_at(self, options: Optional[dict]) -> Optional[float]:
+        """Get the timestamp at which events should be delivered, or None to deliver now
+
+        Takes either a `deliver_at` datetime/timestamp, or a `delay` in
+        seconds (or as a timedelta) from the given options.
+        """
+        options = options or {}
+        deliver_at = options.get("deliver_at")
+        delay = options.get("delay")
+        if isinstance(deliver_at, datetime):
+            deliver_at = deliver_at.timestamp()
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        if delay:
+            deliver_at = time.time() + delay
+
+        if deliver_at and deliver_at > time.time():
+            return deliver_at
+        else:
+            return None
+
+    async def _schedule_events(self, events: List[Tuple[EventMessage, str]], deliver_at: float):
+        """Store the given (event message, stream) tuples until they are due for delivery"""
+        logger.debug(
+            LBullets(
+                L(
+                    "Scheduling {} event messages for delivery at {}",
+                    Bold(len(events)),
+                    Bold(datetime.fromtimestamp(deliver_at, tz=timezone.utc).isoformat()),
+                ),
+                items=[f"{m} -> {stream}" for m, stream in events],
+            )
+        )
+
+        with await self.connection_manager() as redis:
+            pipelines = []
+            for group in self.group_by_slot(events, key=lambda m: m[1]):
+                p = redis.pipeline()
+                for event_message, stream in group:
+                    self._pipeline_schedule(p, event_message, stream, deliver_at)
+                pipelines.append(p.execute())
+            await asyncio.gather(*pipelines)
+
+        if self._scheduler_wake:
+            # Our scheduler may now need to run sooner than it was going to
+            self._scheduler_wake.set()
+
+    def _pipeline_schedule(self, p, event_message: EventMessage, stream: str, deliver_at: float):
+        """Queue the commands to schedule the given event upon the given pipeline
+
+        The serialized event is stored in the stream's scheduled bodies hash, and its ID
+        is added to the stream's scheduled sorted set, scored by the time at which it is
+        due. Consumers of the stream will move it onto the stream once it is due.
+        See move_scheduled_events().
+
+        Large events are stored under a claim check, just as when sending immediately. The
+        claim check will live for `claim_check_ttl` seconds after the event is due.
+
+        Scheduling is not subject to the `idempotency_window`. However, scheduling an event
+        again before it is due replaces the earlier schedule, as events are stored by ID.
+        """
+        scheduled_key = self._get_scheduled_key(stream)
+        fields, _ = self._pipeline_claim_check(
+            p,
+            event_message,
+            stream,
+            ttl=self.claim_check_ttl + math.ceil(deliver_at - time.time()),
+        )
+        p.hset(
+            self._get_scheduled_bodies_key(stream),
+            event_message.id,
+            encode_scheduled_fields(fields),
+        )
+        p.zadd(scheduled_key, deliver_at, event_message.id)
+
+    def _start_scheduler(self, stream_names: Sequence[str], bus_client: Optional["BusClient"]):
+        """Have the background scheduler move due events onto the given streams"""
+        if not self.scheduled_poll_interval:
+            return
+        self._streams_to_schedule.update(stream_names)
+        if not self._scheduler_task:
+            self._scheduler_wake = asyncio.Event()
+            self._scheduler_task = asyncio.ensure_future(self._scheduler_loop())
+            if bus_client:
+                self._scheduler_task.add_done_callback(make_exception_checker(bus_client))
+
+    async def _scheduler_loop(self):
+        """Move scheduled events onto their streams as they become due
+
+        We sleep until the next known event is due, but for no longer than
+        `scheduled_poll_interval` in order to pick up events scheduled by other processes.
+        """
+        while True:
+            timeout = self.scheduled_poll_interval
+            try:
+                next_due = await self.move_scheduled_events()
+            except (ConnectionClosedError, ConnectionResetError):
+                logger.warning(
+                    f"Redis connection lost while moving scheduled events, retrying "
+                    f"in {self.scheduled_poll_interval} seconds..."
+                )
+            else:
+                if next_due is not None:
+                    timeout = max(0, min(timeout, next_due - time.time()))
+
+            try:
+                await asyncio.wait_for(self._scheduler_wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._scheduler_wake.clear()
+
+    async def move_scheduled_events(self, stream_names: Sequence[str] = None) -> Optional[float]:
+        """Move any scheduled events which are now due onto the given streams
+
+        Defaults to all streams this transport has consumed from. Returns the
+        timestamp at which the next scheduled event is due, or None if there are
+        no more scheduled events.
+        """
+        if stream_names is None:
+            stream_names = sorted(self._streams_to_schedule)
+        if not stream_names:
+            return None
+
+        with await self.connection_manager() as redis:
+            results = await asyncio.gather(
+                *[self._move_scheduled_events(redis, stream) for stream in stream_names]
+            )
+
+        next_due = [due for due in results if due is not None]
+        return min(next_due) if next_due else None
+
+    async def _move_scheduled_events(self, redis, stream: str) -> Optional[float]:
+        keys = [self._get_scheduled_key(stream), stream, self._get_scheduled_bodies_key(stream)]
+        while True:
+            args = [time.time(), self.batch_size * 10, self._get_xadd_max_len() or 0]
+            try:
+                result = await redis.evalsha(MOVE_SCHEDULED_SCRIPT_SHA, keys=keys, args=args)
+            except ReplyError as e:
+                if "NOSCRIPT" not in str(e):
+                    raise
+                result = await redis.eval(MOVE_SCHEDULED_SCRIPT, keys=keys, args=args)
+
+            moved, next_due = result
+            if moved:
+                logger.debug(f"Moved {moved} scheduled event messages onto stream {stream}")
+            if next_due is None:
+                return None
+            if float(next_due) > time.time():
+                return float(next_due)
+            # More events are already due, so keep going
+
+    def _get_scheduled_key(self, stream: str) -> str:
+        return f"{stream}:scheduled"
+
+    def _get_scheduled_bodies_key(self, stream: str) -> str:
+        return f"{stream}:scheduled:bodies"
+
+    async def _send_event_buffered(self, event_message: EventMessage, stream: str):
+        """Add an event to the publish buffer and wait until it has been sent
+
+        Buffered events are sent in a single pipeline once `publish_linger_ms`
+        has elapsed, or sooner if `publish_max_batch` events have been buffered.
+        This significantly reduces the number of round trips to Redis when
+        many coroutines are firing events concurrently.
+        """
+        future = asyncio.Future()
+        self._publish_buffer.append((event_message, stream, future))
+
+        if len(self._publish_buffer) >= self.publish_max_batch:
+            self._flush_publish_buffer()
+        elif not self._publish_linger_task:
+            self._publish_linger_task = asyncio.ensure_future(self._linger_then_flush())
+
+        await future
+
+    async def _linger_then_flush(self):
+        await asyncio.sleep(self.publish_linger_ms / 1000)
+        self._publish_linger_task = None
+        await self._flush_publish_buffer()
+
+    def _flush_publish_buffer(self) -> asyncio.Future:
+        """Start sending all buffered events. Returns the sending task
+
+        The task is tracked until it completes, so that close() can wait for it.
+        """
+        batch, self._publish_buffer = self._publish_buffer, []
+        if self._publish_linger_task:
+            self._publish_linger_task.cancel()
+            self._publish_linger_task = None
+        task = asyncio.ensure_future(self._send_buffered_batch(batch))
+        self._publish_flush_tasks.add(task)
+        task.add_done_callback(self._publish_flush_tasks.discard)
+        return task
+
+    async def _send_buffered_batch(self, batch: List[Tuple[EventMessage, str, asyncio.Future]]):
+        if not batch:
+            return
+
+        groups = self.group_by_slot(batch, key=lambda m: m[1])
+        try:
+            with await self.connection_manager() as redis:
+                pipelines = []
+                # The index of each event's XADD within its pipeline
+                xadd_indexes = []
+                for group in groups:
+                    p = redis.pipeline()
+                    command_count = 0
+                    indexes = []
+                    for event_message, stream, _ in group:
+                        command_count += self._pipeline_xadd(p, event_message, stream)
+                        indexes.append(command_count - 1)
+                    pipelines.append(p.execute(return_exceptions=True))
+                    xadd_indexes.append(indexes)
+                pipeline_results = await asyncio.gather(*pipelines, return_exceptions=True)
+            results = []
+            for indexes, result in zip(xadd_indexes, pipeline_results):
+                if isinstance(result, Exception):
+                    results.extend([result] * len(indexes))
+                else:
+                    results.extend(result[i] for i in indexes)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        logger.debug(f"Flushed {len(batch)} buffered event messages to Redis")
+
+        # Let each caller know their event has been sent (or has failed)
+        batch = [item for group in groups for item in group]
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                # The caller has probably been cancelled
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _pipeline_xadd(
+        self, p, event_message: EventMessage, stream: str, extra_fields: dict = None
+    ) -> int:
+        """Queue the XADD for the given event upon the given pipeline
+
+        If the event's body is larger than `claim_check_threshold` then the body
+        is stored under its own key (which expires after `claim_check_ttl`), and
+        only the event's metadata and a reference to that key (a 'claim check')
+        are added to the stream. This keeps stream entries small, so reading a
+        stream remains fast even for consumers which ignore the large events.
+        See _resolve_claim_checks().
+
+        Any `extra_fields` are added to the stream entry alongside the event.
+
+        Returns the number of commands queued. The XADD is always the last of these.
+        """
+        fields, command_count = self._pipeline_claim_check(p, event_message, stream)
+        if extra_fields:
+            fields.update(extra_fields)
+        p.xadd(
+            stream=stream, fields=fields, max_len=self._get_xadd_max_len(), exact_len=False
+        )
+        return command_count + 1
+
+    def _pipeline_claim_check(
+        self, p, event_message: EventMessage, stream: str, ttl: int = None
+    ) -> Tuple[dict, int]:
+        """Serialize the given event, storing its body under a claim check if it is too large
+
+        The claim check expires after `ttl` seconds, defaulting to `claim_check_ttl`.
+
+        Returns the fields to be added to the stream, along with the number
+        of commands queued upon the given pipeline (zero if no claim check was needed).
+        """
+        fields = self.serializer(event_message)
+        command_count = 0
+
+        if self.claim_check_threshold:
+            metadata_keys = event_message.get_metadata().keys()
+            body = {k: v for k, v in fields.items() if k not in metadata_keys}
+            if sum(len(v) for v in body.values()) >= self.claim_check_threshold:
+                claim_check_key = f"{stream}:claim_check:{event_message.id}"
+                p.hmset_dict(claim_check_key, body)
+                p.expire(claim_check_key, ttl or self.claim_check_ttl)
+                fields = {k: v for k, v in fields.items() if k in metadata_keys}
+                fields["claim_check"] = claim_check_key
+                command_count += 2
+
+        return fields, command_count
+
+    def _get_idempotency_key(
+        self, event_message: EventMessage, options: Optional[dict], index: int = None
+    ) -> str:
+        """Get the key by which the given event will be deduplicated
+
+        This is the `idempotency_key` option if given, otherwise the event's ID. When
+        sending many events at once, each event's `index` is appended to the given key.
+        """
+        idempotency_key = (options or {}).get("idempotency_key")
+        if not idempotency_key:
+            return event_message.id
+        elif index is None:
+            return str(idempotency_key)
+        else:
+            return f"{idempotency_key}:{index}"
+
+    async def _send_events_idempotent(self, events: List[Tuple[EventMessage, str, str]]):
+        """Send the given (event message, stream, idempotency key) tuples, skipping duplicates
+
+        Each event is only added to its stream if no other event with the same idempotency
+        key has been added to that stream within the last `idempotency_window` seconds.
+        This allows callers to safely retry sending events (i.e. following a timeout).
+        See IDEMPOTENT_XADD_SCRIPT.
+        """
+        with await self.connection_manager() as redis:
+            # Any claim checks are stored first. Duplicates will overwrite an
+            # existing claim check, or leave one to expire unused.
+            p = redis.pipeline()
+            command_count = 0
+            all_fields = []
+            for event_message, stream, _ in events:
+                fields, claim_check_command_count = self._pipeline_claim_check(
+                    p, event_message, stream
+                )
+                all_fields.append(fields)
+                command_count += claim_check_command_count
+            if command_count:
+                await p.execute()
+
+            message_ids = await asyncio.gather(
+                *[
+                    self._idempotent_xadd(redis, fields, stream, idempotency_key)
+                    for fields, (_, stream, idempotency_key) in zip(all_fields, events)
+                ]
+            )
+
+        for message_id, (event_message, stream, idempotency_key) in zip(message_ids, events):
+            if message_id is None:
+                logger.info(
+                    L(
+                        "Skipped duplicate event message {} (idempotency key {}) on stream {}",
+                        Bold(event_message),
+                        Bold(idempotency_key),
+                        Bold(stream),
+                    )
+                )
+
+    async def _idempotent_xadd(
+        self, redis, fields: dict, stream: str, idempotency_key: str
+    ) -> Optional[bytes]:
+        keys = [self._get_idempotency_redis_key(stream, idempotency_key), stream]
+        args = [int(self.idempotency_window * 1000), self._get_xadd_max_len() or 0]
+        for k, v in fields.items():
+            args.extend([k, v])
+
+        try:
+            return await redis.evalsha(IDEMPOTENT_XADD_SCRIPT_SHA, keys=keys, args=args)
+        except ReplyError as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+            return await redis.eval(IDEMPOTENT_XADD_SCRIPT, keys=keys, args=args)
+
+    def _get_idempotency_redis_key(self, stream: str, idempotency_key: str) -> str:
+        return f"{stream}:idempotency:{idempotency_key}"
+
+    def _get_xadd_max_len(self) -> Optional[int]:
+        """Get the max_len to pass to XADD
+
+        When the background trimmer is enabled the stream length is enforced there instead,
+        keeping trimming off the publishing path.
+        """
+        if self.stream_trim_interval:
+            return None
+        return self.max_stream_length or None
+
+    def _start_trimming(self, stream_names: Sequence[str], bus_client: Optional["BusClient"]):
+        """Have the background trimmer enforce the retention policy upon the given streams"""
+        if not self.stream_trim_interval:
+            return
+        self._streams_to_trim.update(stream_names)
+        if not self._trim_task:
+            self._trim_task = asyncio.ensure_future(self._trim_loop())
+            if bus_client:
+                self._trim_task.add_done_callback(make_exception_checker(bus_client))
+
+    async def _trim_loop(self):
+        while True:
+            await asyncio.sleep(self.stream_trim_interval)
+            try:
+                await self.trim_streams()
+            except (ConnectionClosedError, ConnectionResetError):
+                logger.warning(
+                    f"Redis connection lost while trimming streams, retrying "
+                    f"in {self.stream_trim_interval} seconds..."
+                )
+
+    async def trim_streams(self, stream_names: Sequence[str] = None):
+        """Enforce the retention policy upon the given streams
+
+        Removes events older than `max_stream_age` seconds, and (approximately)
+        trims each stream to `max_stream_length` events. Defaults to trimming all
+        streams this transport has published to or consumed from.
+        """
+        if stream_names is None:
+            stream_names = sorted(self._streams_to_trim)
+        if not stream_names:
+            return
+
+        start_time = time.time()
+        with await self.connection_manager() as redis:
+            if self.max_stream_age:
+                min_id = datetime_to_redis_steam_id(
+                    datetime.fromtimestamp(time.time() - self.max_stream_age, tz=timezone.utc)
+                )
+                for stream in stream_names:
+                    await self._trim_stream_by_id(redis, stream, min_id)
+
+            if self.max_stream_length:
+                await asyncio.gather(
+                    *[
+                        redis.execute(b"XTRIM", stream, b"MAXLEN", b"~", self.max_stream_length)
+                        for stream in stream_names
+                    ]
+                )
+
+        logger.debug(
+            L(
+                "Trimmed {} streams in {}",
+                Bold(len(stream_names)),
+                human_time(time.time() - start_time),
+            )
+        )
+
+    async def _trim_stream_by_id(self, redis, stream: str, min_id: str):
+        """Remove all messages prior to min_id from the given stream
+
+        Trimming by ID requires Redis 6.2. With older versions we page through
+        the old messages and delete them ourselves.
+        """
+        if self._xtrim_minid_supported:
+            try:
+                await redis.execute(b"XTRIM", stream, b"MINID", b"~", min_id)
+                return
+            except ReplyError:
+                logger.debug("XTRIM does not support the MINID strategy, deleting messages by ID")
+                self._xtrim_minid_supported = False
+
+        while True:
+            # min_id has a sequence number of zero, so is very unlikely to be a real
+            # message. We therefore don't worry about this range being inclusive.
+            messages = await redis.xrange(stream, "-", min_id, count=1000)
+            if not messages:
+                return
+            await redis.xdel(stream, *[message_id for message_id, _ in messages])
+
+    def _start_cleanup(self, stream_names: Sequence[str], bus_client: Optional["BusClient"]):
+        """Have the background janitor cleanup stale consumers & groups on the given streams"""
+        if not self.cleanup_interval:
+            return
+        self._streams_to_cleanup.update(stream_names)
+        if not self._cleanup_task:
+            self._cleanup_task = asyncio.ensure_future(self._cleanup_loop())
+            if bus_client:
+                self._cleanup_task.add_done_callback(make_exception_checker(bus_client))
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self.cleanup()
+            except (ConnectionClosedError, ConnectionResetError):
+                logger.warning(
+                    f"Redis connection lost while cleaning up consumer groups, retrying "
+                    f"in {self.cleanup_interval} seconds..."
+                )
+
+    async def cleanup(self, stream_names: Sequence[str] = None):
+        """Remove stale consumers and abandoned consumer groups from the given streams
+
+        Each new process name leaves behind a consumer, and each renamed listener
+        leaves behind a consumer group (along with its pending messages). Left alone
+        these accumulate forever.
+
+        Consumers which have been idle for `consumer_ttl` seconds and have no pending
+        messages are removed. Consumer groups where every consumer has been idle for
+        `consumer_group_ttl` seconds are removed, along with their pending messages.
+        Groups being consumed by this transport are never removed. Defaults to cleaning
+        up all streams this transport has consumed from.
+        """
+        if stream_names is None:
+            stream_names = sorted(self._streams_to_cleanup)
+
+        with await self.connection_manager() as redis:
+            for stream in stream_names:
+                try:
+                    groups = await redis.xinfo_groups(stream)
+                except ReplyError:
+                    # The stream does not exist
+                    continue
+
+                for group in groups:
+                    group_name = decode(group[b"name"], "utf8")
+                    consumers = await redis.xinfo_consumers(stream, group_name)
+                    if self._is_abandoned_group(group_name, group, consumers):
+                        logger.info(
+                            L(
+                                "Removing abandoned consumer group {} from stream {}. "
+                                "{} pending messages will be discarded",
+                                Bold(group_name),
+                                Bold(stream),
+                                Bold(group[b"pending"]),
+                            )
+                        )
+                        await redis.execute(b"XGROUP", b"DESTROY", stream, group_name)
+                        self._forget_consumer_group(group_name, [stream])
+                        continue
+
+                    for consumer in consumers:
+                        consumer_name = decode(consumer[b"name"], "utf8")
+                        if (
+                            self.consumer_ttl
+                            and consumer_name != self.consumer_name
+                            and not consumer[b"pending"]
+                            and consumer[b"idle"] >= self.consumer_ttl * 1000
+                        ):
+                            logger.debug(
+                                f"Removing stale consumer {consumer_name} from "
+                                f"consumer group {group_name} on stream {stream}"
+                            )
+                            await redis.execute(
+                                b"XGROUP", b"DELCONSUMER", stream, group_name, consumer_name
+                            )
+
+    async def consumer_lag(self, consumer_groups: Mapping[str, Sequence[str]] = None) -> List[dict]:
+        """Get the backlog of each consumer group upon each of its streams
+
+        Defaults to the consumer groups currently being consumed by this transport.
+        Otherwise `consumer_groups` should map consumer group names to lists of stream
+        names. Returns a dictionary for each consumer group & stream, containing:
+
+          - `consumer_group` & `stream`
+          - `pending` - The number of messages delivered to the group but not yet acknowledged
+          - `oldest_pending_idle` - Seconds since the oldest pending message was delivered
+            (or `None` if no messages are pending)
+          - `last_delivered_id` - The ID of the last message delivered to the group
+          - `stream_length` - The number of messages in the stream
+          - `lag` - The number of messages yet to be delivered to the group. Requires
+            Redis 7, otherwise `None`
+
+        Consumer groups which do not exist (yet) are omitted. All statistics are
+        fetched in a single pipelined round trip.
+        """
+        if consumer_groups is None:
+            consumer_groups = self._consumer_group_streams
+        group_streams = [
+            (consumer_group, stream)
+            for consumer_group, streams in consumer_groups.items()
+            for stream in streams
+        ]
+        stream_names = sorted({stream for _, stream in group_streams})
+        if not stream_names:
+            return []
+
+        with await self.connection_manager() as redis:
+            results = await asyncio.gather(
+                *[redis.xlen(stream) for stream in stream_names],
+                *[redis.xinfo_groups(stream) for stream in stream_names],
+                *[
+                    redis.xpending(stream, consumer_group, "-", "+", 1)
+                    for consumer_group, stream in group_streams
+                ],
+                return_exceptions=True,
+            )
+        for result in results:
+            # A ReplyError indicates a missing stream or consumer group
+            if isinstance(result, Exception) and not isinstance(result, ReplyError):
+                raise result
+
+        stream_count = len(stream_names)
+        stream_lengths = dict(zip(stream_names, results[:stream_count]))
+        groups = {}
+        for stream, stream_groups in zip(stream_names, results[stream_count : stream_count * 2]):
+            if isinstance(stream_groups, ReplyError):
+                continue
+            for group in stream_groups:
+                groups[(decode(group[b"name"], "utf8"), stream)] = group
+
+        lag = []
+        for (consumer_group, stream), oldest_pending in zip(
+            group_streams, results[stream_count * 2 :]
+        ):
+            group = groups.get((consumer_group, stream))
+            if not group:
+                continue
+            if isinstance(oldest_pending, ReplyError):
+                oldest_pending = []
+            lag.append(
+                dict(
+                    consumer_group=consumer_group,
+                    stream=stream,
+                    pending=group[b"pending"],
+                    oldest_pending_idle=oldest_pending[0][2] / 1000 if oldest_pending else None,
+                    last_delivered_id=decode(group[b"last-delivered-id"], "utf8"),
+                    stream_length=stream_lengths[stream],
+                    lag=group.get(b"lag"),
+                )
+            )
+        return lag
+
+    def _is_abandoned_group(self, group_name: str, group: dict, consumers: List[dict]) -> bool:
+        if not self.consumer_group_ttl or self._active_consumer_groups[group_name]:
+            return False
+
+        ttl = self.consumer_group_ttl * 1000
+        if consumers:
+            return all(consumer[b"idle"] >= ttl for consumer in consumers)
+        else:
+            # Nobody has ever read from this group (or its consumers have since been
+            # removed), so go by the last message delivered to it
+            last_delivered = redis_stream_id_to_tuple(decode(group[b"last-delivered-id"], "utf8"))
+            return last_delivered[0] <= time.time() * 1000 - ttl
+
     async def consume(
         self,
         listen_for: List[Tuple[str, str]],
@@ -565,7 +1851,6 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         since: Union[Since, Sequence[Since]] = "$",
         forever=True,
     ) -> AsyncGenerator[List[RedisEventMessage], None]:
-        # TODO: Cleanup consumer groups
         self._sanity_check_listen_for(listen_for)
 
         consumer_group = f"{self.service_name}-{listener_name}"
@@ -576,10 +1861,16 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
             since = [since] * len(listen_for)
         since = map(normalise_since_value, since)
 
-        stream_names = self._get_stream_names(listen_for)
         # Keys are stream names, values as the latest ID consumed from that stream
-        streams = OrderedDict(zip(stream_names, since))
+        streams = OrderedDict()
+        for (api_name, event_name), since_ in zip(listen_for, since):
+            for stream_name in self._get_stream_names([(api_name, event_name)]):
+                streams.setdefault(stream_name, since_)
+        stream_names = list(streams.keys())
         expected_events = {event_name for _, event_name in listen_for}
+        self._start_trimming(stream_names, bus_client)
+        self._start_cleanup(stream_names, bus_client)
+        self._start_scheduler(stream_names, bus_client)
 
         logger.debug(
             LBullets(
@@ -594,18 +1885,30 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
 
         # Here we use a queue to combine messages coming from both the
         # fetch messages loop and the reclaim messages loop.
-        queue = asyncio.Queue(maxsize=1)
+        # If prefetching is enabled the queue also acts as a buffer, holding
+        # up to prefetch_batches batches which are awaiting processing.
+        # Prefetched messages are already pending for this consumer, so they will
+        # be redelivered as normal should we die before acknowledging them.
+        queue = asyncio.Queue(maxsize=max(1, self.prefetch_batches))
+
+        if self.stream_use == StreamUse.PER_PARTITION:
+            # Only read new messages from the partitions assigned to us. This list is
+            # updated in-place by partition_loop() as consumers join and leave the group
+            read_stream_names = await self._assign_partitions(consumer_group, stream_names)
+        else:
+            read_stream_names = stream_names
 
         async def consume_loop():
             # Regular event consuming. See _fetch_new_messages()
             while True:
                 try:
                     async for messages in self._fetch_new_messages(
-                        streams, consumer_group, expected_events, forever
+                        streams, consumer_group, expected_events, forever, read_stream_names
                     ):
                         await queue.put(messages)
-                        # Wait for the queue to empty before getting trying to get another message
-                        await queue.join()
+                        if not self.prefetch_batches:
+                            # Wait for the queue to empty before getting trying to get another message
+                            await queue.join()
                 except (ConnectionClosedError, ConnectionResetError):
                     # ConnectionClosedError is from aioredis. However, sometimes the connection
                     # can die outside of aioredis, in which case we get a builtin ConnectionResetError.
@@ -614,24 +1917,76 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
                         f"in {self.consumption_restart_delay} seconds..."
                     )
                     await asyncio.sleep(self.consumption_restart_delay)
+                except ReplyError as e:
+                    if "NOGROUP" not in str(e):
+                        raise
+                    # The group has gone (perhaps Redis failed over and lost data), so
+                    # make sure it gets recreated when we restart
+                    logger.warning(
+                        f"Consumer group {consumer_group} no longer exists, recreating it"
+                    )
+                    self._forget_consumer_group(consumer_group)
 
         async def reclaim_loop():
-            # Reclaim messages which other consumers have failed to
+            # Periodically reclaim messages which other consumers have failed to
             # processes in reasonable time. See _reclaim_lost_messages()
+            while True:
+                await asyncio.sleep(self.reclaim_interval)
+                try:
+                    async for messages in self._reclaim_lost_messages(
+                        stream_names, consumer_group, expected_events
+                    ):
+                        await queue.put(messages)
+                        # Wait for the queue to empty before getting trying to get another message
+                        await queue.join()
+                except (ConnectionClosedError, ConnectionResetError):
+                    # The next attempt will happen after reclaim_interval
+                    logger.warning(
+                        f"Redis connection lost while reclaiming events, retrying "
+                        f"in {self.reclaim_interval} seconds..."
+                    )
 
-            await asyncio.sleep(self.acknowledgement_timeout)
-            async for messages in self._reclaim_lost_messages(
-                stream_names, consumer_group, expected_events
-            ):
-                await queue.put(messages)
-                # Wait for the queue to empty before getting trying to get another message
-                await queue.join()
-
-        consume_task = None
+        async def partition_loop():
+            # Let the other consumers in the group know we are still alive, and
+            # pick up any changes to our partition assignment. See _assign_partitions()
+            while True:
+                await asyncio.sleep(self.partition_heartbeat_interval)
+                try:
+                    assigned_stream_names = await self._assign_partitions(
+                        consumer_group, stream_names
+                    )
+                except (ConnectionClosedError, ConnectionResetError):
+                    logger.warning(
+                        f"Redis connection lost while assigning partitions, retrying "
+                        f"in {self.partition_heartbeat_interval} seconds..."
+                    )
+                    continue
+
+                if assigned_stream_names != read_stream_names:
+                    logger.info(
+                        LBullets(
+                            L(
+                                "Partitions reassigned for consumer {} in group {}",
+                                Bold(self.consumer_name),
+                                Bold(consumer_group),
+                            ),
+                            items=assigned_stream_names,
+                        )
+                    )
+                    read_stream_names[:] = assigned_stream_names
+                    for reader in list(self._stream_readers.values()):
+                        await reader.wake()
+
+        consume_task = None
         reclaim_task = None
+        partition_task = None
+        # Stop cleanup() from removing this group while we are using it
+        self._active_consumer_groups[consumer_group] += 1
+        group_streams = self._consumer_group_streams.setdefault(consumer_group, [])
+        group_streams.extend(s for s in stream_names if s not in group_streams)
 
         try:
-            # Run the two above coroutines in their own tasks
+            # Run the above coroutines in their own tasks
             consume_task = asyncio.ensure_future(consume_loop())
             reclaim_task = asyncio.ensure_future(reclaim_loop())
 
@@ -639,6 +1994,10 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
             consume_task.add_done_callback(make_exception_checker(bus_client))
             reclaim_task.add_done_callback(make_exception_checker(bus_client))
 
+            if self.stream_use == StreamUse.PER_PARTITION:
+                partition_task = asyncio.ensure_future(partition_loop())
+                partition_task.add_done_callback(make_exception_checker(bus_client))
+
             while True:
                 try:
                     messages = await queue.get()
@@ -648,10 +2007,16 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
                     return
         finally:
             # Make sure we cleanup the tasks we created
-            await cancel(consume_task, reclaim_task)
+            await cancel(consume_task, reclaim_task, partition_task)
+            self._active_consumer_groups[consumer_group] -= 1
+            if not self._active_consumer_groups[consumer_group]:
+                self._consumer_group_streams.pop(consumer_group, None)
+            if partition_task and not self._closed:
+                # Let our partitions be reassigned to other consumers
+                await self._leave_partitions(consumer_group)
 
     async def _fetch_new_messages(
-        self, streams, consumer_group, expected_events, forever
+        self, streams, consumer_group, expected_events, forever, read_stream_names=None
     ) -> AsyncGenerator[List[EventMessage], None]:
         """Coroutine to consume new messages
 
@@ -662,7 +2027,8 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
              previously consumed but not acknowledged (i.e. due to an error).
              This is a one-off startup stage.
           2. Wait for new messages to arrive. Yield these messages when they arrive, then
-             resume waiting for messages
+             resume waiting for messages. Only the streams in `read_stream_names` (if given)
+             are read at this stage
 
         See Also:
 
@@ -674,19 +2040,45 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
             # Firstly create the consumer group if we need to
             await self._create_consumer_groups(streams, redis, consumer_group)
 
-            # Get any messages that this consumer has yet to process.
-            # This can happen in the case where the processes died before acknowledging.
-            pending_messages = await redis.xread_group(
-                group_name=consumer_group,
-                consumer_name=self.consumer_name,
-                streams=list(streams.keys()),
-                # Using ID '0' indicates we want unacked pending messages
-                latest_ids=["0"] * len(streams),
-                timeout=None,  # Don't block, return immediately
-            )
+        # Get any messages that this consumer has yet to process.
+        # This can happen in the case where the processes died before acknowledging.
+        # There may be a large backlog of these, so we page through them batch_size
+        # at a time. Keys are stream names, values are the ID of the latest pending
+        # message we have seen in that stream ('0' indicates that we want all
+        # unacked pending messages). In cluster mode only streams within the same
+        # slot can be read together, so we read one slot's streams at a time.
+        cursors = OrderedDict((stream, "0") for stream in streams.keys())
+        while cursors:
+            read_streams = self.group_by_slot(cursors.keys())[0]
+            with await self.connection_manager() as redis:
+                pending_messages = await redis.xread_group(
+                    group_name=consumer_group,
+                    consumer_name=self.consumer_name,
+                    streams=read_streams,
+                    latest_ids=[cursors[stream] for stream in read_streams],
+                    count=self.batch_size,
+                    timeout=None,  # Don't block, return immediately
+                )
+                replay_messages = pending_messages
+                if self.max_deliveries:
+                    replay_messages = await self._dead_letter_replayed_messages(
+                        redis, replay_messages, consumer_group
+                    )
+                replay_messages = await self._skip_messages_for_other_groups(
+                    redis, replay_messages, consumer_group
+                )
+                resolved_messages = await self._resolve_claim_checks(
+                    redis, replay_messages, expected_events, consumer_group
+                )
+
+            message_counts = Counter()
+            for stream, message_id, _ in pending_messages:
+                stream = decode(stream, "utf8")
+                cursors[stream] = decode(message_id, "utf8")
+                message_counts[stream] += 1
 
             event_messages = []
-            for stream, message_id, fields in pending_messages:
+            for stream, message_id, fields in resolved_messages:
                 message_id = decode(message_id, "utf8")
                 stream = decode(stream, "utf8")
                 event_message = self._fields_to_message(
@@ -713,60 +2105,38 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
                 )
                 event_messages.append(event_message)
 
+            for stream in read_streams:
+                if message_counts[stream] < self.batch_size:
+                    # We've reached the end of this stream's pending messages
+                    del cursors[stream]
+
             if event_messages:
                 yield event_messages
 
-            # We've now cleaned up any old messages that were hanging around.
-            # Now we get on to the main loop which blocks and waits for new messages
-
+        # We've now cleaned up any old messages that were hanging around.
+        # Now we get on to the main loop which waits for new messages. The blocking
+        # read is shared with all of our other listeners (see _StreamReader),
+        # so we don't hold a connection ourselves.
+        if read_stream_names is None:
+            read_stream_names = list(streams.keys())
+        subscription = _StreamSubscription(consumer_group, read_stream_names, expected_events)
+        slots = {redis_key_slot(s) for s in streams} if self.cluster_mode else {None}
+        for slot in slots:
+            reader = self._stream_readers.get(slot)
+            if not reader:
+                reader = _StreamReader(transport=self, slot=slot)
+                self._stream_readers[slot] = reader
+            reader.subscribe(subscription)
+        try:
             while True:
-                # Fetch some messages.
-                # This will block until there are some messages available
-                stream_messages = await redis.xread_group(
-                    group_name=consumer_group,
-                    consumer_name=self.consumer_name,
-                    streams=list(streams.keys()),
-                    # Using ID '>' indicates we only want new messages which have not
-                    # been passed to other consumers in this group
-                    latest_ids=[">"] * len(streams),
-                    count=self.batch_size,
-                )
-
-                # Handle the messages we have received
-                event_messages = []
-                for stream, message_id, fields in stream_messages:
-                    message_id = decode(message_id, "utf8")
-                    stream = decode(stream, "utf8")
-                    event_message = self._fields_to_message(
-                        fields,
-                        expected_events,
-                        stream=stream,
-                        native_id=message_id,
-                        consumer_group=consumer_group,
-                    )
-                    if not event_message:
-                        # noop message, or message an event we don't care about
-                        continue
-                    logger.debug(
-                        LBullets(
-                            L(
-                                "⬅ Received new event {} on stream {}",
-                                Bold(message_id),
-                                Bold(stream),
-                            ),
-                            items=dict(
-                                **event_message.get_metadata(), kwargs=event_message.get_kwargs()
-                            ),
-                        )
-                    )
-                    # NOTE: YIELD ALL MESSAGES, NOT JUST ONE
-                    event_messages.append(event_message)
-
-                if event_messages:
-                    yield event_messages
+                # This will wait until there are some messages available
+                yield await subscription.get()
 
                 if not forever:
                     return
+        finally:
+            for reader in list(subscription.readers):
+                reader.unsubscribe(subscription)
 
     async def _reclaim_lost_messages(
         self, stream_names: List[str], consumer_group: str, expected_events: set
@@ -774,81 +2144,500 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         """Reclaim messages that other consumers in the group failed to acknowledge within a timeout
 
         The timeout period is specified by the `acknowledgement_timeout` option.
+        We page through the pending messages `reclaim_batch_size` at a time,
+        claiming all timed out messages in each page with a single XCLAIM.
+
+        Messages which have already been delivered `max_deliveries` times are
+        moved to the stream's dead letter stream rather than being reclaimed.
+        See _dead_letter_messages(). Our own pending messages are checked
+        when they are replayed. See _dead_letter_replayed_messages().
         """
+        timeout = int(self.acknowledgement_timeout * 1000)
         with await self.connection_manager() as redis:
             for stream in stream_names:
-                old_messages = await redis.xpending(
-                    stream, consumer_group, "-", "+", count=self.reclaim_batch_size
-                )
-                timeout = self.acknowledgement_timeout * 1000
-                event_messages = []
-                for (
-                    message_id,
-                    consumer_name,
-                    ms_since_last_delivery,
-                    num_deliveries,
-                ) in old_messages:
-                    message_id = decode(message_id, "utf8")
-                    consumer_name = decode(consumer_name, "utf8")
-
-                    if ms_since_last_delivery > timeout:
-                        logger.info(
-                            L(
-                                "Found timed out event {} in stream {}. Abandoned by {}. Attempting to reclaim...",
-                                Bold(message_id),
-                                Bold(stream),
-                                Bold(consumer_name),
-                            )
-                        )
-
-                    result = await redis.xclaim(
-                        stream, consumer_group, self.consumer_name, int(timeout), message_id
+                start = "-"
+                while True:
+                    pending_messages = await self._get_timed_out_pending_messages(
+                        redis, stream, consumer_group, start, min_idle_time=timeout
                     )
-                    for claimed_message_id, fields in result:
-                        claimed_message_id = decode(claimed_message_id, "utf8")
-                        event_message = self._fields_to_message(
-                            fields,
-                            expected_events,
-                            stream=stream,
-                            native_id=claimed_message_id,
-                            consumer_group=consumer_group,
-                        )
-                        if not event_message:
-                            # noop message, or message an event we don't care about
+
+                    claimable_ids = []
+                    dead_letters = []
+                    for (
+                        message_id,
+                        consumer_name,
+                        ms_since_last_delivery,
+                        num_deliveries,
+                    ) in pending_messages:
+                        message_id = decode(message_id, "utf8")
+                        consumer_name = decode(consumer_name, "utf8")
+                        # Our own pending messages are either being processed by us now,
+                        # or will be replayed upon startup (see _fetch_new_messages()).
+                        # Messages which have not timed out may still be processed by
+                        # their current consumer.
+                        if (
+                            consumer_name == self.consumer_name
+                            or ms_since_last_delivery < timeout
+                        ):
                             continue
-                        logger.debug(
-                            LBullets(
+
+                        if self.max_deliveries and num_deliveries >= self.max_deliveries:
+                            logger.warning(
+                                L(
+                                    "Event {} in stream {} has failed to be processed {} times. "
+                                    "Moving it to the dead letter stream",
+                                    Bold(message_id),
+                                    Bold(stream),
+                                    Bold(num_deliveries),
+                                )
+                            )
+                            dead_letters.append((message_id, consumer_name, num_deliveries))
+                        else:
+                            logger.info(
                                 L(
-                                    "⬅ Reclaimed timed out event {} on stream {}. Abandoned by {}.",
+                                    "Found timed out event {} in stream {}. Abandoned by {}. Attempting to reclaim...",
                                     Bold(message_id),
                                     Bold(stream),
                                     Bold(consumer_name),
-                                ),
-                                items=dict(
-                                    **event_message.get_metadata(),
-                                    kwargs=event_message.get_kwargs(),
-                                ),
+                                )
                             )
+                            claimable_ids.append(message_id)
+
+                    if dead_letters:
+                        await self._dead_letter_messages(
+                            redis, stream, consumer_group, dead_letters, timeout
+                        )
+
+                    if claimable_ids:
+                        event_messages = await self._claim_messages(
+                            redis, stream, consumer_group, claimable_ids, timeout, expected_events
                         )
-                        event_messages.append(event_message)
+                        if event_messages:
+                            yield event_messages
 
-                    if event_messages:
-                        yield event_messages
+                    if len(pending_messages) < self.reclaim_batch_size:
+                        # No more pending messages in this stream
+                        break
+                    start = redis_stream_id_add_one(decode(pending_messages[-1][0], "utf8"))
+
+    async def _get_timed_out_pending_messages(
+        self, redis, stream: str, consumer_group: str, start: str, min_idle_time: int
+    ):
+        """Get a page of pending messages, preferably only those which have timed out
+
+        Filtering by idle time requires Redis 6.2. Older versions will
+        return all pending messages, which we then filter ourselves.
+        """
+        if self._xpending_idle_supported:
+            try:
+                return await redis.execute(
+                    b"XPENDING",
+                    stream,
+                    consumer_group,
+                    b"IDLE",
+                    min_idle_time,
+                    start,
+                    "+",
+                    self.reclaim_batch_size,
+                )
+            except ReplyError:
+                logger.debug("XPENDING does not support the IDLE option, filtering locally")
+                self._xpending_idle_supported = False
+
+        return await redis.xpending(stream, consumer_group, start, "+", self.reclaim_batch_size)
+
+    async def _claim_messages(
+        self,
+        redis,
+        stream: str,
+        consumer_group: str,
+        message_ids: List[str],
+        min_idle_time: int,
+        expected_events: set,
+    ) -> List[RedisEventMessage]:
+        # Only messages which are still idle will be claimed, so we will not
+        # steal messages which another consumer has claimed in the meantime
+        result = await redis.execute(
+            b"XCLAIM", stream, consumer_group, self.consumer_name, min_idle_time, *message_ids
+        )
+
+        claimed = [entry for entry in result if entry]
+        unprocessable_ids = set()
+        if len(claimed) < len(result):
+            # Messages which have been deleted (i.e. trimmed from the stream) are
+            # claimed, but returned as None. They can never be processed, so we acknowledge
+            # them (along with any noop messages) below. Otherwise they would sit in the
+            # pending list forever, and be reclaimed over and over.
+            unprocessable_ids = await self._get_deleted_claimed_ids(
+                redis,
+                stream,
+                consumer_group,
+                set(message_ids) - {decode(m, "utf8") for m, _ in claimed},
+            )
+        claimed = await self._resolve_claim_checks(
+            redis,
+            await self._skip_messages_for_other_groups(
+                redis,
+                [(stream, m, fields_to_dict(fields)) for m, fields in claimed],
+                consumer_group,
+            ),
+            expected_events,
+            consumer_group,
+        )
+
+        event_messages = []
+        for _, claimed_message_id, fields in claimed:
+            claimed_message_id = decode(claimed_message_id, "utf8")
+            event_message = self._fields_to_message(
+                fields,
+                expected_events,
+                stream=stream,
+                native_id=claimed_message_id,
+                consumer_group=consumer_group,
+            )
+            if not event_message:
+                # noop message, or message an event we don't care about
+                if tuple(fields.items()) == ((b"", b""),):
+                    unprocessable_ids.add(claimed_message_id)
+                continue
+
+            logger.debug(
+                LBullets(
+                    L(
+                        "⬅ Reclaimed timed out event {} on stream {}.",
+                        Bold(claimed_message_id),
+                        Bold(stream),
+                    ),
+                    items=dict(**event_message.get_metadata(), kwargs=event_message.get_kwargs()),
+                )
+            )
+            event_messages.append(event_message)
+
+        if unprocessable_ids:
+            await redis.xack(stream, consumer_group, *unprocessable_ids)
+
+        self.reclaimed_counts[stream] += len(event_messages)
+        return event_messages
+
+    async def _get_deleted_claimed_ids(
+        self, redis, stream: str, consumer_group: str, missing_ids: Set[str]
+    ) -> Set[str]:
+        """Get which of the IDs missing from an XCLAIM result were claimed by us
+
+        IDs are missing from the result either because the message was deleted (in which
+        case we claimed it, but it was returned as None), or because another consumer
+        claimed the message in the meantime. Only the former may be acknowledged,
+        so we check which of the missing IDs are now pending for this consumer.
+        """
+        missing_ids = sorted(missing_ids)
+        results = await asyncio.gather(
+            *[
+                redis.xpending(
+                    stream, consumer_group, message_id, message_id, 1, self.consumer_name
+                )
+                for message_id in missing_ids
+            ]
+        )
+        return {message_id for message_id, pending in zip(missing_ids, results) if pending}
+
+    async def _dead_letter_replayed_messages(
+        self, redis, stream_messages: List[Tuple[Any, Any, dict]], consumer_group: str
+    ) -> List[Tuple[Any, Any, dict]]:
+        """Dead letter any replayed pending messages which have exceeded `max_deliveries`
+
+        Our own pending messages are replayed upon startup rather than being reclaimed
+        (see _fetch_new_messages()), so we check their delivery counts here. Replaying
+        a message counts as a delivery, so a message is dead lettered once it has been
+        delivered more than `max_deliveries` times. Returns the remaining messages.
+        """
+        message_ids = OrderedDict()
+        for stream, message_id, _ in stream_messages:
+            message_ids.setdefault(decode(stream, "utf8"), []).append(decode(message_id, "utf8"))
+
+        # Get the delivery counts of the replayed messages, one XPENDING per stream
+        streams = list(message_ids.keys())
+        results = await asyncio.gather(
+            *[
+                redis.xpending(
+                    stream,
+                    consumer_group,
+                    message_ids[stream][0],
+                    message_ids[stream][-1],
+                    len(message_ids[stream]),
+                    self.consumer_name,
+                )
+                for stream in streams
+            ]
+        )
+
+        dead_letter_ids = set()
+        dead_lettering = []
+        for stream, pending_messages in zip(streams, results):
+            for message_id, _, idle_time, num_deliveries in pending_messages:
+                message_id = decode(message_id, "utf8")
+                # Don't count the delivery we are replaying now
+                num_deliveries -= 1
+                if num_deliveries < self.max_deliveries:
+                    continue
+                logger.warning(
+                    L(
+                        "Event {} in stream {} has failed to be processed {} times. "
+                        "Moving it to the dead letter stream",
+                        Bold(message_id),
+                        Bold(stream),
+                        Bold(num_deliveries),
+                    )
+                )
+                # Claiming the message with the idle time we have just seen ensures we
+                # skip it if another consumer has since claimed it (resetting its idle time)
+                dead_lettering.append(
+                    self._dead_letter_messages(
+                        redis,
+                        stream,
+                        consumer_group,
+                        [(message_id, self.consumer_name, num_deliveries)],
+                        min_idle_time=idle_time,
+                    )
+                )
+                dead_letter_ids.add((stream, message_id))
+
+        await asyncio.gather(*dead_lettering)
+
+        return [
+            (stream, message_id, fields)
+            for stream, message_id, fields in stream_messages
+            if (decode(stream, "utf8"), decode(message_id, "utf8")) not in dead_letter_ids
+        ]
+
+    async def _dead_letter_messages(
+        self,
+        redis,
+        stream: str,
+        consumer_group: str,
+        dead_letters: List[Tuple[str, str, int]],
+        min_idle_time: int,
+    ):
+        """Move messages which repeatedly fail to be processed to the stream's dead letter stream
+
+        Takes tuples of (message ID, last consumer name, number of deliveries). Each
+        message is added to the dead letter stream along with details of the failure,
+        and is then acknowledged so that it will not be delivered again.
+        See dead_letters() and requeue_dead_letters().
+        """
+        message_ids = [message_id for message_id, _, _ in dead_letters]
+        # Claiming the messages ensures no other consumer has claimed them in the meantime
+        result = await redis.execute(
+            b"XCLAIM", stream, consumer_group, self.consumer_name, min_idle_time, *message_ids
+        )
+        claimed = {}
+        for entry in result:
+            # Messages which have been deleted are returned as None
+            if entry:
+                claimed[decode(entry[0], "utf8")] = fields_to_dict(entry[1])
+
+        dead_letter_stream = self._get_dead_letter_stream(stream)
+        p = redis.pipeline()
+        for message_id, consumer_name, num_deliveries in dead_letters:
+            if message_id not in claimed:
+                continue
+            fields = OrderedDict(claimed[message_id])
+            fields.update(
+                {
+                    b"dead_letter:stream": stream,
+                    b"dead_letter:native_id": message_id,
+                    b"dead_letter:consumer_group": consumer_group,
+                    b"dead_letter:consumer": consumer_name,
+                    b"dead_letter:deliveries": num_deliveries,
+                }
+            )
+            p.xadd(
+                stream=dead_letter_stream,
+                fields=fields,
+                max_len=self._get_xadd_max_len(),
+                exact_len=False,
+            )
+            p.xack(stream, consumer_group, message_id)
+        await p.execute()
+
+    async def dead_letters(self, api_name: str, event_name: str) -> List[dict]:
+        """Get the events which were moved to the dead letter stream(s) for the given API & event
+
+        Events are moved to dead letter streams once they have been delivered
+        `max_deliveries` times without being successfully processed. Returns a
+        dictionary for each dead letter, containing the `event_message`, the
+        `dead_letter_id`, and the `stream`, `native_id`, `consumer_group`, `consumer`,
+        and number of `deliveries` at the time it failed.
+        """
+        dead_letters = []
+        for stream in self._get_stream_names([(api_name, event_name)]):
+            async for _, message_id, fields in self._stream_history(
+                self._get_dead_letter_stream(stream),
+                "-",
+                "+",
+                self.history_batch_size,
+                expected_events={event_name},
+            ):
+                dead_letter = self._parse_dead_letter(stream, message_id, fields, {event_name})
+                if dead_letter:
+                    dead_letters.append(dead_letter)
+        return dead_letters
+
+    async def requeue_dead_letters(
+        self, api_name: str, event_name: str, dead_letter_ids: Sequence[str] = None
+    ) -> int:
+        """Move dead letters back onto the stream they came from, so they will be processed again
+
+        Requeues all the dead letters for the given API & event, or only those with
+        the given `dead_letter_ids`. Requeued events are added to the end of the stream.
+        They are tagged with the consumer group in which they failed, and any other
+        consumer groups on the stream will acknowledge and skip them.
+        See _skip_messages_for_other_groups().
+
+        Returns the number of events requeued.
+        """
+        dead_letters = [
+            dead_letter
+            for dead_letter in await self.dead_letters(api_name, event_name)
+            if dead_letter_ids is None or dead_letter["dead_letter_id"] in dead_letter_ids
+        ]
+        if not dead_letters:
+            return 0
+
+        with await self.connection_manager() as redis:
+            pipelines = []
+            for group in self.group_by_slot(dead_letters, key=lambda d: d["stream"]):
+                p = redis.pipeline()
+                for dead_letter in group:
+                    event_message = dead_letter["event_message"]
+                    # Send as a new message, without the details of where it was last received
+                    event_message = EventMessage(
+                        api_name=event_message.api_name,
+                        event_name=event_message.event_name,
+                        kwargs=event_message.kwargs,
+                        version=event_message.version,
+                        id=event_message.id,
+                    )
+                    extra_fields = {}
+                    if dead_letter["consumer_group"]:
+                        extra_fields[REQUEUED_FOR_FIELD] = dead_letter["consumer_group"]
+                    self._pipeline_xadd(p, event_message, dead_letter["stream"], extra_fields)
+                    p.xdel(
+                        self._get_dead_letter_stream(dead_letter["stream"]),
+                        dead_letter["dead_letter_id"],
+                    )
+                pipelines.append(p.execute())
+            await asyncio.gather(*pipelines)
+
+        logger.info(f"Requeued {len(dead_letters)} dead letters for {api_name}.{event_name}")
+        return len(dead_letters)
+
+    def _parse_dead_letter(
+        self, stream: str, message_id: str, fields: dict, expected_events: Container[str]
+    ) -> Optional[dict]:
+        # Separate the details of the failure from the original message
+        failure = {}
+        original_fields = OrderedDict()
+        for k, v in fields.items():
+            if k.startswith(b"dead_letter:"):
+                failure[decode(k[len(b"dead_letter:") :], "utf8")] = decode(v, "utf8")
+            else:
+                original_fields[k] = v
+
+        event_message = self._fields_to_message(
+            original_fields,
+            expected_events,
+            stream=stream,
+            native_id=failure.get("native_id"),
+            consumer_group=failure.get("consumer_group"),
+        )
+        if not event_message:
+            return None
+
+        return dict(
+            event_message=event_message,
+            dead_letter_id=message_id,
+            stream=failure.get("stream", stream),
+            native_id=failure.get("native_id"),
+            consumer_group=failure.get("consumer_group"),
+            consumer=failure.get("consumer"),
+            deliveries=int(failure.get("deliveries", 0)),
+        )
+
+    def _get_dead_letter_stream(self, stream: str) -> str:
+        return f"{stream}:dead"
 
     async def acknowledge(self, *event_messages: RedisEventMessage, bus_client: "BusClient"):
+        # Group the message IDs by stream & consumer group, as
+        # one XACK can acknowledge many messages within a group
+        message_ids = OrderedDict()
+        for event_message in event_messages:
+            logging.debug(
+                f"Preparing to acknowledge message {event_message.id} (Native ID: {event_message.native_id})"
+            )
+            key = (event_message.stream, event_message.consumer_group)
+            message_ids.setdefault(key, []).append(event_message.native_id)
+
+        if not message_ids:
+            return
+
         with await self.connection_manager() as redis:
-            p = redis.pipeline()
-            for event_message in event_messages:
-                p.xack(event_message.stream, event_message.consumer_group, event_message.native_id)
-                logging.debug(
-                    f"Preparing to acknowledge message {event_message.id} (Native ID: {event_message.native_id})"
-                )
+            pipelines = []
+            for group in self.group_by_slot(message_ids.items(), key=lambda m: m[0][0]):
+                p = redis.pipeline()
+                for (stream, consumer_group), native_ids in group:
+                    p.xack(stream, consumer_group, *native_ids)
+                pipelines.append(p.execute())
 
             logger.debug(
                 f"Batch acknowledging successful processing of {len(event_messages)} message."
             )
+            await asyncio.gather(*pipelines)
+
+    async def get_processed_event_ids(
+        self, event_messages: Sequence[EventMessage], listener_name: str
+    ) -> Set[str]:
+        """Get the IDs of any of the given events which the listener has already processed
+
+        Processed events are stored in a sorted set for each consumer group, scored by
+        the time at which they should be forgotten. See mark_processed()
+        """
+        key = self._get_processed_key(listener_name)
+        with await self.connection_manager() as redis:
+            expiry_times = await asyncio.gather(
+                *[redis.zscore(key, event_message.id) for event_message in event_messages]
+            )
+
+        now = time.time()
+        return {
+            event_message.id
+            for event_message, expires_at in zip(event_messages, expiry_times)
+            if expires_at is not None and expires_at > now
+        }
+
+    async def mark_processed(
+        self, event_messages: Sequence[EventMessage], listener_name: str, ttl: float
+    ):
+        """Record that the listener has processed the given events. See get_processed_event_ids()"""
+        if not event_messages:
+            return
+
+        key = self._get_processed_key(listener_name)
+        now = time.time()
+        pairs = []
+        for event_message in event_messages:
+            pairs.extend([now + ttl, event_message.id])
+
+        with await self.connection_manager() as redis:
+            p = redis.pipeline()
+            p.zadd(key, *pairs)
+            # Forget any expired events, and the entire set once the consumer group stops
+            p.zremrangebyscore(key, max=now)
+            p.expire(key, math.ceil(ttl))
             await p.execute()
 
+    def _get_processed_key(self, listener_name: str) -> str:
+        return f"{self.service_name}-{listener_name}:processed"
+
     async def history(
         self,
         api_name,
@@ -856,28 +2645,72 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         start: datetime = None,
         stop: datetime = None,
         start_inclusive: bool = True,
+        batch_size: int = None,
+        reverse: bool = False,
+        limit: int = None,
+        slices: int = 1,
+        ordered: bool = True,
     ) -> AsyncGenerator[EventMessage, None]:
-        # TODO: Test
+        """Yield all events for the given api/event within the (optionally) given date range
+
+        Streams are read `batch_size` events at a time (defaulting to the
+        `history_batch_size` option), with the next page being fetched
+        while the current page is consumed.
+
+        Specify `reverse=True` to yield the newest events first, and `limit` to
+        yield at most this many events. For example, the last 10 events can be
+        fetched using `history(..., reverse=True, limit=10)`.
+
+        For large ranges, specify `slices` to split the range into this many time
+        slices which will be fetched concurrently. Events are still yielded in order,
+        unless `ordered=False` is given, in which case events are yielded as soon as
+        any slice provides them.
+        """
         redis_start = datetime_to_redis_steam_id(start) if start else "-"
         redis_stop = datetime_to_redis_steam_id(stop) if stop else "+"
 
         if start and not start_inclusive:
             redis_start = redis_stream_id_add_one(redis_start)
 
-        stream_name = self._get_stream_names([(api_name, event_name)])[0]
-        batch_size = 1000
+        if limit is not None and limit <= 0:
+            return
+
+        # There will be multiple streams if the events are partitioned
+        stream_names = self._get_stream_names([(api_name, event_name)])
+        if not batch_size:
+            # No need to fetch more than we have been asked for (although we may need to
+            # fetch more pages if the streams also contain other events)
+            batch_size = min(self.history_batch_size, limit or self.history_batch_size)
 
         logger.debug(
-            f"Getting history for stream {stream_name} from {redis_start} ({start}) "
+            f"Getting history for streams {', '.join(stream_names)} from {redis_start} ({start}) "
             f"to {redis_stop} ({stop}) in batches of {batch_size}"
         )
 
-        with await self.connection_manager() as redis:
-            messages = await redis.xrange(stream_name, redis_start, redis_stop, count=batch_size)
-            if not messages:
-                return
-            for message_id, fields in messages:
-                message_id = decode(message_id, "utf8")
+        if slices > 1:
+            messages = self._sliced_history(
+                stream_names,
+                redis_start,
+                redis_stop,
+                batch_size,
+                reverse,
+                slices,
+                ordered,
+                expected_events={event_name},
+            )
+        else:
+            messages = self._merged_history(
+                stream_names,
+                redis_start,
+                redis_stop,
+                batch_size,
+                reverse,
+                expected_events={event_name},
+            )
+
+        total = 0
+        try:
+            async for stream_name, message_id, fields in messages:
                 event_message = self._fields_to_message(
                     fields,
                     expected_event_names={event_name},
@@ -887,19 +2720,234 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
                 )
                 if event_message:
                     yield event_message
+                    total += 1
+                    if limit and total >= limit:
+                        return
+        finally:
+            # Cleanup any pages being prefetched
+            await messages.aclose()
 
-    async def _create_consumer_groups(self, streams, redis, consumer_group):
-        for stream, since in streams.items():
-            if not await redis.exists(stream):
-                # Add a noop to ensure the stream exists
-                await redis.xadd(stream, fields={"": ""})
+    def _merged_history(
+        self,
+        stream_names: Sequence[str],
+        redis_start: str,
+        redis_stop: str,
+        batch_size: int,
+        reverse: bool = False,
+        expected_events: Container[str] = ("*",),
+    ) -> AsyncGenerator[Tuple[str, str, dict], None]:
+        """Merge the history of the given streams back into a single ordered sequence"""
+
+        def key(message):
+            message_id = redis_stream_id_to_tuple(message[1])
+            return tuple(-v for v in message_id) if reverse else message_id
+
+        return merge_sorted_async(
+            [
+                self._stream_history(
+                    stream_name, redis_start, redis_stop, batch_size, reverse, expected_events
+                )
+                for stream_name in stream_names
+            ],
+            key=key,
+        )
+
+    async def _sliced_history(
+        self,
+        stream_names: Sequence[str],
+        redis_start: str,
+        redis_stop: str,
+        batch_size: int,
+        reverse: bool,
+        slices: int,
+        ordered: bool,
+        expected_events: Container[str] = ("*",),
+    ) -> AsyncGenerator[Tuple[str, str, dict], None]:
+        """Fetch the history of the given streams as several concurrently fetched time slices
+
+        Each slice is read by its own task into its own queue (each task therefore
+        using its own connections from the pool). The queues are bounded, so at most
+        around one page per slice is held in memory while awaiting the caller.
+        """
+        ranges = await self._get_history_slices(stream_names, redis_start, redis_stop, slices)
+        if reverse:
+            ranges.reverse()
+        end_of_slice = object()
 
+        async def fetch_slice(slice_start, slice_stop, queue):
             try:
-                # Create the group (it may already exist)
-                await redis.xgroup_create(stream, consumer_group, latest_id=since)
-            except ReplyError as e:
-                if "BUSYGROUP" not in str(e):
-                    raise
+                async for message in self._merged_history(
+                    stream_names, slice_start, slice_stop, batch_size, reverse, expected_events
+                ):
+                    await queue.put(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Pass the error on to be raised by the consuming side
+                await queue.put(e)
+            await queue.put(end_of_slice)
+
+        if ordered:
+            queues = [asyncio.Queue(maxsize=batch_size) for _ in ranges]
+        else:
+            queues = [asyncio.Queue(maxsize=batch_size)] * len(ranges)
+
+        tasks = [
+            asyncio.ensure_future(fetch_slice(slice_start, slice_stop, queue))
+            for (slice_start, slice_stop), queue in zip(ranges, queues)
+        ]
+        try:
+            # When unordered there is only one queue, and we wait to see the end of every slice
+            remaining = len(ranges)
+            for queue in queues if ordered else queues[:1]:
+                while remaining:
+                    message = await queue.get()
+                    if message is end_of_slice:
+                        remaining -= 1
+                        if ordered:
+                            break
+                    elif isinstance(message, Exception):
+                        raise message
+                    else:
+                        yield message
+        finally:
+            await cancel(*tasks)
+
+    async def _get_history_slices(
+        self, stream_names: Sequence[str], redis_start: str, redis_stop: str, slices: int
+    ) -> List[Tuple[str, str]]:
+        """Split the given range into (at most) the given number of time slices
+
+        Open-ended ranges are bounded by the first/last message present in the streams.
+        Returns a list of (start, stop) message ID tuples, suitable for passing to XRANGE.
+        """
+        with await self.connection_manager() as redis:
+            if redis_start == "-":
+                first_ids = [
+                    messages[0][0]
+                    for messages in await asyncio.gather(
+                        *[redis.xrange(stream, "-", "+", count=1) for stream in stream_names]
+                    )
+                    if messages
+                ]
+                if not first_ids:
+                    return []
+                start_ms = min(redis_stream_id_to_tuple(decode(i, "utf8")) for i in first_ids)[0]
+            else:
+                start_ms = redis_stream_id_to_tuple(redis_start)[0]
+
+            if redis_stop == "+":
+                last_ids = [
+                    messages[0][0]
+                    for messages in await asyncio.gather(
+                        *[redis.xrevrange(stream, "+", "-", count=1) for stream in stream_names]
+                    )
+                    if messages
+                ]
+                if not last_ids:
+                    return []
+                stop_ms = max(redis_stream_id_to_tuple(decode(i, "utf8")) for i in last_ids)[0]
+            else:
+                stop_ms = redis_stream_id_to_tuple(redis_stop)[0]
+
+        if stop_ms < start_ms:
+            return []
+
+        step = max(1, math.ceil((stop_ms - start_ms + 1) / slices))
+        ranges = []
+        for slice_start_ms in range(start_ms, stop_ms + 1, step):
+            slice_stop_ms = slice_start_ms + step - 1
+            # A millisecond timestamp without a sequence number selects the
+            # entire millisecond when used as the end of a range
+            ranges.append((f"{slice_start_ms:013d}-0", f"{slice_stop_ms:013d}"))
+
+        # The outer bounds may specify sequence numbers, so use them as given
+        ranges[0] = (redis_start, ranges[0][1])
+        ranges[-1] = (ranges[-1][0], redis_stop)
+        return ranges
+
+    async def _stream_history(
+        self,
+        stream_name: str,
+        redis_start: str,
+        redis_stop: str,
+        batch_size: int,
+        reverse: bool = False,
+        expected_events: Container[str] = ("*",),
+    ) -> AsyncGenerator[Tuple[str, str, dict], None]:
+        """Page through a single stream, yielding tuples of (stream, message ID, fields)
+
+        Each page is fetched from the ID following the last ID of the previous page
+        (or preceding it, if reversed). The next page is requested before the
+        current page is yielded, so the round trip to Redis overlaps with the
+        caller's processing. The bodies of any `expected_events` stored using
+        claim checks are fetched along with the page.
+        """
+
+        async def fetch(cursor):
+            with await self.connection_manager() as redis:
+                if reverse:
+                    page = await redis.xrevrange(stream_name, cursor, redis_start, count=batch_size)
+                else:
+                    page = await redis.xrange(stream_name, cursor, redis_stop, count=batch_size)
+                resolved = await self._resolve_claim_checks(
+                    redis, [(stream_name, m, fields) for m, fields in page], expected_events
+                )
+                return page, resolved
+
+        next_page = asyncio.ensure_future(fetch(redis_stop if reverse else redis_start))
+        try:
+            while next_page:
+                messages, resolved = await next_page
+                next_page = None
+                if len(messages) == batch_size:
+                    # There may be more messages, so start fetching them now
+                    last_id = decode(messages[-1][0], "utf8")
+                    if not reverse:
+                        next_page = asyncio.ensure_future(fetch(redis_stream_id_add_one(last_id)))
+                    elif redis_stream_id_to_tuple(last_id) != (0, 0):
+                        next_page = asyncio.ensure_future(fetch(redis_stream_id_before(last_id)))
+
+                for _, message_id, fields in resolved:
+                    yield stream_name, decode(message_id, "utf8"), fields
+        finally:
+            await cancel(next_page)
+
+    async def _create_consumer_groups(self, streams, redis, consumer_group):
+        """Create the consumer group on each of the given streams, along with any missing streams
+
+        Groups which we know to exist are skipped, so reconnecting is cheap. The
+        remaining groups are created using a single pipelined round trip.
+        """
+        streams_to_create = [
+            (stream, since)
+            for stream, since in streams.items()
+            if (stream, consumer_group) not in self._created_consumer_groups
+        ]
+        if not streams_to_create:
+            return
+
+        # MKSTREAM creates the stream if it does not already exist.
+        results = await asyncio.gather(
+            *[
+                redis.execute(b"XGROUP", b"CREATE", stream, consumer_group, since, b"MKSTREAM")
+                for stream, since in streams_to_create
+            ],
+            return_exceptions=True,
+        )
+        for (stream, _), result in zip(streams_to_create, results):
+            # The group may already exist
+            if isinstance(result, Exception) and "BUSYGROUP" not in str(result):
+                raise result
+            self._created_consumer_groups.add((stream, consumer_group))
+
+    def _forget_consumer_group(self, consumer_group: str, streams: Sequence[str] = None):
+        """The given consumer group no longer exists, so will need to be created again"""
+        self._created_consumer_groups = {
+            (stream, group)
+            for stream, group in self._created_consumer_groups
+            if group != consumer_group or (streams is not None and stream not in streams)
+        }
 
     def _fields_to_message(
         self,
@@ -911,18 +2959,125 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
     ) -> Optional[RedisEventMessage]:
         if tuple(fields.items()) == ((b"", b""),):
             return None
+        if b"claim_check" in fields:
+            # The message's body was not fetched, as the event was not wanted.
+            # See _resolve_claim_checks()
+            logger.debug(f"Ignoring message for unexpected event: {fields.get(b'event_name')}")
+            return None
+        if REQUEUED_FOR_FIELD in fields:
+            # Not part of the message itself. See _skip_messages_for_other_groups()
+            fields = OrderedDict((k, v) for k, v in fields.items() if k != REQUEUED_FOR_FIELD)
         message = self.deserializer(
             fields, stream=stream, native_id=native_id, consumer_group=consumer_group
         )
 
         want_message = ("*" in expected_event_names) or (message.event_name in expected_event_names)
-        if self.stream_use == StreamUse.PER_API and not want_message:
+        if self.stream_use != StreamUse.PER_EVENT and not want_message:
             # Only care about events we are listening for. If we have one stream
-            # per API then we're probably going to receive some events we don't care about.
+            # per API (or per partition) then we're probably going to receive some
+            # events we don't care about.
             logger.debug(f"Ignoring message for unexpected event: {message}")
             return None
         return message
 
+    async def _skip_messages_for_other_groups(
+        self, redis, stream_messages: List[Tuple[Any, Any, dict]], consumer_group: str
+    ) -> List[Tuple[Any, Any, dict]]:
+        """Acknowledge & remove any messages which were requeued for another consumer group
+
+        Requeued dead letters are added back onto the stream they came from, and will
+        therefore be read by every consumer group on that stream. However, only the group
+        in which they failed should process them. See requeue_dead_letters()
+        """
+        skipped_ids = OrderedDict()
+        kept = []
+        for stream, message_id, fields in stream_messages:
+            requeued_for = fields.get(REQUEUED_FOR_FIELD)
+            if requeued_for is not None and decode(requeued_for, "utf8") != consumer_group:
+                skipped_ids.setdefault(stream, []).append(message_id)
+            else:
+                kept.append((stream, message_id, fields))
+
+        if skipped_ids:
+            logger.debug(
+                f"Skipping {sum(map(len, skipped_ids.values()))} requeued messages "
+                f"intended for other consumer groups"
+            )
+            await asyncio.gather(
+                *[
+                    redis.xack(stream, consumer_group, *message_ids)
+                    for stream, message_ids in skipped_ids.items()
+                ]
+            )
+        return kept
+
+    async def _resolve_claim_checks(
+        self,
+        redis,
+        stream_messages: Sequence[Tuple[Any, Any, dict]],
+        expected_event_names: Container[str],
+        consumer_group: Optional[str] = None,
+    ) -> List[Tuple[Any, Any, dict]]:
+        """Fetch the bodies of any messages which were stored using a claim check
+
+        Takes tuples of (stream, message ID, fields). The bodies of all wanted
+        events are fetched in a single pipelined round trip, and are merged back
+        into the message's fields. See _pipeline_xadd().
+
+        A body may have expired before it could be read. Such messages can never
+        be processed, so they are logged, acknowledged (if a consumer group is given),
+        and omitted from the returned list.
+        """
+        to_fetch = [
+            i
+            for i, (_, _, fields) in enumerate(stream_messages)
+            if fields
+            and b"claim_check" in fields
+            and (
+                "*" in expected_event_names
+                or self.stream_use == StreamUse.PER_EVENT
+                or decode(fields.get(b"event_name", b""), "utf8") in expected_event_names
+            )
+        ]
+        if not to_fetch:
+            return list(stream_messages)
+
+        bodies = await asyncio.gather(
+            *[redis.hgetall(stream_messages[i][2][b"claim_check"]) for i in to_fetch]
+        )
+
+        resolved = list(stream_messages)
+        lost_message_ids = OrderedDict()
+        for i, body in zip(to_fetch, bodies):
+            stream, message_id, fields = resolved[i]
+            resolved[i] = None
+            if not body:
+                stream, message_id = decode(stream, "utf8"), decode(message_id, "utf8")
+                logger.error(
+                    L(
+                        "Body of event {} on stream {} has expired (claim check {}). Skipping",
+                        Bold(message_id),
+                        Bold(stream),
+                        Bold(decode(fields[b"claim_check"], "utf8")),
+                    )
+                )
+                lost_message_ids.setdefault(stream, []).append(message_id)
+                continue
+
+            fields = OrderedDict((k, v) for k, v in fields.items() if k != b"claim_check")
+            fields.update(body)
+            resolved[i] = (stream, message_id, fields)
+
+        if lost_message_ids and consumer_group:
+            await asyncio.gather(
+                *[
+                    redis.xack(stream, consumer_group, *message_ids)
+                    for stream, message_ids in lost_message_ids.items()
+                ]
+            )
+
+        return [message for message in resolved if message]
+
     def _get_stream_names(self, listen_for):
         """Convert a list of api names & event names into stream names
 
@@ -931,9 +3086,15 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
         stream_names = []
         for api_name, event_name in listen_for:
             if self.stream_use == StreamUse.PER_EVENT:
-                stream_name = f"{api_name}.{event_name}:stream"
+                stream_name = f"{self.hash_tag(api_name)}.{event_name}:stream"
             elif self.stream_use == StreamUse.PER_API:
-                stream_name = f"{api_name}.*:stream"
+                stream_name = f"{self.hash_tag(api_name)}.*:stream"
+            elif self.stream_use == StreamUse.PER_PARTITION:
+                for partition in range(0, self.partition_count):
+                    stream_name = self._get_partition_stream_name(api_name, partition)
+                    if stream_name not in stream_names:
+                        stream_names.append(stream_name)
+                continue
             else:
                 raise ValueError(
                     "Invalid value for stream_use config option. This should have been caught "
@@ -943,6 +3104,403 @@ class RedisEventTransport(RedisTransportMixin, EventTransport):
                 stream_names.append(stream_name)
         return stream_names
 
+    def _get_partition_stream_name(self, api_name: str, partition: int) -> str:
+        return f"{self.hash_tag(api_name)}.*:{partition}:stream"
+
+    def _get_stream_for_message(
+        self, event_message: EventMessage, bus_client: Optional["BusClient"]
+    ) -> str:
+        """Get the name of the stream to which the given message should be sent"""
+        if self.stream_use != StreamUse.PER_PARTITION:
+            return self._get_stream_names([(event_message.api_name, event_message.event_name)])[0]
+
+        partition_key = None
+        if bus_client:
+            api = bus_client.api_registry.get(event_message.api_name)
+            partition_key = api.get_event(event_message.event_name).partition_key
+
+        if partition_key:
+            # Events with the same key go to the same partition, and so are kept in order
+            value = event_message.kwargs.get(partition_key)
+        else:
+            # Ordering is unimportant, so just spread the events evenly across the partitions
+            value = event_message.id
+
+        # Use a hash which is stable between processes
+        partition = zlib.crc32(str(value).encode("utf8")) % self.partition_count
+        return self._get_partition_stream_name(event_message.api_name, partition)
+
+    async def _assign_partitions(self, consumer_group: str, stream_names: List[str]) -> List[str]:
+        """Determine which partition streams this consumer should read from
+
+        Each consumer in the group registers itself in a sorted set, scored by the
+        time it was last seen. Consumers which have not been seen for several
+        heartbeats are removed. The partitions are then divided between the
+        remaining consumers, such that each partition is read by only one consumer.
+        This keeps the events within each partition in order.
+
+        Note that ordering is only best-effort while partitions are being
+        reassigned, or when messages are reclaimed from a failed consumer.
+        """
+        key = self._get_partition_consumers_key(consumer_group)
+        now = time.time()
+        expiry = self.partition_heartbeat_interval * 3
+        with await self.connection_manager() as redis:
+            p = redis.pipeline()
+            p.zadd(key, now, self.consumer_name)
+            p.zremrangebyscore(key, max=now - expiry)
+            p.zrange(key, encoding="utf8")
+            p.expire(key, int(expiry) + 1)
+            _, _, consumer_names, _ = await p.execute()
+
+        consumer_names = sorted(consumer_names)
+        index = consumer_names.index(self.consumer_name)
+        return [
+            stream_name
+            for i, stream_name in enumerate(stream_names)
+            if i % len(consumer_names) == index
+        ]
+
+    async def _leave_partitions(self, consumer_group: str):
+        with await self.connection_manager() as redis:
+            await redis.zrem(self._get_partition_consumers_key(consumer_group), self.consumer_name)
+
+    def _get_partition_consumers_key(self, consumer_group: str) -> str:
+        return f"{consumer_group}:partition_consumers"
+
+
+class _StreamSubscription(object):
+    """A single listener's interest in the messages read by the transport's _StreamReaders"""
+
+    def __init__(
+        self, consumer_group: str, stream_names: Sequence[str], expected_events: Container[str]
+    ):
+        self.consumer_group = consumer_group
+        self.stream_names = stream_names
+        self.expected_events = expected_events
+        # The readers this subscription has been subscribed to (one per slot in cluster mode)
+        self.readers: List["_StreamReader"] = []
+        # Is the listener currently waiting for messages?
+        self.waiting = False
+        # Contains lists of messages, or an exception raised by a reader
+        self.queue = asyncio.Queue()
+
+    def wants(self, event_message: RedisEventMessage) -> bool:
+        return event_message.stream in self.stream_names and (
+            "*" in self.expected_events or event_message.event_name in self.expected_events
+        )
+
+    async def get(self) -> List[RedisEventMessage]:
+        if self.queue.empty():
+            # Let the readers know we are ready for more messages
+            self.waiting = True
+            for reader in self.readers:
+                await reader.wake(self)
+        try:
+            item = await self.queue.get()
+        finally:
+            self.waiting = False
+
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+class _StreamReader(object):
+    """Read new messages on behalf of all of the transport's listeners
+
+    Each listener subscribes to the reader. Whenever any listeners are waiting
+    for messages the reader reads any new messages for each of their consumer
+    groups (without blocking), and routes them back to the relevant subscriptions.
+    If there are no new messages, the reader issues a single blocking XREAD across
+    all of the waiting listeners' streams, and reads again once a message arrives.
+    Only one connection is therefore tied up in blocking reads, however many
+    listeners and consumer groups there are.
+
+    Messages are only read on behalf of listeners which are ready to process
+    them. If a listener becomes ready while the reader is blocked on streams
+    other than its own, the blocked read is interrupted (via ``CLIENT UNBLOCK``)
+    so that it can be reissued with the listener's streams included.
+
+    Where listeners share a stream and consumer group (i.e. when using
+    ``StreamUse.PER_API``) a read made for one listener may also return messages
+    for another. These are queued until that listener is ready.
+
+    A single command can only access keys within one cluster slot, so in cluster
+    mode there is a reader for each slot.
+    """
+
+    def __init__(self, transport: RedisEventTransport, slot: Optional[int] = None):
+        self.transport = transport
+        self.slot = slot
+        self.subscriptions: List[_StreamSubscription] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wake_event = asyncio.Event()
+        # The Redis client ID of our connection, and the (consumer group, stream)
+        # pairs we are currently performing a blocking read for (if any)
+        self._client_id: Optional[int] = None
+        self._blocked_on: Optional[Set[Tuple[str, str]]] = None
+        self._unblocking = False
+
+    def subscribe(self, subscription: _StreamSubscription):
+        self.subscriptions.append(subscription)
+        subscription.readers.append(self)
+        if not self._task or self._task.done():
+            self._task = asyncio.ensure_future(self._read_loop())
+
+    def unsubscribe(self, subscription: _StreamSubscription):
+        # Any messages which have been read but not taken by the subscription
+        # will remain pending and so can be reclaimed
+        self.subscriptions.remove(subscription)
+        subscription.readers.remove(self)
+        if not self.subscriptions and self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def wake(self, subscription: _StreamSubscription = None):
+        """Let the reader know a subscription is waiting, or that its streams have changed"""
+        self._wake_event.set()
+        blocked_on = self._blocked_on
+        if blocked_on is None or self._unblocking:
+            return
+        if subscription is not None and blocked_on.issuperset(
+            (subscription.consumer_group, s) for s in self._get_stream_names(subscription)
+        ):
+            return
+
+        # The current read does not include this subscription's streams, so
+        # unblock it. The read will return no messages and will then be reissued.
+        self._unblocking = True
+        try:
+            with await self.transport.connection_manager() as redis:
+                while self._blocked_on is blocked_on:
+                    if await redis.execute(b"CLIENT", b"UNBLOCK", self._client_id, b"TIMEOUT"):
+                        break
+                    # Our blocking read has yet to reach Redis, so try again shortly
+                    await asyncio.sleep(0.01)
+        finally:
+            self._unblocking = False
+
+    async def close(self):
+        await cancel(self._task)
+        self._task = None
+
+    def _get_stream_names(self, subscription: _StreamSubscription) -> List[str]:
+        """Get the subscription's streams which are within this reader's slot"""
+        return [
+            s
+            for s in subscription.stream_names
+            if self.slot is None or redis_key_slot(s) == self.slot
+        ]
+
+    async def _read_loop(self):
+        while self.subscriptions:
+            try:
+                await self._read()
+            except (ConnectionClosedError, ConnectionResetError):
+                # ConnectionClosedError is from aioredis. However, sometimes the connection
+                # can die outside of aioredis, in which case we get a builtin ConnectionResetError.
+                logger.warning(
+                    f"Redis connection lost while consuming events, reconnecting "
+                    f"in {self.transport.consumption_restart_delay} seconds..."
+                )
+                await asyncio.sleep(self.transport.consumption_restart_delay)
+            except asyncio.CancelledError:
+                # CancelledError is an Exception prior to Python 3.8, and must
+                # not be passed on to the listeners
+                raise
+            except Exception as e:
+                # Surface the error within each of the listeners
+                for subscription in self.subscriptions:
+                    subscription.queue.put_nowait(e)
+                return
+
+    async def _read(self):
+        with await self.transport.blocking_connection_manager() as redis:
+            self._client_id = await redis.execute(b"CLIENT", b"ID")
+            while self.subscriptions:
+                self._wake_event.clear()
+
+                # Keys are consumer groups, values are the streams to read for that group
+                group_streams = OrderedDict()
+                for subscription in self.subscriptions:
+                    # A subscription may have no streams if it has no partitions assigned
+                    stream_names = self._get_stream_names(subscription)
+                    if subscription.waiting and stream_names:
+                        group_stream_names = group_streams.setdefault(
+                            subscription.consumer_group, []
+                        )
+                        group_stream_names.extend(
+                            s for s in stream_names if s not in group_stream_names
+                        )
+                if not group_streams:
+                    await self._wake_event.wait()
+                    continue
+
+                results = await asyncio.gather(
+                    *[
+                        self._read_group(redis, consumer_group, stream_names)
+                        for consumer_group, stream_names in group_streams.items()
+                    ]
+                )
+
+                read_messages = False
+                # Keys are streams, values are the ID to block upon the stream from
+                latest_ids = OrderedDict()
+                blocked_on = set()
+                for (consumer_group, stream_names), (stream_messages, last_ids) in zip(
+                    group_streams.items(), results
+                ):
+                    if stream_messages or last_ids is None:
+                        # There may be more messages to read, so don't block
+                        read_messages = True
+                    else:
+                        for stream_name, last_id in zip(stream_names, last_ids):
+                            last_id = decode(last_id, "utf8")
+                            if stream_name not in latest_ids or redis_stream_id_to_tuple(
+                                last_id
+                            ) < redis_stream_id_to_tuple(latest_ids[stream_name]):
+                                latest_ids[stream_name] = last_id
+                            blocked_on.add((consumer_group, stream_name))
+
+                    if stream_messages:
+                        stream_messages = await self.transport._skip_messages_for_other_groups(
+                            redis, stream_messages, consumer_group
+                        )
+                        stream_messages = await self._resolve_claim_checks(
+                            redis, stream_messages, consumer_group
+                        )
+                        self._route(consumer_group, stream_messages)
+
+                if read_messages or self._wake_event.is_set():
+                    # Read again, as there may be more messages, or a subscription
+                    # may have started waiting (or changed streams) since we read
+                    continue
+
+                await self._block(redis, latest_ids, blocked_on)
+
+    async def _read_group(
+        self, redis, consumer_group: str, stream_names: List[str]
+    ) -> Tuple[List[Tuple[bytes, bytes, dict]], Optional[List[bytes]]]:
+        """Read new messages for a consumer group without blocking. See FILTERED_READ_SCRIPT
+
+        Returns the messages read, along with the ID of the last message in each
+        stream if the streams have been drained of new messages (otherwise None).
+        """
+        args = [
+            consumer_group,
+            self.transport.consumer_name,
+            self.transport.batch_size,
+            *(self._get_wanted_events(consumer_group) or []),
+        ]
+        try:
+            result = await redis.evalsha(FILTERED_READ_SCRIPT_SHA, keys=stream_names, args=args)
+        except ReplyError as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+            result = await redis.eval(FILTERED_READ_SCRIPT, keys=stream_names, args=args)
+
+        messages, drained, last_ids = result
+        stream_messages = [
+            (stream, message_id, fields_to_dict(fields)) for stream, message_id, fields in messages
+        ]
+        return stream_messages, last_ids if drained else None
+
+    async def _block(self, redis, latest_ids: Dict[str, str], blocked_on: Set[Tuple[str, str]]):
+        """Wait for a message to be added to any of the given streams
+
+        This will block until a message arrives, or until we are unblocked by wake().
+        At most one message is transferred, as the caller will then read the new
+        messages for each consumer group.
+        """
+        stream_names = list(latest_ids.keys())
+        self._blocked_on = blocked_on
+        try:
+            await redis.xread(
+                streams=stream_names,
+                latest_ids=[latest_ids[s] for s in stream_names],
+                count=1,
+                timeout=0,
+            )
+        finally:
+            self._blocked_on = None
+
+    def _get_wanted_events(self, consumer_group: str) -> Optional[List[str]]:
+        """Get the event names to filter for server-side, or None if we should not filter
+
+        Filtering is only worthwhile where events share a stream. The events wanted by
+        every subscription in the consumer group are included, as messages read for one
+        subscription may be routed to another.
+        """
+        if (
+            not self.transport.server_side_filtering
+            or self.transport.stream_use == StreamUse.PER_EVENT
+        ):
+            return None
+
+        wanted_events = set()
+        for subscription in self.subscriptions:
+            if subscription.consumer_group != consumer_group:
+                continue
+            if "*" in subscription.expected_events:
+                return None
+            wanted_events.update(subscription.expected_events)
+        return sorted(wanted_events)
+
+    async def _resolve_claim_checks(self, redis, stream_messages, consumer_group: str):
+        """Fetch the bodies of any messages wanted by the consumer group's subscriptions"""
+        expected_events = set()
+        for subscription in self.subscriptions:
+            if subscription.consumer_group == consumer_group:
+                expected_events.update(subscription.expected_events)
+        return await self.transport._resolve_claim_checks(
+            redis, stream_messages, expected_events, consumer_group
+        )
+
+    def _route(self, consumer_group: str, stream_messages):
+        # Prefer giving messages to those subscriptions which are waiting for them
+        subscriptions = sorted(
+            [s for s in self.subscriptions if s.consumer_group == consumer_group],
+            key=lambda s: not s.waiting,
+        )
+
+        # Keys are subscriptions, values are the messages for that subscription
+        routed = OrderedDict()
+        for stream, message_id, fields in stream_messages:
+            message_id = decode(message_id, "utf8")
+            stream = decode(stream, "utf8")
+            event_message = self.transport._fields_to_message(
+                fields,
+                {"*"},
+                stream=stream,
+                native_id=message_id,
+                consumer_group=consumer_group,
+            )
+            if not event_message:
+                # noop message
+                continue
+
+            for subscription in subscriptions:
+                if subscription.wants(event_message):
+                    break
+            else:
+                logger.debug(f"Ignoring message for unexpected event: {event_message}")
+                continue
+
+            logger.debug(
+                LBullets(
+                    L("⬅ Received new event {} on stream {}", Bold(message_id), Bold(stream)),
+                    items=dict(**event_message.get_metadata(), kwargs=event_message.get_kwargs()),
+                )
+            )
+            # NOTE: YIELD ALL MESSAGES, NOT JUST ONE
+            routed.setdefault(subscription, []).append(event_message)
+
+        for subscription, event_messages in routed.items():
+            # The subscription is no longer waiting now that it has messages to process
+            subscription.waiting = False
+            subscription.queue.put_nowait(event_messages)
+
 
 class RedisSchemaTransport(RedisTransportMixin, SchemaTransport):
     def __init__(
@@ -951,9 +3509,11 @@ class RedisSchemaTransport(RedisTransportMixin, SchemaTransport):
         redis_pool=None,
         url: str = "redis://127.0.0.1:6379/0",
         connection_parameters: Mapping = frozendict(),
+        cluster_mode: bool = False,
     ):
         self.set_redis_pool(redis_pool, url, connection_parameters)
         self._latest_ids = {}
+        self.cluster_mode = cluster_mode
 
     @classmethod
     def from_config(
@@ -961,15 +3521,17 @@ class RedisSchemaTransport(RedisTransportMixin, SchemaTransport):
         config,
         url: str = "redis://127.0.0.1:6379/0",
         connection_parameters: Mapping = frozendict(),
+        cluster_mode: bool = False,
     ):
-        return cls(url=url, connection_parameters=connection_parameters)
+        return cls(url=url, connection_parameters=connection_parameters, cluster_mode=cluster_mode)
 
     def schema_key(self, api_name):
-        return "schema:{}".format(api_name)
+        # All schema keys share a hash tag, so they can be fetched with a single MGET
+        return "{}:{}".format(self.hash_tag("schema"), api_name)
 
     def schema_set_key(self):
         """Maintains a set of api names in redis which can be used to retrieve individual schemas"""
-        return "schemas"
+        return "{}s".format(self.hash_tag("schema"))
 
     async def store(self, api_name: str, schema: Dict, ttl_seconds: Optional[int]):
         """Store an individual schema"""
@@ -1006,6 +3568,21 @@ class RedisSchemaTransport(RedisTransportMixin, SchemaTransport):
         return schemas
 
 
+def redis_stream_id_before(message_id: str) -> str:
+    """Get the end of the range which immediately precedes the given message ID
+
+    Unlike redis_stream_id_subtract_one(), this is exact. It may return a
+    millisecond timestamp without a sequence number, which Redis will interpret
+    as the largest ID within that millisecond when used as the end of a range.
+    It is therefore only suitable for use as the end of a range.
+    """
+    milliseconds, n = map(int, message_id.split("-"))
+    if n > 0:
+        return f"{milliseconds:013d}-{n - 1}"
+    else:
+        return f"{milliseconds - 1:013d}"
+
+
 def redis_stream_id_subtract_one(message_id):
     """Subtract one from the message ID
 
@@ -1026,6 +3603,43 @@ def redis_stream_id_subtract_one(message_id):
     return "{:13d}-{}".format(milliseconds, n)
 
 
+def redis_stream_id_to_tuple(message_id: str) -> Tuple[int, int]:
+    """Convert a message ID into a tuple which can be used for sorting"""
+    milliseconds, n = map(int, message_id.split("-"))
+    return milliseconds, n
+
+
+async def merge_sorted_async(generators: Sequence[AsyncGenerator], key=None) -> AsyncGenerator:
+    """Merge multiple sorted async generators into a single sorted async generator
+
+    The async equivalent of heapq.merge()
+    """
+    key = key or (lambda v: v)
+    heap = []
+    try:
+        for index, generator in enumerate(generators):
+            try:
+                value = await generator.__anext__()
+            except StopAsyncIteration:
+                continue
+            heap.append((key(value), index, value))
+        heapq.heapify(heap)
+
+        while heap:
+            _, index, value = heap[0]
+            yield value
+            try:
+                value = await generators[index].__anext__()
+            except StopAsyncIteration:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (key(value), index, value))
+    finally:
+        # Make sure any in-flight fetches are cleaned up
+        for generator in generators:
+            await generator.aclose()
+
+
 def redis_stream_id_add_one(message_id):
     """Add one to the message ID
 
@@ -1066,5 +3680,46 @@ def datetime_to_redis_steam_id(dt: datetime) -> str:
     return f"{timestamp:013d}-0"
 
 
+def redis_key_slot(key: Union[str, bytes]) -> int:
+    """Get the Redis Cluster hash slot for the given key
+
+    Only the contents of the key's hash tag (if any) are hashed
+    """
+    if isinstance(key, str):
+        key = key.encode("utf8")
+    tag_start = key.find(b"{")
+    if tag_start != -1:
+        tag_end = key.find(b"}", tag_start + 1)
+        if tag_end > tag_start + 1:
+            key = key[tag_start + 1 : tag_end]
+    # Redis uses the CRC16-CCITT (XMODEM) checksum
+    return binascii.crc_hqx(key, 0) % 16384
+
+
+def encode_scheduled_fields(fields: dict) -> bytes:
+    """Encode the given stream fields into a single value for the scheduled bodies hash
+
+    Each key & value is prefixed by its length, so values may contain any bytes
+    (i.e. compressed kwargs). These are decoded again by MOVE_SCHEDULED_SCRIPT.
+    """
+    encoded = []
+    for item in itertools.chain.from_iterable(fields.items()):
+        if not isinstance(item, bytes):
+            item = str(item).encode("utf8")
+        encoded.append(b"%d:%s" % (len(item), item))
+    return b"".join(encoded)
+
+
+def make_serializer(serializer: str, compression: Optional[str], compression_threshold: int):
+    """Instantiate the given serializer class, which may be configured to compress messages"""
+    if not compression:
+        # Custom serializers may not support compression, so avoid
+        # passing the options unless we need to
+        return import_from_string(serializer)()
+    return import_from_string(serializer)(
+        compression=compression, compression_threshold=compression_threshold
+    )
+
+
 class InvalidRedisPool(LightbusException):
     pass
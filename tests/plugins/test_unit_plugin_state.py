@@ -73,8 +73,29 @@ async def test_ping(dummy_bus: BusPath, loop, get_dummy_events):
     assert event_message.kwargs["ping_interval"] == 0.1
     assert event_message.kwargs["service_name"] == "foo"
     assert event_message.kwargs["process_name"] == "bar"
+    # The debug event transport cannot report its backlog
+    assert event_message.kwargs["consumer_lag"] == []
 
 
+@pytest.mark.asyncio
+async def test_ping_consumer_lag_error(dummy_bus: BusPath, loop, get_dummy_events, mocker):
+    """Pings are still sent if the consumer lag cannot be determined"""
+
+    async def consumer_lag():
+        raise ConnectionResetError()
+
+    mocker.patch.object(dummy_bus.client, "consumer_lag", side_effect=consumer_lag)
+
+    state_plugin = StatePlugin(service_name="foo", process_name="bar")
+    state_plugin.ping_interval = 0.1
+    task = asyncio.ensure_future(state_plugin._send_ping(client=dummy_bus.client), loop=loop)
+    await asyncio.sleep(0.15)
+    await cancel(task)
+
+    dummy_events = get_dummy_events()
+    assert len(dummy_events) == 1
+    assert dummy_events[0].event_name == "server_ping"
+    assert dummy_events[0].kwargs["consumer_lag"] is None
 @pytest.mark.asyncio
 async def test_after_server_stopped(dummy_bus: BusPath, loop, get_dummy_events):
     await dummy_bus.client.register_api_async(TestApi())
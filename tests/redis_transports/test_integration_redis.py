@@ -364,19 +364,16 @@ async def test_event_exception_in_listener_realtime(
     # Now check we have not acked any messages
 
     messages = await redis_client.xrange("my.dummy.my_event:stream")
-    # Messages 0 is the noop message used to create the stream
     message_ids = [id_ for id_, *_ in messages]
 
     pending_messages = await redis_client.xpending(
         "my.dummy.my_event:stream", "test_service-test_listener", "-", "+", 10, "test_consumer"
     )
     pending_message_ids = [id_ for id_, *_ in pending_messages]
-    # The first 4 messages are still pending. Why 4 messages? Because:
-    #  - 1. The noop message used to create the stream (because we listened before we fired)
-    #  - 2. The first message which caused the error
+    # Only the first message, which caused the error, is still pending
 
-    assert len(pending_message_ids) == 2
-    assert pending_message_ids == message_ids[:2]
+    assert len(pending_message_ids) == 1
+    assert pending_message_ids == message_ids[:1]
 
 
 @pytest.mark.asyncio
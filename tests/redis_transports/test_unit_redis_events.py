@@ -1,9 +1,14 @@
 import asyncio
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 import pytest
+from aioredis.util import decode
 
+from lightbus import Api, Event
+from lightbus.api import Registry
 from lightbus.config import Config
 from lightbus.message import EventMessage
 from lightbus.serializers import (
@@ -12,7 +17,13 @@ from lightbus.serializers import (
     BlobMessageSerializer,
     BlobMessageDeserializer,
 )
-from lightbus.transports.redis import RedisEventTransport, StreamUse, RedisEventMessage
+from lightbus.transports.redis import (
+    RedisEventTransport,
+    StreamUse,
+    RedisEventMessage,
+    _StreamReader,
+    _StreamSubscription,
+)
 from lightbus.utilities.async_tools import cancel
 
 pytestmark = pytest.mark.unit
@@ -63,6 +74,383 @@ async def test_send_event_per_api_stream(redis_event_transport: RedisEventTransp
     }
 
 
+@pytest.mark.asyncio
+async def test_send_events(redis_event_transport: RedisEventTransport, redis_client):
+    await redis_event_transport.send_events(
+        [
+            EventMessage(api_name="my.api", event_name="my_event", id="1", kwargs={"field": "a"}),
+            EventMessage(api_name="my.api", event_name="my_event", id="2", kwargs={"field": "b"}),
+            EventMessage(api_name="my.api", event_name="other", id="3", kwargs={"field": "c"}),
+        ],
+        options={},
+        bus_client=None,
+    )
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [m[1][b"id"] for m in messages] == [b"1", b"2"]
+    messages = await redis_client.xrange("my.api.other:stream")
+    assert [m[1][b"id"] for m in messages] == [b"3"]
+
+
+@pytest.mark.asyncio
+async def test_send_event_idempotent(redis_event_transport: RedisEventTransport, redis_client):
+    """Events with the same idempotency key are only sent once within the window"""
+    redis_event_transport.idempotency_window = 60
+    for event_id in ("1", "2"):
+        await redis_event_transport.send_event(
+            EventMessage(api_name="my.api", event_name="my_event", id=event_id, kwargs={}),
+            options={"idempotency_key": "abc"},
+            bus_client=None,
+        )
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.api", event_name="my_event", id="3", kwargs={}),
+        options={"idempotency_key": "xyz"},
+        bus_client=None,
+    )
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [m[1][b"id"] for m in messages] == [b"1", b"3"]
+    assert 0 < await redis_client.ttl("my.api.my_event:stream:idempotency:abc") <= 60
+
+
+@pytest.mark.asyncio
+async def test_send_events_idempotent_by_id(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    """Without an idempotency key, events are deduplicated by their ID"""
+    redis_event_transport.idempotency_window = 60
+    event_messages = [
+        EventMessage(api_name="my.api", event_name="my_event", id="1", kwargs={"field": "a"}),
+        EventMessage(api_name="my.api", event_name="my_event", id="2", kwargs={"field": "b"}),
+    ]
+    # Send again, as a caller would when retrying after a timeout
+    await redis_event_transport.send_events(event_messages, options={}, bus_client=None)
+    await redis_event_transport.send_events(event_messages, options={}, bus_client=None)
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [m[1][b"id"] for m in messages] == [b"1", b"2"]
+    assert messages[0][1][b":field"] == b'"a"'
+
+
+@pytest.mark.asyncio
+async def test_send_event_delayed(redis_event_transport: RedisEventTransport, redis_client):
+    """Delayed events are scheduled, rather than being added to the stream"""
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.api", event_name="my_event", id="123", kwargs={"field": "value"}),
+        options={"delay": 60},
+        bus_client=None,
+    )
+    assert await redis_client.xlen("my.api.my_event:stream") == 0
+    assert await redis_client.zrange("my.api.my_event:stream:scheduled") == [b"123"]
+    assert await redis_client.hget("my.api.my_event:stream:scheduled:bodies", "123") == (
+        b'2:id3:1238:api_name6:my.api10:event_name8:my_event7:version1:16::field7:"value"'
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_event_delayed_claim_check(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    """Large scheduled events are stored under a claim check which outlives the delay"""
+    redis_event_transport.claim_check_threshold = 10
+    await redis_event_transport.send_event(
+        EventMessage(
+            api_name="my.api", event_name="my_event", id="123", kwargs={"field": "x" * 20}
+        ),
+        options={"delay": 60},
+        bus_client=None,
+    )
+    encoded = await redis_client.hget("my.api.my_event:stream:scheduled:bodies", "123")
+    assert b"11:claim_check" in encoded
+    assert b"xxxxx" not in encoded
+    assert (
+        await redis_client.ttl("my.api.my_event:stream:claim_check:123")
+        > redis_event_transport.claim_check_ttl
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_event_deliver_at_past(redis_event_transport: RedisEventTransport, redis_client):
+    """Events which are already due are sent immediately"""
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.api", event_name="my_event", id="123", kwargs={}),
+        options={"deliver_at": datetime(2000, 1, 1)},
+        bus_client=None,
+    )
+    assert await redis_client.xlen("my.api.my_event:stream") == 1
+    assert not await redis_client.exists("my.api.my_event:stream:scheduled")
+
+
+@pytest.mark.asyncio
+async def test_move_scheduled_events(redis_event_transport: RedisEventTransport, redis_client):
+    await redis_event_transport.send_events(
+        [
+            EventMessage(api_name="my.api", event_name="my_event", id="1", kwargs={"field": "a"}),
+            EventMessage(api_name="my.api", event_name="my_event", id="2", kwargs={"field": "b"}),
+        ],
+        options={"delay": 0.1},
+        bus_client=None,
+    )
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.api", event_name="my_event", id="3", kwargs={"field": "c"}),
+        options={"delay": 60},
+        bus_client=None,
+    )
+
+    # Nothing is due yet
+    next_due = await redis_event_transport.move_scheduled_events(["my.api.my_event:stream"])
+    assert next_due < time.time() + 1
+    assert await redis_client.xlen("my.api.my_event:stream") == 0
+
+    await asyncio.sleep(0.1)
+    next_due = await redis_event_transport.move_scheduled_events(["my.api.my_event:stream"])
+    assert next_due > time.time() + 50
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [m[1][b"id"] for m in messages] == [b"1", b"2"]
+    assert messages[0][1][b":field"] == b'"a"'
+    assert await redis_client.zrange("my.api.my_event:stream:scheduled") == [b"3"]
+    assert not await redis_client.hexists("my.api.my_event:stream:scheduled:bodies", "1")
+
+
+@pytest.mark.asyncio
+async def test_consume_scheduled_events(redis_event_transport: RedisEventTransport, dummy_api):
+    """Consumers move scheduled events onto the stream as they become due"""
+    redis_event_transport.scheduled_poll_interval = 10
+    consumer = redis_event_transport.consume(
+        listen_for=[("my.dummy", "my_event")], listener_name="test", bus_client=None
+    )
+
+    async def co_fire():
+        await asyncio.sleep(0.1)
+        await redis_event_transport.send_event(
+            EventMessage(api_name="my.dummy", event_name="my_event", id="123", kwargs={}),
+            options={"delay": 0.2},
+            bus_client=None,
+        )
+
+    start_time = time.time()
+    task = asyncio.ensure_future(co_fire())
+    messages = await asyncio.wait_for(consumer.__anext__(), timeout=2)
+    await cancel(task)
+
+    assert messages[0].id == "123"
+    # The scheduler was woken, rather than waiting for the poll interval
+    assert 0.3 <= time.time() - start_time < 2
+
+
+@pytest.mark.asyncio
+async def test_send_event_publish_linger(
+    redis_event_transport: RedisEventTransport, redis_client, mocker
+):
+    """Concurrently sent events should be coalesced into a single pipeline"""
+    redis_event_transport.publish_linger_ms = 50
+    connection_manager_spy = mocker.spy(redis_event_transport, "connection_manager")
+
+    await asyncio.gather(
+        *[
+            redis_event_transport.send_event(
+                EventMessage(api_name="my.api", event_name="my_event", id=str(n), kwargs={}),
+                options={},
+                bus_client=None,
+            )
+            for n in range(10)
+        ]
+    )
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [m[1][b"id"] for m in messages] == [str(n).encode("utf8") for n in range(10)]
+    assert connection_manager_spy.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_send_event_publish_max_batch(
+    redis_event_transport: RedisEventTransport, redis_client, mocker
+):
+    """A full buffer should be sent without waiting for the linger time to elapse"""
+    redis_event_transport.publish_linger_ms = 60_000
+    redis_event_transport.publish_max_batch = 3
+    connection_manager_spy = mocker.spy(redis_event_transport, "connection_manager")
+
+    sends = [
+        redis_event_transport.send_event(
+            EventMessage(api_name="my.api", event_name="my_event", kwargs={}),
+            options={},
+            bus_client=None,
+        )
+        for n in range(6)
+    ]
+    await asyncio.wait_for(asyncio.gather(*sends), timeout=1)
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert len(messages) == 6
+    assert connection_manager_spy.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_publish_buffer(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    redis_event_transport.publish_linger_ms = 60_000
+
+    send_task = asyncio.ensure_future(
+        redis_event_transport.send_event(
+            EventMessage(api_name="my.api", event_name="my_event", kwargs={}),
+            options={},
+            bus_client=None,
+        )
+    )
+    await asyncio.sleep(0.01)
+    await redis_event_transport.close()
+    await send_task
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert len(messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_publish_flush(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    """Batches which are already being sent are completed before the connections are closed"""
+    redis_event_transport.publish_linger_ms = 60_000
+    redis_event_transport.publish_max_batch = 1
+
+    send_task = asyncio.ensure_future(
+        redis_event_transport.send_event(
+            EventMessage(api_name="my.api", event_name="my_event", kwargs={}),
+            options={},
+            bus_client=None,
+        )
+    )
+    # The full batch is now being flushed, but has not been sent
+    await asyncio.sleep(0)
+    assert redis_event_transport._publish_flush_tasks
+    await redis_event_transport.close()
+    assert not redis_event_transport._publish_flush_tasks
+    await send_task
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert len(messages) == 1
+@pytest.mark.asyncio
+async def test_send_event_claim_check(redis_event_transport: RedisEventTransport, redis_client):
+    """Large event bodies are stored under their own key, small ones remain in the stream"""
+    redis_event_transport.claim_check_threshold = 100
+    await redis_event_transport.send_events(
+        [
+            EventMessage(api_name="my.api", event_name="my_event", id="1", kwargs={"field": "a"}),
+            EventMessage(
+                api_name="my.api", event_name="my_event", id="2", kwargs={"field": "b" * 100}
+            ),
+        ],
+        options={},
+        bus_client=None,
+    )
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert messages[0][1][b":field"] == b'"a"'
+    assert messages[1][1] == {
+        b"api_name": b"my.api",
+        b"event_name": b"my_event",
+        b"id": b"2",
+        b"version": b"1",
+        b"claim_check": b"my.api.my_event:stream:claim_check:2",
+    }
+    body = await redis_client.hgetall("my.api.my_event:stream:claim_check:2")
+    assert body == {b":field": ('"' + "b" * 100 + '"').encode("utf8")}
+    assert await redis_client.ttl("my.api.my_event:stream:claim_check:2") > 0
+
+    events = [m async for m in redis_event_transport.history("my.api", "my_event")]
+    assert [m.kwargs["field"] for m in events] == ["a", "b" * 100]
+
+
+@pytest.mark.asyncio
+async def test_consume_events_claim_check(
+    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
+):
+    redis_event_transport.stream_use = StreamUse.PER_API
+    redis_event_transport.claim_check_threshold = 100
+
+    async def co_consume():
+        async for messages in redis_event_transport.consume(
+            [("my.dummy", "my_event")], "test_listener", bus_client=None
+        ):
+            return messages
+
+    task = asyncio.ensure_future(co_consume())
+    await asyncio.sleep(0.1)
+
+    for event_name in ("other_event", "my_event"):
+        await redis_event_transport.send_event(
+            EventMessage(api_name="my.dummy", event_name=event_name, kwargs={"field": "x" * 100}),
+            options={},
+            bus_client=None,
+        )
+    messages = await asyncio.wait_for(task, timeout=1)
+
+    assert [m.event_name for m in messages] == ["my_event"]
+    assert messages[0].kwargs == {"field": "x" * 100}
+
+
+@pytest.mark.asyncio
+async def test_consume_events_cluster_mode(
+    loop, redis_event_transport: RedisEventTransport, redis_client
+):
+    """Streams are hash tagged by API, and streams in different slots are read separately"""
+    redis_event_transport.cluster_mode = True
+    events = []
+
+    async def co_consume():
+        async for messages in redis_event_transport.consume(
+            [("my.api", "my_event"), ("other.api", "my_event")], "test_listener", bus_client=None
+        ):
+            events.extend(messages)
+
+    task = asyncio.ensure_future(co_consume())
+    await asyncio.sleep(0.1)
+
+    await redis_event_transport.send_events(
+        [
+            EventMessage(api_name="my.api", event_name="my_event", id="1", kwargs={}),
+            EventMessage(api_name="other.api", event_name="my_event", id="2", kwargs={}),
+        ],
+        options={},
+        bus_client=None,
+    )
+    await asyncio.sleep(0.2)
+    await cancel(task)
+
+    assert await redis_client.xlen("{my.api}.my_event:stream") == 1
+    assert await redis_client.xlen("{other.api}.my_event:stream") == 1
+    assert sorted(e.id for e in events) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_consume_events_claim_check_expired(
+    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api, caplog
+):
+    """Events whose bodies have expired cannot be processed, so are acknowledged and skipped"""
+    redis_event_transport.claim_check_threshold = 100
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.dummy", event_name="my_event", id="1", kwargs={"f": "x" * 100}),
+        options={},
+        bus_client=None,
+    )
+    await redis_client.delete("my.dummy.my_event:stream:claim_check:1")
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.dummy", event_name="my_event", id="2", kwargs={"f": "y"}),
+        options={},
+        bus_client=None,
+    )
+
+    async for messages in redis_event_transport.consume(
+        [("my.dummy", "my_event")], "test_listener", since="0", bus_client=None
+    ):
+        break
+
+    assert [m.id for m in messages] == ["2"]
+    assert "has expired" in caplog.text
+    pending = await redis_client.xpending("my.dummy.my_event:stream", "test_service-test_listener")
+    assert pending[0] == 1
+
+
 @pytest.mark.asyncio
 async def test_consume_events(
     loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
@@ -133,6 +521,48 @@ async def test_consume_events_multiple_consumers(loop, redis_pool, redis_client,
     assert len(messages) == 2
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prefetch_batches,expected_pending", [(0, 1), (2, 4)])
+async def test_consume_events_prefetch(
+    loop,
+    redis_event_transport: RedisEventTransport,
+    redis_client,
+    prefetch_batches,
+    expected_pending,
+):
+    redis_event_transport.batch_size = 1
+    redis_event_transport.prefetch_batches = prefetch_batches
+    for _ in range(10):
+        await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": b"123",
+                b"version": b"1",
+                b":field": b'"value"',
+            },
+        )
+
+    consumer = redis_event_transport.consume(
+        [("my.dummy", "my_event")], "test_listener", since="0", bus_client=None
+    )
+    # Take the first batch, but do not process it yet
+    messages = await consumer.__anext__()
+    assert len(messages) == 1
+    await asyncio.sleep(0.1)
+
+    # Batches fetched ahead are delivered to this consumer, and so are
+    # pending. That is: the batch being processed, the prefetched
+    # batches, and one batch waiting to be enqueued
+    pending_count, *_ = await redis_client.xpending(
+        "my.dummy.my_event:stream", "test_service-test_listener"
+    )
+    assert pending_count == expected_pending
+
+    await consumer.aclose()
+
+
 @pytest.mark.asyncio
 async def test_consume_events_multiple_consumers_one_group(
     loop, redis_pool, redis_client, dummy_api
@@ -174,68 +604,201 @@ async def test_consume_events_multiple_consumers_one_group(
 
 
 @pytest.mark.asyncio
-async def test_consume_events_since_id(
-    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
+@pytest.mark.parametrize("stream_use", [StreamUse.PER_EVENT, StreamUse.PER_API])
+async def test_consume_events_multiple_listeners_one_group(
+    loop, redis_event_transport: RedisEventTransport, redis_client, stream_use
 ):
-    await redis_client.xadd(
-        "my.dummy.my_event:stream",
-        fields={
-            b"api_name": b"my.dummy",
-            b"event_name": b"my_event",
-            b"id": b"123",
-            b"version": b"1",
-            b":field": b'"1"',
-        },
-        message_id="1515000001000-0",
-    )
-    await redis_client.xadd(
-        "my.dummy.my_event:stream",
-        fields={
-            b"api_name": b"my.dummy",
-            b"event_name": b"my_event",
-            b"id": b"123",
-            b"version": b"1",
-            b":field": b'"2"',
-        },
-        message_id="1515000002000-0",
-    )
-    await redis_client.xadd(
-        "my.dummy.my_event:stream",
-        fields={
-            b"api_name": b"my.dummy",
-            b"event_name": b"my_event",
-            b"id": b"123",
-            b"version": b"1",
-            b":field": b'"3"',
-        },
-        message_id="1515000003000-0",
-    )
-
-    consumer = redis_event_transport.consume(
-        [("my.dummy", "my_event")], "cg", since="1515000001500-0", forever=False, bus_client=None
-    )
-
-    events = []
+    """Listeners in the same consumer group should share a single reader"""
+    redis_event_transport.stream_use = stream_use
+    events = {"my_event": [], "my_other_event": []}
 
-    async def co():
-        async for messages in consumer:
-            events.extend(messages)
+    async def co_consume(event_name):
+        async for messages in redis_event_transport.consume(
+            [("my.dummy", event_name)], "test_listener", bus_client=None
+        ):
+            events[event_name].extend(messages)
             await redis_event_transport.acknowledge(*messages, bus_client=None)
 
-    task = asyncio.ensure_future(co())
+    task1 = asyncio.ensure_future(co_consume("my_event"))
+    task2 = asyncio.ensure_future(co_consume("my_other_event"))
     await asyncio.sleep(0.1)
-    await cancel(task)
 
-    messages_ids = [m.native_id for m in events if isinstance(m, EventMessage)]
-    assert len(messages_ids) == 2
-    assert len(events) == 2
-    assert events[0].kwargs["field"] == "2"
-    assert events[1].kwargs["field"] == "3"
+    for event_name in ("my_event", "my_other_event", "my_other_event"):
+        await redis_event_transport.send_event(
+            EventMessage(api_name="my.dummy", event_name=event_name, kwargs={}),
+            options={},
+            bus_client=None,
+        )
+    await asyncio.sleep(0.1)
 
+    assert len(redis_event_transport._stream_readers) == 1
+    reader = redis_event_transport._stream_readers[None]
+    assert len(reader.subscriptions) == 2
 
-@pytest.mark.asyncio
-async def test_consume_events_since_datetime(
-    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
+    await cancel(task1, task2)
+
+    assert [m.event_name for m in events["my_event"]] == ["my_event"]
+    assert [m.event_name for m in events["my_other_event"]] == ["my_other_event"] * 2
+    assert not reader.subscriptions
+
+
+@pytest.mark.asyncio
+async def test_consume_events_multiple_groups_one_reader(
+    loop, redis_event_transport: RedisEventTransport, redis_client
+):
+    """Listeners in different consumer groups should share a single reader"""
+    events = {"listener_a": [], "listener_b": []}
+
+    async def co_consume(listener_name, event_name):
+        async for messages in redis_event_transport.consume(
+            [("my.dummy", event_name)], listener_name, bus_client=None
+        ):
+            events[listener_name].extend(messages)
+            await redis_event_transport.acknowledge(*messages, bus_client=None)
+
+    task1 = asyncio.ensure_future(co_consume("listener_a", "my_event"))
+    task2 = asyncio.ensure_future(co_consume("listener_b", "my_other_event"))
+    await asyncio.sleep(0.1)
+
+    # The reader is now blocked waiting for new messages. Each message should
+    # wake it, however long it has been blocked for
+    for event_name in ("my_other_event", "my_event"):
+        await redis_event_transport.send_event(
+            EventMessage(api_name="my.dummy", event_name=event_name, kwargs={}),
+            options={},
+            bus_client=None,
+        )
+        await asyncio.sleep(0.1)
+
+    assert list(redis_event_transport._stream_readers) == [None]
+    reader = redis_event_transport._stream_readers[None]
+    assert {s.consumer_group for s in reader.subscriptions} == {
+        "test_service-listener_a",
+        "test_service-listener_b",
+    }
+
+    await cancel(task1, task2)
+
+    assert [m.event_name for m in events["listener_a"]] == ["my_event"]
+    assert [m.event_name for m in events["listener_b"]] == ["my_other_event"]
+
+
+@pytest.mark.asyncio
+async def test_stream_reader_unblocked(
+    loop, redis_event_transport: RedisEventTransport, redis_client
+):
+    """A listener becoming ready should interrupt a blocked read of other streams"""
+    events = []
+
+    async def co_consume(listener_name, event_name):
+        async for messages in redis_event_transport.consume(
+            [("my.dummy", event_name)], listener_name, bus_client=None
+        ):
+            events.extend(messages)
+            await redis_event_transport.acknowledge(*messages, bus_client=None)
+
+    task1 = asyncio.ensure_future(co_consume("listener_a", "my_event"))
+    await asyncio.sleep(0.1)
+    # Sent before the second listener's consumer group is created, which will
+    # therefore find it already waiting when it starts
+    await redis_event_transport.send_event(
+        EventMessage(api_name="my.dummy", event_name="my_other_event", kwargs={}),
+        options={},
+        bus_client=None,
+    )
+    await redis_client.xgroup_create(
+        "my.dummy.my_other_event:stream", "test_service-listener_b", latest_id="0"
+    )
+    task2 = asyncio.ensure_future(co_consume("listener_b", "my_other_event"))
+    await asyncio.sleep(0.1)
+
+    await cancel(task1, task2)
+
+    assert [m.event_name for m in events] == ["my_other_event"]
+
+
+@pytest.mark.asyncio
+async def test_stream_reader_cancelled(redis_event_transport: RedisEventTransport, mocker):
+    """Cancelling the reader should not pass the cancellation on to the listeners"""
+    reader = _StreamReader(redis_event_transport)
+    subscription = _StreamSubscription(
+        "test_service-test_listener", ["my.dummy.my_event:stream"], {"my_event"}
+    )
+    reader.subscriptions.append(subscription)
+
+    async def read():
+        raise asyncio.CancelledError()
+
+    mocker.patch.object(reader, "_read", read)
+    with pytest.raises(asyncio.CancelledError):
+        await reader._read_loop()
+
+    assert subscription.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_consume_events_since_id(
+    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
+):
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"1"',
+        },
+        message_id="1515000001000-0",
+    )
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"2"',
+        },
+        message_id="1515000002000-0",
+    )
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"3"',
+        },
+        message_id="1515000003000-0",
+    )
+
+    consumer = redis_event_transport.consume(
+        [("my.dummy", "my_event")], "cg", since="1515000001500-0", forever=False, bus_client=None
+    )
+
+    events = []
+
+    async def co():
+        async for messages in consumer:
+            events.extend(messages)
+            await redis_event_transport.acknowledge(*messages, bus_client=None)
+
+    task = asyncio.ensure_future(co())
+    await asyncio.sleep(0.1)
+    await cancel(task)
+
+    messages_ids = [m.native_id for m in events if isinstance(m, EventMessage)]
+    assert len(messages_ids) == 2
+    assert len(events) == 2
+    assert events[0].kwargs["field"] == "2"
+    assert events[1].kwargs["field"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_consume_events_since_datetime(
+    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
 ):
     await redis_client.xadd(
         "my.dummy.my_event:stream",
@@ -293,6 +856,155 @@ async def test_consume_events_since_datetime(
     assert events[1].kwargs["field"] == "3"
 
 
+@pytest.mark.asyncio
+async def test_history_paginated(redis_event_transport: RedisEventTransport, redis_client):
+    """History is not cut short when there are more events than fit in a single page"""
+    for n in range(1, 26):
+        await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": str(n).encode("utf8"),
+                b"version": b"1",
+                b":field": str(n).encode("utf8"),
+            },
+            message_id=f"1515000{n:03d}000-0",
+        )
+
+    events = [
+        m
+        async for m in redis_event_transport.history(
+            "my.dummy", "my_event", start=datetime(2018, 1, 3, 17, 20, 2), batch_size=10
+        )
+    ]
+    assert [m.kwargs["field"] for m in events] == list(range(2, 26))
+
+
+@pytest.mark.asyncio
+async def test_history_stop_early(redis_event_transport: RedisEventTransport, redis_client):
+    """The caller can stop iterating while the next page is being prefetched"""
+    for n in range(1, 6):
+        await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": str(n).encode("utf8"),
+                b"version": b"1",
+                b":field": str(n).encode("utf8"),
+            },
+        )
+
+    history = redis_event_transport.history("my.dummy", "my_event", batch_size=2)
+    async for event_message in history:
+        break
+    await history.aclose()
+    assert event_message.kwargs["field"] == 1
+
+
+@pytest.mark.asyncio
+async def test_history_reverse(redis_event_transport: RedisEventTransport, redis_client):
+    for n in range(1, 26):
+        await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": str(n).encode("utf8"),
+                b"version": b"1",
+                b":field": str(n).encode("utf8"),
+            },
+            message_id=f"1515000{n:03d}000-{n % 3}",
+        )
+
+    events = [
+        m
+        async for m in redis_event_transport.history(
+            "my.dummy", "my_event", reverse=True, batch_size=2
+        )
+    ]
+    assert [m.kwargs["field"] for m in events] == list(range(25, 0, -1))
+
+
+@pytest.mark.asyncio
+async def test_history_last_n(redis_event_transport: RedisEventTransport, redis_client):
+    redis_event_transport.stream_use = StreamUse.PER_API
+    for n in range(1, 26):
+        await redis_client.xadd(
+            "my.dummy.*:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                # Interleave some other events which should be skipped over
+                b"event_name": b"my_event" if n % 2 else b"other_event",
+                b"id": str(n).encode("utf8"),
+                b"version": b"1",
+                b":field": str(n).encode("utf8"),
+            },
+        )
+
+    events = [
+        m
+        async for m in redis_event_transport.history(
+            "my.dummy", "my_event", reverse=True, limit=3
+        )
+    ]
+    assert [m.kwargs["field"] for m in events] == [25, 23, 21]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False], ids=["ordered", "unordered"])
+async def test_history_sliced(redis_event_transport: RedisEventTransport, redis_client, ordered):
+    for n in range(1, 26):
+        await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": str(n).encode("utf8"),
+                b"version": b"1",
+                b":field": str(n).encode("utf8"),
+            },
+            message_id=f"1515000{n:03d}000-{n % 3}",
+        )
+
+    events = [
+        m
+        async for m in redis_event_transport.history(
+            "my.dummy", "my_event", batch_size=2, slices=4, ordered=ordered
+        )
+    ]
+    fields = [m.kwargs["field"] for m in events]
+    if ordered:
+        assert fields == list(range(1, 26))
+    else:
+        assert sorted(fields) == list(range(1, 26))
+
+
+@pytest.mark.asyncio
+async def test_history_slices(redis_event_transport: RedisEventTransport, redis_client):
+    await redis_client.xadd("my.dummy.my_event:stream", {"a": "1"}, message_id="1000-0")
+    await redis_client.xadd("my.dummy.my_event:stream", {"a": "1"}, message_id="1999-5")
+
+    slices = await redis_event_transport._get_history_slices(
+        ["my.dummy.my_event:stream"], "-", "+", slices=4
+    )
+    assert slices == [
+        ("-", "0000000001249"),
+        ("0000000001250-0", "0000000001499"),
+        ("0000000001500-0", "0000000001749"),
+        ("0000000001750-0", "+"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_slices_empty(redis_event_transport: RedisEventTransport, redis_client):
+    slices = await redis_event_transport._get_history_slices(
+        ["my.dummy.my_event:stream"], "-", "+", slices=4
+    )
+    assert slices == []
+
+
 @pytest.mark.asyncio
 async def test_from_config(redis_client):
     await redis_client.select(5)
@@ -371,43 +1083,450 @@ async def test_reclaim_lost_messages(loop, redis_client, redis_pool, dummy_api):
     assert type(reclaimed_messages[0].native_id) == str
 
 
+@pytest.mark.asyncio
+async def test_reclaim_lost_messages_dead_letter(loop, redis_client, redis_pool, dummy_api):
+    """Messages delivered too many times are moved to the dead letter stream"""
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"value"',
+        },
+    )
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service", latest_id="0"
+    )
+    await redis_client.xread_group(
+        group_name="test_service",
+        consumer_name="bad_consumer",
+        streams=["my.dummy.my_event:stream"],
+        latest_ids=[">"],
+    )
+    await asyncio.sleep(0.1)
+
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        acknowledgement_timeout=0.01,  # in ms, short for the sake of testing
+        stream_use=StreamUse.PER_EVENT,
+        max_deliveries=1,
+    )
+    reclaimer = event_transport._reclaim_lost_messages(
+        stream_names=["my.dummy.my_event:stream"],
+        consumer_group="test_service",
+        expected_events={"my_event"},
+    )
+
+    reclaimed_messages = []
+    async for m in reclaimer:
+        reclaimed_messages.extend(m)
+
+    assert reclaimed_messages == []
+    assert (
+        await redis_client.xpending("my.dummy.my_event:stream", "test_service", "-", "+", 10) == []
+    )
+    assert await redis_client.xlen("my.dummy.my_event:stream:dead") == 1
+
+    dead_letters = await event_transport.dead_letters("my.dummy", "my_event")
+    assert len(dead_letters) == 1
+    assert dead_letters[0]["event_message"].id == "123"
+    assert dead_letters[0]["event_message"].kwargs == {"field": "value"}
+    assert dead_letters[0]["stream"] == "my.dummy.my_event:stream"
+    assert dead_letters[0]["consumer_group"] == "test_service"
+    assert dead_letters[0]["consumer"] == "bad_consumer"
+    assert dead_letters[0]["deliveries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_pending_messages_dead_letter(loop, redis_client, redis_pool, dummy_api):
+    """Our own pending messages are dead lettered upon replay if delivered too many times"""
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"value"',
+        },
+    )
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service-test_listener", latest_id="0"
+    )
+    # Delivered to us once already, but never acknowledged
+    await redis_client.xread_group(
+        group_name="test_service-test_listener",
+        consumer_name="good_consumer",
+        streams=["my.dummy.my_event:stream"],
+        latest_ids=[">"],
+    )
+
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        stream_use=StreamUse.PER_EVENT,
+        max_deliveries=1,
+    )
+    consumer = event_transport.consume([("my.dummy", "my_event")], "test_listener", bus_client=None)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(consumer.__anext__(), timeout=0.2)
+    await consumer.aclose()
+
+    assert (
+        await redis_client.xpending(
+            "my.dummy.my_event:stream", "test_service-test_listener", "-", "+", 10
+        )
+        == []
+    )
+    dead_letters = await event_transport.dead_letters("my.dummy", "my_event")
+    assert len(dead_letters) == 1
+    assert dead_letters[0]["event_message"].id == "123"
+    assert dead_letters[0]["consumer"] == "good_consumer"
+    assert dead_letters[0]["deliveries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_pending_messages_dead_letter_claimed_concurrently(
+    loop, redis_client, redis_pool, dummy_api, mocker
+):
+    """Replayed messages claimed by another consumer in the meantime are not dead lettered"""
+    message_id = await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"value"',
+        },
+    )
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service-test_listener", latest_id="0"
+    )
+    for _ in range(0, 2):
+        stream_messages = await redis_client.xread_group(
+            group_name="test_service-test_listener",
+            consumer_name="good_consumer",
+            streams=["my.dummy.my_event:stream"],
+            latest_ids=["0"],
+        )
+    await asyncio.sleep(0.1)
+
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        stream_use=StreamUse.PER_EVENT,
+        max_deliveries=1,
+    )
+    with await event_transport.connection_manager() as redis:
+        xpending = redis.xpending
+
+        async def xpending_then_claim(*args):
+            result = await xpending(*args)
+            # Another consumer claims the message after we have checked its delivery count
+            await redis_client.execute(
+                "XCLAIM",
+                "my.dummy.my_event:stream",
+                "test_service-test_listener",
+                "other_consumer",
+                0,
+                message_id,
+            )
+            return result
+
+        mocker.patch.object(redis, "xpending", xpending_then_claim)
+        remaining = await event_transport._dead_letter_replayed_messages(
+            redis, stream_messages, "test_service-test_listener"
+        )
+
+    assert remaining == []
+    assert await event_transport.dead_letters("my.dummy", "my_event") == []
+    pending = await redis_client.xpending(
+        "my.dummy.my_event:stream", "test_service-test_listener", "-", "+", 10
+    )
+    assert len(pending) == 1
+    assert pending[0][1] == b"other_consumer"
+
+
+@pytest.mark.asyncio
+async def test_requeue_dead_letters(redis_client, redis_event_transport, dummy_api):
+    """Requeued dead letters are removed from the dead letter stream and fired again"""
+    dead_letter_id = await redis_client.xadd(
+        "my.dummy.my_event:stream:dead",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"value"',
+            b"dead_letter:stream": b"my.dummy.my_event:stream",
+            b"dead_letter:native_id": b"1-0",
+            b"dead_letter:consumer_group": b"test_service",
+            b"dead_letter:consumer": b"bad_consumer",
+            b"dead_letter:deliveries": b"5",
+        },
+    )
+
+    total = await redis_event_transport.requeue_dead_letters("my.dummy", "my_event")
+    assert total == 1
+    assert await redis_client.xlen("my.dummy.my_event:stream:dead") == 0
+
+    messages = await redis_client.xrange("my.dummy.my_event:stream")
+    assert len(messages) == 1
+    fields = messages[0][1]
+    assert fields[b"id"] == b"123"
+    assert fields[b":field"] == b'"value"'
+    assert fields[b"dead_letter:requeued_for"] == b"test_service"
+    assert not any(
+        k.startswith(b"dead_letter:") for k in fields if k != b"dead_letter:requeued_for"
+    )
+
+
+@pytest.mark.asyncio
+async def test_requeued_dead_letters_skipped_by_other_groups(
+    loop, redis_pool, redis_client, dummy_api
+):
+    """Requeued dead letters are only delivered to the group in which they failed"""
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"value"',
+            b"dead_letter:requeued_for": b"test_service1-test_listener",
+        },
+    )
+
+    async def co_consume(group_number):
+        event_transport = RedisEventTransport(
+            redis_pool=redis_pool,
+            service_name=f"test_service{group_number}",
+            consumer_name=f"test_consumer",
+            stream_use=StreamUse.PER_EVENT,
+        )
+        consumer = event_transport.consume(
+            [("my.dummy", "my_event")], "test_listener", since="0", bus_client=None
+        )
+        try:
+            return await asyncio.wait_for(consumer.__anext__(), timeout=0.2)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            await consumer.aclose()
+
+    messages1 = await co_consume(1)
+    messages2 = await co_consume(2)
+
+    assert len(messages1) == 1
+    assert messages1[0].kwargs == {"field": "value"}
+    assert messages2 is None
+
+    # The other group acknowledged the message so it will not be redelivered
+    pending = await redis_client.xpending("my.dummy.my_event:stream", "test_service2-test_listener")
+    assert pending[0] == 0
+
+
 @pytest.mark.asyncio
 async def test_reclaim_lost_messages_ignores_non_timed_out_messages(
     loop, redis_client, redis_pool, dummy_api
 ):
     """Ensure messages which have not timed out are not reclaimed"""
 
-    # Add a message
-    await redis_client.xadd(
+    # Add a message
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b":field": b'"value"',
+        },
+    )
+    # Create the consumer group
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service", latest_id="0"
+    )
+
+    # Claim it in the name of another consumer
+    await redis_client.xread_group(
+        group_name="test_service",
+        consumer_name="bad_consumer",
+        streams=["my.dummy.my_event:stream"],
+        latest_ids=[">"],
+    )
+    # Sleep a moment to fake a short timeout
+    await asyncio.sleep(0.1)
+
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        # in ms, longer as we want to check that the messages is not reclaimed
+        acknowledgement_timeout=0.9,
+        stream_use=StreamUse.PER_EVENT,
+    )
+    reclaimer = event_transport._reclaim_lost_messages(
+        stream_names=["my.dummy.my_event:stream"],
+        consumer_group="test_service",
+        expected_events={"my_event"},
+    )
+    reclaimed_messages = [m async for m in reclaimer]
+    assert len(reclaimed_messages) == 0
+
+
+@pytest.mark.asyncio
+async def test_reclaim_lost_messages_consume(loop, redis_client, redis_pool, dummy_api):
+    """Test that messages which another consumer has timed out on can be reclaimed
+
+    Unlike the above test, we call consume() here, not _reclaim_lost_messages()
+    """
+
+    # Add a message
+    await redis_client.xadd(
+        "my.dummy.my_event:stream",
+        fields={
+            b"api_name": b"my.dummy",
+            b"event_name": b"my_event",
+            b"id": b"123",
+            b"version": b"1",
+            b":field": b'"value"',
+        },
+    )
+    # Create the consumer group
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service-test_listener", latest_id="0"
+    )
+
+    # Claim it in the name of another consumer
+    await redis_client.xread_group(
+        group_name="test_service-test_listener",
+        consumer_name="bad_consumer",
+        streams=["my.dummy.my_event:stream"],
+        latest_ids=[">"],
+    )
+    # Sleep a moment to fake a short timeout
+    await asyncio.sleep(0.1)
+
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        acknowledgement_timeout=0.01,  # in ms, short for the sake of testing
+        stream_use=StreamUse.PER_EVENT,
+    )
+    consumer = event_transport.consume(
+        listen_for=[("my.dummy", "my_event")],
+        since="0",
+        listener_name="test_listener",
+        bus_client=None,
+    )
+
+    messages = []
+
+    async def consume():
+        async for messages_ in consumer:
+            messages.extend(messages_)
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.1)
+    await cancel(task)
+
+    assert len(messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_messages_claimed_concurrently(loop, redis_client, redis_pool, dummy_api):
+    """Messages claimed by another consumer in the meantime are not acknowledged"""
+    message_id = await redis_client.xadd(
         "my.dummy.my_event:stream",
         fields={
             b"api_name": b"my.dummy",
             b"event_name": b"my_event",
             b"id": b"123",
+            b"version": b"1",
             b":field": b'"value"',
         },
     )
-    # Create the consumer group
     await redis_client.xgroup_create(
         stream="my.dummy.my_event:stream", group_name="test_service", latest_id="0"
     )
+    await redis_client.xread_group(
+        group_name="test_service",
+        consumer_name="bad_consumer",
+        streams=["my.dummy.my_event:stream"],
+        latest_ids=[">"],
+    )
+    await asyncio.sleep(0.1)
+    # Another consumer claims the message first, which resets its idle time
+    await redis_client.execute(
+        "XCLAIM", "my.dummy.my_event:stream", "test_service", "other_consumer", 0, message_id
+    )
 
-    # Claim it in the name of another consumer
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        stream_use=StreamUse.PER_EVENT,
+    )
+    with await event_transport.connection_manager() as redis:
+        event_messages = await event_transport._claim_messages(
+            redis,
+            "my.dummy.my_event:stream",
+            "test_service",
+            [decode(message_id, "utf8")],
+            min_idle_time=50,
+            expected_events={"my_event"},
+        )
+
+    assert event_messages == []
+    pending = await redis_client.xpending("my.dummy.my_event:stream", "test_service", "-", "+", 10)
+    assert len(pending) == 1
+    assert pending[0][1] == b"other_consumer"
+
+
+@pytest.mark.asyncio
+async def test_reclaim_lost_messages_many(loop, redis_client, redis_pool, dummy_api):
+    """Test that reclaiming pages through the pending messages"""
+    message_ids = []
+    for x in range(0, 5):
+        message_id = await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": b"123",
+                b"version": b"1",
+                b":field": f'"{x}"'.encode("utf8"),
+            },
+        )
+        message_ids.append(message_id)
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service", latest_id="0"
+    )
     await redis_client.xread_group(
         group_name="test_service",
         consumer_name="bad_consumer",
         streams=["my.dummy.my_event:stream"],
         latest_ids=[">"],
     )
-    # Sleep a moment to fake a short timeout
+    # A deleted message can never be reclaimed, and should not be left pending
+    await redis_client.execute("XDEL", "my.dummy.my_event:stream", message_ids[-1])
     await asyncio.sleep(0.1)
 
     event_transport = RedisEventTransport(
         redis_pool=redis_pool,
         service_name="test_service",
         consumer_name="good_consumer",
-        # in ms, longer as we want to check that the messages is not reclaimed
-        acknowledgement_timeout=0.9,
+        acknowledgement_timeout=0.01,
+        reclaim_batch_size=2,
         stream_use=StreamUse.PER_EVENT,
     )
     reclaimer = event_transport._reclaim_lost_messages(
@@ -415,18 +1534,20 @@ async def test_reclaim_lost_messages_ignores_non_timed_out_messages(
         consumer_group="test_service",
         expected_events={"my_event"},
     )
-    reclaimed_messages = [m async for m in reclaimer]
-    assert len(reclaimed_messages) == 0
+    reclaimed_batches = [m async for m in reclaimer]
 
+    assert [len(batch) for batch in reclaimed_batches] == [2, 2]
+    assert [m.kwargs["field"] for batch in reclaimed_batches for m in batch] == ["0", "1", "2", "3"]
+    assert event_transport.reclaimed_counts == {"my.dummy.my_event:stream": 4}
 
-@pytest.mark.asyncio
-async def test_reclaim_lost_messages_consume(loop, redis_client, redis_pool, dummy_api):
-    """Test that messages which another consumer has timed out on can be reclaimed
+    pending = await redis_client.xpending("my.dummy.my_event:stream", "test_service", "-", "+", 10)
+    assert len(pending) == 4
+    assert {consumer_name for _, consumer_name, _, _ in pending} == {b"good_consumer"}
 
-    Unlike the above test, we call consume() here, not _reclaim_lost_messages()
-    """
 
-    # Add a message
+@pytest.mark.asyncio
+async def test_reclaim_lost_messages_periodically(loop, redis_client, redis_pool, dummy_api):
+    """Test that messages which time out after startup are also reclaimed"""
     await redis_client.xadd(
         "my.dummy.my_event:stream",
         fields={
@@ -437,26 +1558,23 @@ async def test_reclaim_lost_messages_consume(loop, redis_client, redis_pool, dum
             b":field": b'"value"',
         },
     )
-    # Create the consumer group
     await redis_client.xgroup_create(
         stream="my.dummy.my_event:stream", group_name="test_service-test_listener", latest_id="0"
     )
-
-    # Claim it in the name of another consumer
-    await redis_client.xread_group(
+    result = await redis_client.xread_group(
         group_name="test_service-test_listener",
         consumer_name="bad_consumer",
         streams=["my.dummy.my_event:stream"],
         latest_ids=[">"],
     )
-    # Sleep a moment to fake a short timeout
-    await asyncio.sleep(0.1)
+    message_id = result[0][1]
 
     event_transport = RedisEventTransport(
         redis_pool=redis_pool,
         service_name="test_service",
         consumer_name="good_consumer",
-        acknowledgement_timeout=0.01,  # in ms, short for the sake of testing
+        acknowledgement_timeout=0.2,
+        reclaim_interval=0.05,
         stream_use=StreamUse.PER_EVENT,
     )
     consumer = event_transport.consume(
@@ -473,10 +1591,20 @@ async def test_reclaim_lost_messages_consume(loop, redis_client, redis_pool, dum
             messages.extend(messages_)
 
     task = asyncio.ensure_future(consume())
-    await asyncio.sleep(0.1)
+
+    # The bad consumer is still alive at this point, and so resets the idle time
+    await asyncio.sleep(0.15)
+    await redis_client.xclaim(
+        "my.dummy.my_event:stream", "test_service-test_listener", "bad_consumer", 0, message_id
+    )
+    assert not messages
+
+    # ...but then it dies
+    await asyncio.sleep(0.4)
     await cancel(task)
 
     assert len(messages) == 1
+    assert event_transport.reclaimed_counts == {"my.dummy.my_event:stream": 1}
 
 
 @pytest.mark.asyncio
@@ -546,13 +1674,67 @@ async def test_reclaim_pending_messages(loop, redis_client, redis_pool, dummy_ap
     assert total_pending == 0
 
 
+@pytest.mark.asyncio
+async def test_reclaim_pending_messages_paginated(loop, redis_client, redis_pool, dummy_api):
+    """Test that a backlog of unacked messages is replayed batch_size at a time"""
+    for x in range(0, 5):
+        await redis_client.xadd(
+            "my.dummy.my_event:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": b"my_event",
+                b"id": b"123",
+                b"version": b"1",
+                b":field": f'"{x}"'.encode("utf8"),
+            },
+        )
+    await redis_client.xgroup_create(
+        stream="my.dummy.my_event:stream", group_name="test_service-test_listener", latest_id="0"
+    )
+    # Claim them in the name of ourselves
+    await redis_client.xread_group(
+        group_name="test_service-test_listener",
+        consumer_name="good_consumer",
+        streams=["my.dummy.my_event:stream"],
+        latest_ids=[">"],
+    )
+
+    event_transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="good_consumer",
+        stream_use=StreamUse.PER_EVENT,
+        batch_size=2,
+    )
+    consumer = event_transport.consume(
+        listen_for=[("my.dummy", "my_event")],
+        since="0",
+        listener_name="test_listener",
+        bus_client=None,
+    )
+
+    batches = []
+
+    async def consume():
+        async for messages_ in consumer:
+            batches.append(messages_)
+            await event_transport.acknowledge(*messages_, bus_client=None)
+
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.1)
+    await cancel(task)
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [m.kwargs["field"] for batch in batches for m in batch] == ["0", "1", "2", "3", "4"]
+
+
 @pytest.mark.asyncio
 async def test_consume_events_create_consumer_group_first(
     loop, redis_client, redis_event_transport, dummy_api
 ):
     """Create the consumer group before the stream exists
 
-    This should create a noop message which gets ignored by the event transport
+    This should create an empty stream
     """
     consumer = redis_event_transport.consume(
         listen_for=[("my.dummy", "my_event")],
@@ -570,6 +1752,135 @@ async def test_consume_events_create_consumer_group_first(
     await asyncio.sleep(0.1)
     await cancel(task)
     assert len(messages) == 0
+    assert await redis_client.exists("my.dummy.my_event:stream")
+    assert await redis_client.xlen("my.dummy.my_event:stream") == 0
+
+
+@pytest.mark.asyncio
+async def test_create_consumer_groups_cached(
+    redis_event_transport: RedisEventTransport, redis_client, mocker
+):
+    streams = OrderedDict([("stream1", "0"), ("stream2", "$")])
+    with await redis_event_transport.connection_manager() as redis:
+        await redis_event_transport._create_consumer_groups(streams, redis, "test_group")
+        # Already created, so no further commands should be issued
+        execute_spy = mocker.spy(redis, "execute")
+        await redis_event_transport._create_consumer_groups(streams, redis, "test_group")
+        assert execute_spy.call_count == 0
+
+    for stream in streams:
+        groups = await redis_client.xinfo_groups(stream)
+        assert [g[b"name"] for g in groups] == [b"test_group"]
+
+
+@pytest.mark.asyncio
+async def test_create_consumer_groups_existing(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    """Groups which were created elsewhere are not an error"""
+    await redis_client.xadd("stream1", fields={b"a": b"1"})
+    await redis_client.xgroup_create("stream1", "test_group")
+    with await redis_event_transport.connection_manager() as redis:
+        await redis_event_transport._create_consumer_groups({"stream1": "0"}, redis, "test_group")
+    assert ("stream1", "test_group") in redis_event_transport._created_consumer_groups
+
+
+@pytest.mark.asyncio
+async def test_cleanup_stale_consumers(redis_event_transport: RedisEventTransport, redis_client):
+    redis_event_transport.consumer_ttl = 0.05
+    stream = "my.dummy.my_event:stream"
+    await redis_client.xadd(stream, fields={b"a": b"1"})
+    await redis_client.xgroup_create(stream=stream, group_name="test_group", latest_id="0")
+
+    # This consumer will have a pending message, so should not be removed
+    await redis_client.xread_group(
+        group_name="test_group", consumer_name="busy_consumer", streams=[stream], latest_ids=[">"]
+    )
+    # These consumers will have no pending messages
+    for consumer_name in ("stale_consumer", "test_consumer"):
+        await redis_client.xread_group(
+            group_name="test_group",
+            consumer_name=consumer_name,
+            streams=[stream],
+            latest_ids=[">"],
+            timeout=None,
+        )
+
+    await asyncio.sleep(0.1)
+    await redis_event_transport.cleanup([stream])
+
+    consumers = await redis_client.xinfo_consumers(stream, "test_group")
+    assert sorted(c[b"name"] for c in consumers) == [b"busy_consumer", b"test_consumer"]
+
+
+@pytest.mark.asyncio
+async def test_consumer_lag(redis_event_transport: RedisEventTransport, redis_client):
+    stream = "my.dummy.my_event:stream"
+    for n in range(0, 3):
+        await redis_client.xadd(stream, fields={b"a": b"1"}, message_id=f"100000000000{n}-0")
+    await redis_client.xgroup_create(stream=stream, group_name="test_group", latest_id="0")
+    await redis_client.xread_group(
+        group_name="test_group",
+        consumer_name="test_consumer",
+        streams=[stream],
+        latest_ids=[">"],
+        count=2,
+    )
+    await asyncio.sleep(0.05)
+
+    lag = await redis_event_transport.consumer_lag(
+        {"test_group": [stream, "my.dummy.other:stream"], "missing_group": [stream]}
+    )
+    assert len(lag) == 1
+    assert lag[0]["consumer_group"] == "test_group"
+    assert lag[0]["stream"] == stream
+    assert lag[0]["pending"] == 2
+    assert lag[0]["oldest_pending_idle"] >= 0.05
+    assert lag[0]["last_delivered_id"] == "1000000000001-0"
+    assert lag[0]["stream_length"] == 3
+
+
+@pytest.mark.asyncio
+async def test_consumer_lag_consuming(
+    loop, redis_event_transport: RedisEventTransport, redis_client
+):
+    """Defaults to the consumer groups currently being consumed"""
+    assert await redis_event_transport.consumer_lag() == []
+
+    consumer = redis_event_transport.consume(
+        [("my.dummy", "my_event")], "test_listener", bus_client=None
+    )
+    task = asyncio.ensure_future(consumer.__anext__())
+    await asyncio.sleep(0.1)
+
+    lag = await redis_event_transport.consumer_lag()
+    assert [(l["consumer_group"], l["stream"], l["pending"]) for l in lag] == [
+        ("test_service-test_listener", "my.dummy.my_event:stream", 0)
+    ]
+    assert lag[0]["oldest_pending_idle"] is None
+
+    await cancel(task)
+    await consumer.aclose()
+    assert await redis_event_transport.consumer_lag() == []
+
+
+@pytest.mark.asyncio
+async def test_cleanup_abandoned_groups(redis_event_transport: RedisEventTransport, redis_client):
+    redis_event_transport.consumer_group_ttl = 0.05
+    stream = "my.dummy.my_event:stream"
+    await redis_client.xadd(stream, fields={b"a": b"1"})
+    for group_name in ("old_group", "active_group"):
+        await redis_client.xgroup_create(stream=stream, group_name=group_name, latest_id="0")
+        await redis_client.xread_group(
+            group_name=group_name, consumer_name="consumer", streams=[stream], latest_ids=[">"]
+        )
+    redis_event_transport._active_consumer_groups["active_group"] += 1
+
+    await asyncio.sleep(0.1)
+    await redis_event_transport.cleanup([stream])
+
+    groups = await redis_client.xinfo_groups(stream)
+    assert [g[b"name"] for g in groups] == [b"active_group"]
 
 
 @pytest.mark.asyncio
@@ -610,6 +1921,70 @@ async def test_max_len_set_to_none(
     assert len(messages) == 200
 
 
+@pytest.mark.asyncio
+async def test_background_trimming_by_length(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    """Streams are not trimmed upon publishing when the background trimmer is enabled"""
+    redis_event_transport.max_stream_length = 100
+    redis_event_transport.stream_trim_interval = 0.05
+    for x in range(0, 200):
+        await redis_event_transport.send_event(
+            EventMessage(api_name="my.api", event_name="my_event", kwargs={"field": "value"}),
+            options={},
+            bus_client=None,
+        )
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert len(messages) == 200
+
+    await asyncio.sleep(0.1)
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert len(messages) >= 100
+    assert len(messages) < 150
+
+
+@pytest.mark.asyncio
+async def test_trim_streams_by_age(redis_event_transport: RedisEventTransport, redis_client):
+    redis_event_transport.max_stream_length = None
+    redis_event_transport.max_stream_age = 60
+    redis_event_transport.stream_trim_interval = 60
+    # An old message
+    await redis_client.xadd("my.api.my_event:stream", {"a": "1"}, message_id="1515000001000-0")
+    # A new message
+    await redis_client.xadd("my.api.my_event:stream", {"a": "2"})
+
+    await redis_event_transport.trim_streams(["my.api.my_event:stream"])
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [fields for _, fields in messages] == [{b"a": b"2"}]
+
+
+@pytest.mark.asyncio
+async def test_trim_streams_by_age_fallback(
+    redis_event_transport: RedisEventTransport, redis_client
+):
+    """Old messages are deleted individually if XTRIM does not support MINID"""
+    redis_event_transport.max_stream_length = None
+    redis_event_transport.max_stream_age = 60
+    redis_event_transport._xtrim_minid_supported = False
+    await redis_client.xadd("my.api.my_event:stream", {"a": "1"}, message_id="1515000001000-0")
+    await redis_client.xadd("my.api.my_event:stream", {"a": "2"}, message_id="1515000002000-0")
+    await redis_client.xadd("my.api.my_event:stream", {"a": "3"})
+
+    await redis_event_transport.trim_streams(["my.api.my_event:stream"])
+
+    messages = await redis_client.xrange("my.api.my_event:stream")
+    assert [fields for _, fields in messages] == [{b"a": b"3"}]
+
+
+def test_max_stream_age_enables_trimmer():
+    transport = RedisEventTransport(
+        service_name="test_service", consumer_name="test_consumer", max_stream_age=3600
+    )
+    assert transport.stream_trim_interval == 60
+    assert transport._get_xadd_max_len() is None
+
+
 @pytest.mark.asyncio
 async def test_consume_events_per_api_stream(
     loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
@@ -664,6 +2039,44 @@ async def test_consume_events_per_api_stream(
     assert set([e.event_name for e in events]) == {"my_event1", "my_event2", "my_event3"}
 
 
+@pytest.mark.asyncio
+async def test_consume_events_server_side_filtering(
+    loop, redis_event_transport: RedisEventTransport, redis_client, dummy_api
+):
+    redis_event_transport.stream_use = StreamUse.PER_API
+    redis_event_transport.server_side_filtering = True
+    redis_event_transport.batch_size = 2
+
+    events = []
+
+    async def co_consume():
+        consumer = redis_event_transport.consume([("my.dummy", "my_event1")], "cg", bus_client=None)
+        async for messages in consumer:
+            events.extend(messages)
+
+    task = asyncio.ensure_future(co_consume())
+    await asyncio.sleep(0.2)
+
+    for n in range(0, 9):
+        await redis_client.xadd(
+            "my.dummy.*:stream",
+            fields={
+                b"api_name": b"my.dummy",
+                b"event_name": f"my_event{n % 3 + 1}".encode("utf8"),
+                b"id": str(n).encode("utf8"),
+                b"version": b"1",
+                b":field": b'"value"',
+            },
+        )
+    await asyncio.sleep(0.2)
+    await cancel(task)
+
+    assert [e.id for e in events] == ["0", "3", "6"]
+    # The unwanted events were acknowledged, so only the wanted events remain pending
+    pending = await redis_client.xpending("my.dummy.*:stream", "test_service-cg")
+    assert pending[0] == 3
+
+
 @pytest.mark.asyncio
 async def test_reconnect_upon_send_event(
     redis_event_transport: RedisEventTransport, redis_client, get_total_redis_connections
@@ -727,6 +2140,36 @@ async def test_reconnect_while_listening(
     await cancel(enque_task, consume_task)
 
 
+@pytest.mark.asyncio
+async def test_mark_processed(redis_event_transport: RedisEventTransport, redis_client):
+    """Processed events are remembered for each listener until their TTL expires"""
+    event_messages = [
+        EventMessage(api_name="my.api", event_name="my_event", id=str(n), kwargs={})
+        for n in range(3)
+    ]
+    await redis_event_transport.mark_processed(event_messages[:1], listener_name="test", ttl=60)
+    await redis_event_transport.mark_processed(event_messages[1:2], listener_name="test", ttl=0.1)
+
+    key = f"{redis_event_transport.service_name}-test:processed"
+    assert 0 < await redis_client.ttl(key) <= 60
+    processed_ids = await redis_event_transport.get_processed_event_ids(
+        event_messages, listener_name="test"
+    )
+    assert processed_ids == {"0", "1"}
+
+    await asyncio.sleep(0.15)
+    processed_ids = await redis_event_transport.get_processed_event_ids(
+        event_messages, listener_name="test"
+    )
+    assert processed_ids == {"0"}
+
+    # Other listeners have processed nothing
+    processed_ids = await redis_event_transport.get_processed_event_ids(
+        event_messages, listener_name="other"
+    )
+    assert processed_ids == set()
+
+
 @pytest.mark.asyncio
 async def test_acknowledge(redis_event_transport: RedisEventTransport, redis_client, dummy_api):
     message_id = await redis_client.xadd("test_api.test_event:stream", fields={"a": 1})
@@ -753,3 +2196,136 @@ async def test_acknowledge(redis_event_transport: RedisEventTransport, redis_cli
 
     total_pending, *_ = await redis_client.xpending("test_api.test_event:stream", "test_group")
     assert total_pending == 0
+
+
+@pytest.mark.asyncio
+async def test_acknowledge_many(
+    redis_event_transport: RedisEventTransport, redis_client, dummy_api
+):
+    streams = ["test_api.test_event1:stream", "test_api.test_event2:stream"]
+    event_messages = []
+    for stream in streams:
+        await redis_client.xadd(stream, fields={"a": 1})
+        await redis_client.xadd(stream, fields={"a": 2})
+        await redis_client.xgroup_create(stream, "test_group", latest_id="0")
+        messages = await redis_client.xread_group(
+            "test_group", "test_consumer", [stream], latest_ids=[">"]
+        )
+        for _, message_id, _ in messages:
+            event_messages.append(
+                RedisEventMessage(
+                    api_name="test_api",
+                    event_name="test_event",
+                    consumer_group="test_group",
+                    stream=stream,
+                    native_id=message_id,
+                )
+            )
+
+    await redis_event_transport.acknowledge(*event_messages, bus_client=None)
+
+    for stream in streams:
+        total_pending, *_ = await redis_client.xpending(stream, "test_group")
+        assert total_pending == 0
+
+
+@pytest.mark.asyncio
+async def test_send_event_per_partition(redis_pool, redis_client, mocker):
+    class OrdersApi(Api):
+        order_placed = Event(parameters=("order_id", "total"), partition_key="order_id")
+
+        class Meta:
+            name = "orders"
+
+    registry = Registry()
+    registry.add(OrdersApi())
+    bus_client = mocker.Mock(api_registry=registry)
+
+    transport = RedisEventTransport(
+        redis_pool=redis_pool,
+        service_name="test_service",
+        consumer_name="test_consumer",
+        stream_use=StreamUse.PER_PARTITION,
+        partition_count=4,
+    )
+    for order_id in range(0, 20):
+        for total in (1, 2):
+            await transport.send_event(
+                EventMessage(
+                    api_name="orders",
+                    event_name="order_placed",
+                    kwargs={"order_id": order_id, "total": total},
+                ),
+                options={},
+                bus_client=bus_client,
+            )
+
+    streams = {}
+    for partition in range(0, 4):
+        stream = f"orders.*:{partition}:stream"
+        for _, fields in await redis_client.xrange(stream):
+            streams.setdefault(fields[b":order_id"], set()).add(stream)
+
+    # Each order's events were all placed in the same partition...
+    assert len(streams) == 20
+    assert all(len(s) == 1 for s in streams.values())
+    # ...and the orders were spread across the partitions
+    assert len(set.union(*streams.values())) > 1
+
+
+@pytest.mark.asyncio
+async def test_consume_per_partition(redis_pool, redis_client, dummy_api):
+    """Partitions are divided between the consumers in a group"""
+    transports = [
+        RedisEventTransport(
+            redis_pool=redis_pool,
+            service_name="test_service",
+            consumer_name=f"test_consumer{n}",
+            stream_use=StreamUse.PER_PARTITION,
+            partition_count=4,
+            partition_heartbeat_interval=0.05,
+        )
+        for n in range(0, 2)
+    ]
+    messages = {0: [], 1: []}
+
+    async def co_consume(n):
+        async for messages_ in transports[n].consume(
+            [("my.dummy", "my_event")], "test_listener", bus_client=None
+        ):
+            messages[n].extend(messages_)
+            await transports[n].acknowledge(*messages_, bus_client=None)
+
+    task1 = asyncio.ensure_future(co_consume(0))
+    await asyncio.sleep(0.02)
+    task2 = asyncio.ensure_future(co_consume(1))
+    # Wait for the first consumer to notice the second
+    await asyncio.sleep(0.15)
+
+    for transport in transports:
+        reader = transport._stream_readers[None]
+        assert len(reader.subscriptions[0].stream_names) == 2
+
+    for n in range(0, 10):
+        await transports[0].send_event(
+            EventMessage(api_name="my.dummy", event_name="my_event", kwargs={"field": str(n)}),
+            options={},
+            bus_client=None,
+        )
+    await asyncio.sleep(0.1)
+
+    # Each message was received by only one of the consumers
+    fields = sorted(m.kwargs["field"] for m in messages[0] + messages[1])
+    assert fields == [str(n) for n in range(0, 10)]
+    # ...and each partition was read by only one of the consumers
+    assert not {m.stream for m in messages[0]} & {m.stream for m in messages[1]}
+
+    # When a consumer leaves, its partitions are reassigned
+    await cancel(task2)
+    await asyncio.sleep(0.1)
+    reader = transports[0]._stream_readers[None]
+    assert len(reader.subscriptions[0].stream_names) == 4
+
+    await cancel(task1)
+    for transport in transports:
+        await transport.close()
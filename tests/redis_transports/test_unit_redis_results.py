@@ -1,3 +1,4 @@
+import asyncio
 import json
 from uuid import UUID
 
@@ -24,6 +25,81 @@ async def test_connection_manager(redis_result_transport):
         assert await redis.info()
 
 
+@pytest.mark.asyncio
+async def test_blocking_connection_manager(redis_result_transport):
+    """Blocking connections are separate from the pool, and are reused"""
+    with await redis_result_transport.blocking_connection_manager() as redis:
+        assert await redis.info()
+        assert redis_result_transport.connection_usage()["blocking"] == {
+            "in_use": 1,
+            "size": 1,
+            "maxsize": 100,
+        }
+
+    with await redis_result_transport.blocking_connection_manager() as redis_:
+        assert redis_ is redis
+
+    usage = redis_result_transport.connection_usage()
+    assert usage["blocking"] == {"in_use": 0, "size": 1, "maxsize": 100}
+    assert usage["pool"]["in_use"] == 0
+    await redis_result_transport.close()
+    assert redis.closed
+
+
+@pytest.mark.asyncio
+async def test_blocking_connection_manager_error(redis_result_transport):
+    """Blocking connections are discarded if an error occurs while they are in use"""
+    with pytest.raises(ValueError):
+        with await redis_result_transport.blocking_connection_manager() as redis:
+            raise ValueError()
+
+    assert redis.closed
+    assert redis_result_transport.connection_usage()["blocking"] == {
+        "in_use": 0,
+        "size": 0,
+        "maxsize": 100,
+    }
+
+
+@pytest.mark.asyncio
+async def test_blocking_connection_manager_max_connections(redis_result_transport):
+    """Callers wait for a blocking connection once the maximum are in use"""
+    redis_result_transport.max_blocking_connections = 1
+
+    async def co_use_connection():
+        with await redis_result_transport.blocking_connection_manager() as redis:
+            return redis
+
+    with await redis_result_transport.blocking_connection_manager() as redis:
+        task = asyncio.ensure_future(co_use_connection())
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+    assert await asyncio.wait_for(task, timeout=1) is redis
+    assert redis_result_transport.connection_usage()["blocking"]["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_blocking_connection_manager_cancelled(redis_result_transport):
+    """Blocking connections are unblocked and reused if their command was cancelled"""
+
+    async def co_block():
+        with await redis_result_transport.blocking_connection_manager() as redis:
+            await redis.blpop("my_list", timeout=10)
+
+    task = asyncio.ensure_future(co_block())
+    await asyncio.sleep(0.05)
+    redis = redis_result_transport._active_blocking_connections[0]
+    task.cancel()
+    await asyncio.sleep(0.05)
+
+    assert not redis.closed
+    assert redis_result_transport.connection_usage()["blocking"]["in_use"] == 0
+    with await redis_result_transport.blocking_connection_manager() as redis_:
+        assert redis_ is redis
+        assert await redis_.lpush("my_list", "a") == 1
+
+
 @pytest.mark.asyncio
 async def test_get_return_path(redis_result_transport: RedisResultTransport):
     return_path = redis_result_transport.get_return_path(
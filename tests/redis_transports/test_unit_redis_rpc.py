@@ -113,6 +113,65 @@ async def test_consume_rpcs(redis_client, redis_rpc_transport, dummy_api):
     assert message.return_path == "abc"
 
 
+@pytest.mark.asyncio
+async def test_consume_rpcs_claim_check(redis_client, redis_rpc_transport, dummy_api):
+    """Large messages are stored under their own key, with only a reference added to the queue"""
+    redis_rpc_transport.claim_check_threshold = 100
+    rpc_message = RpcMessage(
+        id="123abc",
+        api_name="my.dummy",
+        procedure_name="my_proc",
+        kwargs={"field": "x" * 100},
+        return_path="abc",
+    )
+    await redis_rpc_transport.call_rpc(rpc_message, options={}, bus_client=None)
+
+    queued = await redis_client.lrange("my.dummy:rpc_queue", start=0, stop=100)
+    assert queued == [b"\x00claim_check\x00my.dummy:rpc_queue:claim_check:123abc"]
+    assert await redis_client.ttl("my.dummy:rpc_queue:claim_check:123abc") > 0
+
+    messages = await redis_rpc_transport.consume_rpcs(apis=[dummy_api], bus_client=None)
+    assert messages[0].id == "123abc"
+    assert messages[0].kwargs == {"field": "x" * 100}
+    assert not await redis_client.exists("my.dummy:rpc_queue:claim_check:123abc")
+
+
+@pytest.mark.asyncio
+async def test_consume_rpcs_claim_check_encoding(new_redis_pool, dummy_api):
+    """Claim checks are recognised when the pool decodes responses"""
+    redis_rpc_transport = RedisRpcTransport(
+        redis_pool=await new_redis_pool(maxsize=10000, encoding="utf8"), claim_check_threshold=100
+    )
+    rpc_message = RpcMessage(
+        id="123abc",
+        api_name="my.dummy",
+        procedure_name="my_proc",
+        kwargs={"field": "x" * 100},
+        return_path="abc",
+    )
+    await redis_rpc_transport.call_rpc(rpc_message, options={}, bus_client=None)
+
+    messages = await redis_rpc_transport.consume_rpcs(apis=[dummy_api], bus_client=None)
+    assert messages[0].id == "123abc"
+    assert messages[0].kwargs == {"field": "x" * 100}
+@pytest.mark.asyncio
+async def test_consume_rpcs_cluster_mode(redis_client, redis_rpc_transport, dummy_api):
+    """Each API's keys share a hash tag, so can be pipelined on Redis Cluster"""
+    redis_rpc_transport.cluster_mode = True
+    rpc_message = RpcMessage(
+        id="123abc", api_name="my.dummy", procedure_name="my_proc", kwargs={}, return_path="abc"
+    )
+    await redis_rpc_transport.call_rpc(rpc_message, options={}, bus_client=None)
+    assert set(await redis_client.keys("*")) == {
+        b"{my.dummy}:rpc_queue",
+        b"rpc_expiry_key:{my.dummy}:123abc",
+    }
+
+    messages = await redis_rpc_transport.consume_rpcs(apis=[dummy_api], bus_client=None)
+    assert messages[0].id == "123abc"
+    assert not await redis_client.exists("rpc_expiry_key:{my.dummy}:123abc")
+
+
 @pytest.mark.asyncio
 async def test_from_config(redis_client):
     await redis_client.select(5)
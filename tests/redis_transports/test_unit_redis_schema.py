@@ -49,6 +49,19 @@ async def test_load(redis_schema_transport: RedisSchemaTransport, redis_client):
     assert schemas == {"my.api": {"key": "value"}}
 
 
+@pytest.mark.asyncio
+async def test_store_and_load_cluster_mode(
+    redis_schema_transport: RedisSchemaTransport, redis_client
+):
+    """All schema keys share a hash tag, so can be pipelined and fetched together"""
+    redis_schema_transport.cluster_mode = True
+    await redis_schema_transport.store("my.api", {"key": "value"}, ttl_seconds=60)
+    assert set(await redis_client.keys("*")) == {b"{schema}s", b"{schema}:my.api"}
+
+    schemas = await redis_schema_transport.load()
+    assert schemas == {"my.api": {"key": "value"}}
+
+
 @pytest.mark.asyncio
 async def test_load_no_apis(redis_schema_transport: RedisSchemaTransport, redis_client):
     schemas = await redis_schema_transport.load()
@@ -7,6 +7,9 @@ from lightbus.transports.redis import (
     redis_steam_id_to_datetime,
     datetime_to_redis_steam_id,
     redis_stream_id_add_one,
+    redis_stream_id_before,
+    merge_sorted_async,
+    redis_key_slot,
 )
 
 pytestmark = pytest.mark.unit
@@ -24,6 +27,11 @@ def test_redis_stream_id_add_one():
     assert redis_stream_id_add_one("0000000000000-0") == "0000000000000-1"
 
 
+def test_redis_stream_id_before():
+    assert redis_stream_id_before("1514028809812-0") == "1514028809811"
+    assert redis_stream_id_before("1514028809812-10") == "1514028809812-9"
+
+
 def test_redis_steam_id_to_datetime():
     assert redis_steam_id_to_datetime("0000000000000-0") == datetime(
         1970, 1, 1, 0, 0, tzinfo=timezone.utc
@@ -53,3 +61,23 @@ def test_datetime_to_redis_steam_id():
         datetime_to_redis_steam_id(datetime(2017, 12, 23, 11, 33, 29, 812_010, tzinfo=timezone.utc))
         == "1514028809812-0"
     )
+
+
+def test_redis_key_slot():
+    assert redis_key_slot("foo") == 12182
+    assert redis_key_slot(b"123456789") == 12739
+    # Only the hash tag is hashed
+    assert redis_key_slot("{my.api}.*:stream") == redis_key_slot("my.api")
+    assert redis_key_slot("{my.api}:rpc_queue") == redis_key_slot("rpc_expiry_key:{my.api}:1")
+    # Empty hash tags are ignored
+    assert redis_key_slot("foo{}{bar}") == redis_key_slot(b"foo{}{bar}") != redis_key_slot("bar")
+
+
+@pytest.mark.asyncio
+async def test_merge_sorted_async():
+    async def gen(*values):
+        for value in values:
+            yield value
+
+    merged = merge_sorted_async([gen(1, 4, 5), gen(), gen(2, 3, 6)])
+    assert [v async for v in merged] == [1, 2, 3, 4, 5, 6]
@@ -2,6 +2,7 @@ import json
 
 import pytest
 
+from lightbus.exceptions import InvalidSerializerConfiguration
 from lightbus.message import EventMessage
 from lightbus.serializers.blob import BlobMessageSerializer, BlobMessageDeserializer
 
@@ -56,3 +57,20 @@ def test_blob_deserializer_dict():
     assert message.id == "123"
     assert message.kwargs == {"field": "value"}
     assert message.native_id == "456"
+
+
+def test_blob_compression():
+    serializer = BlobMessageSerializer(compression="lzma", compression_threshold=100)
+    serialized = serializer(
+        EventMessage(api_name="my.api", event_name="my_event", id="123", kwargs={"field": "x" * 1000})
+    )
+    assert serialized.startswith(b"\x00lzma\x00")
+
+    message = BlobMessageDeserializer(EventMessage)(serialized)
+    assert message.kwargs == {"field": "x" * 1000}
+    assert message.id == "123"
+
+
+def test_blob_compression_invalid_algorithm():
+    with pytest.raises(InvalidSerializerConfiguration):
+        BlobMessageSerializer(compression="foo")
@@ -60,3 +60,34 @@ def test_by_field_deserializer_empty_keys_and_values():
     assert message.id == "123"
     assert message.kwargs == {"field": "value"}
     assert message.version == 2
+
+
+def test_by_field_compression():
+    serializer = ByFieldMessageSerializer(compression="zlib", compression_threshold=100)
+    message = EventMessage(
+        api_name="my.api", event_name="my_event", kwargs={"field": "x" * 1000}, id="123"
+    )
+    serialized = serializer(message)
+    assert serialized["compression"] == "zlib"
+    assert len(serialized["kwargs"]) < 100
+    assert ":field" not in serialized
+    # Metadata remains uncompressed
+    assert serialized["event_name"] == "my_event"
+
+    # Redis will return bytes
+    serialized = {
+        k.encode("utf8"): v if isinstance(v, bytes) else str(v).encode("utf8")
+        for k, v in serialized.items()
+    }
+    message = ByFieldMessageDeserializer(EventMessage)(serialized)
+    assert message.kwargs == {"field": "x" * 1000}
+    assert message.id == "123"
+
+
+def test_by_field_compression_below_threshold():
+    serializer = ByFieldMessageSerializer(compression="zlib", compression_threshold=100)
+    serialized = serializer(
+        EventMessage(api_name="my.api", event_name="my_event", kwargs={"field": "value"})
+    )
+    assert "compression" not in serialized
+    assert serialized[":field"] == '"value"'
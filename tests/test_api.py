@@ -112,3 +112,13 @@ def test_api_registry_names(SimpleApi, registry):
     api = SimpleApi()
     registry.add(api)
     assert registry.names() == ["simple.api"]
+
+
+def test_event_partition_key():
+    event = Event(parameters=("order_id", "total"), partition_key="order_id")
+    assert event.partition_key == "order_id"
+
+
+def test_event_partition_key_not_a_parameter():
+    with pytest.raises(InvalidApiEventConfiguration):
+        Event(parameters=("order_id", "total"), partition_key="customer_id")
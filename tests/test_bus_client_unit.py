@@ -12,7 +12,7 @@ import lightbus.creation
 import lightbus.path
 from lightbus import Schema, RpcMessage, ResultMessage, EventMessage, BusClient
 from lightbus.config import Config
-from lightbus.config.structure import OnError
+from lightbus.config.structure import OnError, EventDeduplication
 from lightbus.exceptions import (
     UnknownApi,
     EventNotFound,
@@ -22,7 +22,9 @@ from lightbus.exceptions import (
     InvalidName,
     ValidationError,
     SuddenDeathException,
+    UnsupportedOptionValue,
 )
+from lightbus.client import _EventListener, _EventProcessingWindow
 from lightbus.transports.base import TransportRegistry
 from lightbus.utilities.async_tools import cancel
 
@@ -196,6 +198,40 @@ async def test_fire_event_version(dummy_bus: lightbus.path.BusPath, mocker):
     assert message.version == 5
 
 
+@pytest.mark.asyncio
+async def test_fire_events(dummy_bus: lightbus.path.BusPath, dummy_api, mocker):
+    await dummy_bus.client.register_api_async(dummy_api)
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("my.dummy")
+    send_events_spy = mocker.spy(event_transport, "send_events")
+    send_event_spy = mocker.spy(event_transport, "send_event")
+    hook_calls = []
+    dummy_bus.client.before_event_sent(lambda client, event_message: hook_calls.append(1))
+
+    await dummy_bus.client.fire_events(
+        [("my.dummy", "my_event", {"field": "a"}), ("my.dummy", "my_event", {"field": "b"})]
+    )
+    assert send_events_spy.call_count == 1
+    (messages,), _ = send_events_spy.call_args
+    assert [m.kwargs["field"] for m in messages] == ["a", "b"]
+    # The default send_events() implementation falls back to send_event()
+    assert send_event_spy.call_count == 2
+    assert len(hook_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_fire_events_bad_event_arguments(dummy_bus: lightbus.path.BusPath, dummy_api, mocker):
+    await dummy_bus.client.register_api_async(dummy_api)
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("my.dummy")
+    send_events_spy = mocker.spy(event_transport, "send_events")
+
+    with pytest.raises(InvalidEventArguments):
+        await dummy_bus.client.fire_events(
+            [("my.dummy", "my_event", {"field": "a"}), ("my.dummy", "my_event", {"bad_arg": "b"})]
+        )
+    # Nothing should have been sent
+    assert not send_events_spy.called
+
+
 @pytest.mark.asyncio
 async def test_call_rpc_remote_empty_name(dummy_bus: lightbus.path.BusPath):
     with pytest.raises(InvalidName):
@@ -505,6 +541,362 @@ async def test_exception_in_listener_ignore(dummy_bus: lightbus.path.BusPath, lo
     assert "ERROR" in log_levels
 
 
+@pytest.mark.asyncio
+async def test_listener_concurrency(dummy_bus: lightbus.path.BusPath, mocker):
+    running = 0
+    max_running = 0
+
+    async def listener(event_message, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        options={"concurrency": 3},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(6)
+    ]
+    assert await event_listener.process_batch(event_transport, event_messages)
+
+    assert max_running == 3
+    # All messages are acknowledged in one go
+    assert acknowledge_spy.call_count == 1
+    args, _ = acknowledge_spy.call_args
+    assert len(args) == 6
+
+
+@pytest.mark.asyncio
+async def test_listener_concurrency_spans_batches(dummy_bus: lightbus.path.BusPath, mocker):
+    """Events from the next batch are started while the previous batch is in flight"""
+    running = 0
+    max_running = 0
+
+    async def listener(event_message, **kwargs):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.05 if event_message.id == "0" else 0.01)
+        running -= 1
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        options={"concurrency": 3},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+    window = _EventProcessingWindow(event_listener, event_transport)
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(6)
+    ]
+    # Batches of two events, as though the transport's batch_size were 2
+    for n in range(0, 6, 2):
+        assert await event_listener.process_batch(
+            event_transport, event_messages[n : n + 2], window
+        )
+    assert await window.join()
+
+    assert max_running == 3
+    # The slow first event held up acknowledgement, but not processing
+    acknowledged_ids = [m.id for args, _ in acknowledge_spy.call_args_list for m in args]
+    assert acknowledged_ids == ["0", "1", "2", "3", "4", "5"]
+
+
+@pytest.mark.asyncio
+async def test_listener_events_added_during_acknowledgement(
+    dummy_bus: lightbus.path.BusPath, mocker
+):
+    """Events added while an acknowledgement is in progress are still acknowledged"""
+    acknowledged_ids = []
+
+    async def acknowledge(*event_messages, bus_client):
+        await asyncio.sleep(0.05)
+        acknowledged_ids.extend(m.id for m in event_messages)
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=lambda *a, **kw: None,
+        listener_name="test",
+        options={"concurrency": 2},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    mocker.patch.object(event_transport, "acknowledge", side_effect=acknowledge)
+    window = _EventProcessingWindow(event_listener, event_transport)
+
+    await window.add(
+        [EventMessage(api_name="my_company.auth", event_name="user_registered", id="0")]
+    )
+    # The first event is now being acknowledged
+    await asyncio.sleep(0.02)
+    await window.add(
+        [EventMessage(api_name="my_company.auth", event_name="user_registered", id="1")]
+    )
+    await asyncio.sleep(0.2)
+
+    assert acknowledged_ids == ["0", "1"]
+    await window.close()
+
+
+@pytest.mark.asyncio
+async def test_listener_concurrency_acknowledges_in_order(
+    dummy_bus: lightbus.path.BusPath, mocker
+):
+    async def listener(event_message, **kwargs):
+        # The first message is the slowest to process
+        await asyncio.sleep(0.05 if event_message.id == "0" else 0.001)
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        options={"concurrency": 5},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(5)
+    ]
+    await event_listener.process_batch(event_transport, event_messages)
+
+    acknowledged_ids = [m.id for args, _ in acknowledge_spy.call_args_list for m in args]
+    assert acknowledged_ids == ["0", "1", "2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_listener_concurrency_stop_listener(dummy_bus: lightbus.path.BusPath, mocker):
+    dummy_bus.client.config.api("default").on_error = OnError.STOP_LISTENER
+
+    async def listener(event_message, **kwargs):
+        if event_message.id == "1":
+            raise Exception("Intentional exception")
+        await asyncio.sleep(0.001)
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        options={"concurrency": 3},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(3)
+    ]
+    assert not await event_listener.process_batch(event_transport, event_messages)
+
+    # Only the message prior to the failure should be acknowledged
+    acknowledged_ids = [m.id for args, _ in acknowledge_spy.call_args_list for m in args]
+    assert acknowledged_ids == ["0"]
+
+
+@pytest.mark.asyncio
+async def test_listener_acknowledgement_interval(dummy_bus: lightbus.path.BusPath, mocker):
+    dummy_bus.client.config.api("default").event_acknowledgement_interval = 0.01
+
+    async def listener(event_message, **kwargs):
+        await asyncio.sleep(0.02)
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(3)
+    ]
+    await event_listener.process_batch(event_transport, event_messages)
+
+    # Processing is slower than the acknowledgement interval, so each
+    # message gets acknowledged as soon as it has been processed
+    acknowledged_ids = [[m.id for m in args] for args, _ in acknowledge_spy.call_args_list]
+    assert acknowledged_ids == [["0"], ["1"], ["2"]]
+
+
+@pytest.mark.asyncio
+async def test_listener_after_event_execution_hook(dummy_bus: lightbus.path.BusPath, mocker):
+    """The hook runs as soon as each event is processed, not upon acknowledgement"""
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=lambda event_message: None,
+        listener_name="test",
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+    acknowledgements_at_hook = []
+
+    @dummy_bus.client.after_event_execution()
+    def callback(*args, **kwargs):
+        acknowledgements_at_hook.append(acknowledge_spy.call_count)
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(2)
+    ]
+    await event_listener.process_batch(event_transport, event_messages)
+
+    assert acknowledgements_at_hook == [0, 0]
+    assert acknowledge_spy.call_count == 1
+
+
+def test_listener_concurrency_from_config(dummy_bus: lightbus.path.BusPath):
+    dummy_bus.client.config.api("default").event_listener_concurrency = 4
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=lambda event_message: None,
+        listener_name="test",
+        bus_client=dummy_bus.client,
+    )
+    assert event_listener.concurrency == 4
+    assert "concurrency" not in event_listener.options
+
+
+def test_listener_concurrency_invalid(dummy_bus: lightbus.path.BusPath):
+    with pytest.raises(UnsupportedOptionValue):
+        _EventListener(
+            events=[("my_company.auth", "user_registered")],
+            listener_callable=lambda event_message: None,
+            listener_name="test",
+            options={"concurrency": 0},
+            bus_client=dummy_bus.client,
+        )
+
+
+@pytest.mark.asyncio
+async def test_listener_deduplication_memory(dummy_bus: lightbus.path.BusPath, mocker):
+    dummy_bus.client.config.api("default").event_deduplication = EventDeduplication.MEMORY
+    calls = []
+
+    async def listener(event_message, **kwargs):
+        calls.append(event_message.id)
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        options={"concurrency": 2},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+    mark_processed_spy = mocker.spy(event_listener, "mark_processed")
+
+    event_messages = [
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+        for n in range(2)
+    ]
+    await event_listener.process_batch(event_transport, event_messages)
+    assert calls == ["0", "1"]
+
+    # The events are redelivered (i.e. we died before they were acknowledged)
+    event_messages.append(
+        EventMessage(api_name="my_company.auth", event_name="user_registered", id="2")
+    )
+    unprocessed = await event_listener.skip_processed(event_transport, event_messages)
+    assert [m.id for m in unprocessed] == ["2"]
+
+    # Events processed concurrently were recorded in a single call
+    assert mark_processed_spy.call_count == 1
+
+    # Skipped events are still acknowledged
+    acknowledged_ids = [m.id for args, _ in acknowledge_spy.call_args_list for m in args]
+    assert acknowledged_ids == ["0", "1", "0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_listener_deduplication_before_acknowledgement(
+    dummy_bus: lightbus.path.BusPath, mocker
+):
+    """Events are recorded as soon as they are processed, even if not yet acknowledged"""
+
+    async def listener(event_message, **kwargs):
+        await asyncio.sleep(0.2 if event_message.id == "0" else 0)
+
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=listener,
+        listener_name="test",
+        options={"concurrency": 2, "deduplication": "memory"},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    acknowledge_spy = mocker.spy(event_transport, "acknowledge")
+    window = _EventProcessingWindow(event_listener, event_transport)
+
+    await window.add(
+        [
+            EventMessage(api_name="my_company.auth", event_name="user_registered", id=str(n))
+            for n in range(2)
+        ]
+    )
+    await asyncio.sleep(0.05)
+
+    # The second event is held up from acknowledgement by the first
+    assert list(event_listener._processed_event_ids) == ["1"]
+    assert acknowledge_spy.call_count == 0
+    assert await window.join()
+
+
+@pytest.mark.asyncio
+async def test_listener_deduplication_max_size(dummy_bus: lightbus.path.BusPath):
+    dummy_bus.client.config.api("default").event_deduplication_max_size = 2
+    event_listener = _EventListener(
+        events=[("my_company.auth", "user_registered")],
+        listener_callable=lambda event_message: None,
+        listener_name="test",
+        options={"deduplication": "memory"},
+        bus_client=dummy_bus.client,
+    )
+    event_transport = dummy_bus.client.transport_registry.get_event_transport("default")
+    for n in range(3):
+        event_message = EventMessage(
+            api_name="my_company.auth", event_name="user_registered", id=str(n)
+        )
+        await event_listener.mark_processed(event_transport, [event_message])
+
+    assert event_listener.deduplication == EventDeduplication.MEMORY
+    assert list(event_listener._processed_event_ids) == ["1", "2"]
+    assert "deduplication" not in event_listener.options
+
+
+def test_listener_deduplication_invalid(dummy_bus: lightbus.path.BusPath):
+    with pytest.raises(UnsupportedOptionValue):
+        _EventListener(
+            events=[("my_company.auth", "user_registered")],
+            listener_callable=lambda event_message: None,
+            listener_name="test",
+            options={"deduplication": "everywhere"},
+            bus_client=dummy_bus.client,
+        )
+
+
 def test_add_background_task(dummy_bus: lightbus.path.BusPath, event_loop):
     calls = 0
 
@@ -56,3 +56,12 @@ async def test_positional_only_rpc(dummy_bus: lightbus.path.BusPath):
 async def test_positional_only_event(dummy_bus: lightbus.path.BusPath):
     with pytest.raises(InvalidParameters):
         await dummy_bus.my.dummy.event.fire_async(123)
+
+
+@pytest.mark.asyncio
+async def test_fire_many_async(dummy_bus: lightbus.path.BusPath, dummy_api, get_dummy_events):
+    await dummy_bus.client.register_api_async(dummy_api)
+    await dummy_bus.my.dummy.my_event.fire_many_async([{"field": "a"}, {"field": "b"}])
+    events = get_dummy_events()
+    assert [e.kwargs["field"] for e in events] == ["a", "b"]
+    assert {e.canonical_name for e in events} == {"my.dummy.my_event"}
@@ -196,6 +196,33 @@ def test_commands_dump_config_schema(run_lightbus_command):
     os.remove("/tmp/test_commands_dump_config_schema.json")
 
 
+def test_commands_dump_events(run_lightbus_command, debug_config_file):
+    process: Popen = run_lightbus_command(
+        "dumpevents", "--api", "my.dummy", config_path=debug_config_file, bus_module_code=BUS_MODULE
+    )
+    time.sleep(1)
+
+    lines = process.stdout.readlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["event_name"]
+
+
+def test_commands_dead_letters_unsupported(run_lightbus_command, debug_config_file):
+    process: Popen = run_lightbus_command(
+        "deadletters",
+        "--api",
+        "my.dummy",
+        "--event",
+        "my_event",
+        config_path=debug_config_file,
+        bus_module_code=BUS_MODULE,
+    )
+    time.sleep(1)
+
+    assert process.stdout.readlines() == []
+    assert b"does not support dead letters" in process.stderr.read()
+
+
 def test_commands_inspect_simple(run_lightbus_command, debug_config_file):
     process: Popen = run_lightbus_command(
         "inspect", "--api", "my.dummy", config_path=debug_config_file, bus_module_code=BUS_MODULE
@@ -209,6 +236,19 @@ def test_commands_inspect_simple(run_lightbus_command, debug_config_file):
         assert event["event_name"]
 
 
+def test_commands_inspect_last(run_lightbus_command, debug_config_file):
+    process: Popen = run_lightbus_command(
+        "inspect", "--last", "1", config_path=debug_config_file, bus_module_code=BUS_MODULE
+    )
+    time.sleep(1)
+
+    lines = process.stdout.readlines()
+    assert lines
+    for line in lines:
+        event = json.loads(line)
+        assert event["event_name"]
+
+
 def test_commands_inspect_follow(run_lightbus_command, debug_config_file):
     process: Popen = run_lightbus_command(
         "inspect", "--follow", config_path=debug_config_file, bus_module_code=BUS_MODULE